@@ -0,0 +1,167 @@
+"""
+Benchmark: fresh connection per call vs the shared pool (http_client.py),
+against a local HTTPS stub server
+
+The stub answers like a (non-streaming) chat completion endpoint. --rtt-ms
+simulates network latency: every request costs one round trip, and every new
+connection two more (TCP handshake + TLS 1.3 handshake) before it is served.
+A real OpenRouter/Brave call from a laptop pays those extra round trips plus
+the certificate exchange each time the socket is new.
+
+- fresh: a new httpx.Client per call, like describe_image_with_vision's
+  per-call OpenAI() and brave_search's bare requests.get
+- pooled: get_http_client(), the client every call uses now
+- first request after the dialog opens: cold pool vs prewarm() while the
+  user types
+
+Needs httpx (a dependency of openai) and the openssl CLI for the throwaway
+certificate.
+
+Usage:
+    python benchmarks/bench_http_pool.py
+    python benchmarks/bench_http_pool.py --rtt-ms 40 --calls 30
+"""
+
+import argparse
+import json
+import os
+import ssl
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import http_client
+
+COMPLETION = json.dumps({
+    "id": "stub", "object": "chat.completion",
+    "choices": [{"index": 0, "message": {"role": "assistant", "content": "ok"}, "finish_reason": "stop"}],
+}).encode()
+
+
+def make_certificate(directory):
+    cert, key = os.path.join(directory, "cert.pem"), os.path.join(directory, "key.pem")
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "ec", "-pkeyopt", "ec_paramgen_curve:prime256v1", "-nodes",
+         "-keyout", key, "-out", cert, "-days", "1", "-subj", "/CN=localhost",
+         "-addext", "subjectAltName=DNS:localhost,IP:127.0.0.1"],
+        check=True, capture_output=True,
+    )
+    return cert, key
+
+
+def start_server(cert, key, rtt):
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(cert, key)
+    connections = []
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive
+        # Headers and body in one segment (no Nagle / delayed-ACK stall)
+        wbufsize = 64 * 1024
+        disable_nagle_algorithm = True
+
+        def setup(self):
+            # New connection: TCP + TLS handshake round trips, then the real handshake
+            connections.append(1)
+            time.sleep(2 * rtt)
+            self.request = context.wrap_socket(self.request, server_side=True)
+            super().setup()
+
+        def _reply(self, body):
+            time.sleep(rtt)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            return body
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            self.wfile.write(self._reply(COMPLETION))
+
+        def do_HEAD(self):
+            self._reply(b"")
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, connections
+
+
+def call(client, url):
+    started = time.perf_counter()
+    response = client.post(f"{url}/chat/completions", json={"model": "stub", "messages": []})
+    assert response.status_code == 200 and response.json()["choices"][0]["message"]["content"] == "ok"
+    return (time.perf_counter() - started) * 1000
+
+
+def reset_pool():
+    """Drop the shared client (a fresh process / expired keep-alive)"""
+    if http_client._http_client is not None:
+        http_client._http_client.close()
+    http_client._http_client = None
+    http_client._prewarmed.clear()
+
+
+def median(values):
+    values = sorted(values)
+    return values[len(values) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rtt-ms", type=float, default=20.0, help="simulated network round trip")
+    parser.add_argument("--calls", type=int, default=20)
+    args = parser.parse_args()
+
+    import httpx
+
+    with tempfile.TemporaryDirectory() as directory:
+        cert, key = make_certificate(directory)
+        os.environ["SSL_CERT_FILE"] = cert  # trusted by httpx clients created after this
+        server, connections = start_server(cert, key, args.rtt_ms / 1000)
+        url = f"https://localhost:{server.server_address[1]}"
+
+        print(f"🌐 stub server {url}, simulated RTT {args.rtt_ms:.0f} ms, HTTP/2: {http_client.http2_available()}")
+
+        before = len(connections)
+        fresh = []
+        for _ in range(args.calls):
+            with httpx.Client() as client:
+                fresh.append(call(client, url))
+        fresh_connections = len(connections) - before
+
+        reset_pool()
+        before = len(connections)
+        pooled = [call(http_client.get_http_client(), url) for _ in range(args.calls)]
+        pooled_connections = len(connections) - before
+
+        cold, warm = [], []
+        for _ in range(5):
+            reset_pool()
+            cold.append(call(http_client.get_http_client(), url))
+            reset_pool()
+            assert http_client.prewarm(url)  # dialog opened; the user types meanwhile
+            warm.append(call(http_client.get_http_client(), url))
+
+        server.shutdown()
+
+    print(f"\n📞 {args.calls} calls, median per call")
+    print(f"   fresh connection each call: {median(fresh):7.1f} ms  ({fresh_connections} connections)")
+    print(f"   shared pool:                {median(pooled):7.1f} ms  ({pooled_connections} connection(s))")
+    print(f"   saved per call:             {median(fresh) - median(pooled):7.1f} ms")
+    print("\n⌨️  first request after the hotkey dialog opens (median of 5)")
+    print(f"   cold pool:                  {median(cold):7.1f} ms")
+    print(f"   prewarmed:                  {median(warm):7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
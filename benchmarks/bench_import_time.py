@@ -0,0 +1,84 @@
+"""
+Benchmark: cold import cost of the entry-point modules (python -X importtime)
+
+Each module is imported in a fresh interpreter (best of --runs). Reports the
+cumulative import time, the slowest modules it pulls in, and whether it stays
+within --budget-ms. Modules whose dependencies aren't installed are reported
+with the import error instead.
+
+Usage:
+    python benchmarks/bench_import_time.py
+    python benchmarks/bench_import_time.py background_handler_simple --top 15
+    python benchmarks/bench_import_time.py --budget-ms 150
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+# What the menu bar app, the agent path and the tools load at import
+MODULES = ["background_handler_simple", "manager_agent", "tool", "tts_pipeline", "agent_loader"]
+
+
+def import_profile(module):
+    """
+    One cold import of `module`
+
+    Returns:
+        ({imported module: (self us, cumulative us)}, error or None)
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=SRC, capture_output=True, text=True,
+        env={**os.environ, "PYTHONPATH": SRC, "PYTHONDONTWRITEBYTECODE": "1"},
+    )
+    profile = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        profile[name.strip()] = (int(self_us), int(cumulative_us))
+    error = None
+    if result.returncode != 0:
+        error = (result.stderr.strip().splitlines() or ["failed"])[-1]
+    return profile, error
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("modules", nargs="*", default=MODULES)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=8, help="slowest imports to list per module")
+    parser.add_argument("--budget-ms", type=float, default=200.0)
+    args = parser.parse_args()
+
+    for module in args.modules:
+        best, error = None, None
+        for _ in range(args.runs):
+            profile, error = import_profile(module)
+            if error or module not in profile:
+                break
+            if best is None or profile[module][1] < best[module][1]:
+                best = profile
+
+        print(f"\n📦 {module}")
+        if error or best is None:
+            print(f"   ⚠️  import failed: {error}")
+            continue
+
+        total_ms = best[module][1] / 1000
+        status = "✓" if total_ms <= args.budget_ms else "✗"
+        print(f"   {status} {total_ms:.0f} ms cumulative (budget {args.budget_ms:.0f} ms), {len(best)} modules")
+        slowest = sorted(
+            ((name, times) for name, times in best.items() if name != module),
+            key=lambda item: item[1][1], reverse=True,
+        )[:args.top]
+        for name, (self_us, cumulative_us) in slowest:
+            print(f"   {cumulative_us / 1000:>8.1f} ms  (self {self_us / 1000:>6.1f})  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Benchmark: compiled prompt templates + rendered-prompt cache vs str.format
+
+Replays simulated turns against the agents in src/agents_config.yaml:
+datetime changes every turn, conversation after every manager turn, recent
+logs every 5 turns, tasks every 10, instructions and the paper template never.
+
+Reports per agent:
+- render cost: str.format vs PromptTemplate.render, on the same context
+- rendered-prompt cache: what get_agent does when a context value changed
+  (fit_context + render, a miss) vs when none did (the cache lookup alone,
+  a hit)
+- prefix stability: share of each prompt that is byte-identical to the
+  previous turn's prompt (what provider-side prompt caching can reuse), and
+  the static part before the first placeholder
+
+Checks first that compiled rendering matches str.format exactly.
+
+Usage:
+    python benchmarks/bench_prompt_render.py
+    python benchmarks/bench_prompt_render.py --turns 5000
+    # compare against an older prompt layout
+    git show HEAD~1:src/agents_config.yaml > /tmp/old.yaml
+    python benchmarks/bench_prompt_render.py --config /tmp/old.yaml
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from agent_loader import AgentConfig, PromptTemplate
+from context_budget import fit_context
+
+CONFIG = os.path.join(os.path.dirname(__file__), "..", "src", "agents_config.yaml")
+
+# name -> (change every N turns, approximate size in characters)
+CHANGES = {
+    "datetime": (1, 60),
+    "conversation": (1, 1500),
+    "recent_logs": (5, 2000),
+    "tasks": (10, 2500),
+    "instructions": (None, 1200),
+    "paper_template": (None, 3000),
+}
+
+
+class SimulatedContext:
+    """Stands in for ContextManager: values and generations follow CHANGES"""
+
+    def __init__(self):
+        self.turn = 0
+
+    def generation(self, name):
+        every, _ = CHANGES[name]
+        return 0 if every is None else self.turn // every
+
+    def value(self, name):
+        _, size = CHANGES[name]
+        line = f"[{name} v{self.generation(name)}] lorem ipsum dolor sit amet\n"
+        return (line * (size // len(line) + 1))[:size]
+
+    def gather(self, names):
+        context = {name: self.value(name) for name in names}
+        return context, tuple(self.generation(name) for name in names)
+
+
+class Replay:
+    """Serves pre-gathered (context, generations) pairs in order"""
+
+    def __init__(self, turns):
+        self.turns = iter(turns)
+
+    def gather(self, names):
+        return next(self.turns)
+
+
+def common_prefix(a, b):
+    n = min(len(a), len(b))
+    i = 0
+    while i < n and a[i] == b[i]:
+        i += 1
+    return i
+
+
+def timed(func, items):
+    """Mean microseconds of func(item) over items"""
+    start = time.perf_counter()
+    for item in items:
+        func(item)
+    return (time.perf_counter() - start) / len(items) * 1e6
+
+
+def check_parity(config):
+    context = SimulatedContext()
+    for name, agent in config.config["agents"].items():
+        values, _ = context.gather(agent.get("context_needs", []))
+        assert PromptTemplate(agent["prompt"]).render(values) == agent["prompt"].format(**values), name
+    print("✓ compiled templates render exactly like str.format")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, default=2000)
+    parser.add_argument("--config", default=CONFIG, help="agents YAML to load")
+    args = parser.parse_args()
+
+    config = AgentConfig(args.config)
+    check_parity(config)
+    print()
+    print(f"{'agent':>14} | {'format':>9} | {'compiled':>9} | {'cache miss':>10} | {'cache hit':>9} | "
+          f"{'static prefix':>13} | {'reused prefix':>13}")
+    print("-" * 97)
+
+    for name, agent in config.config["agents"].items():
+        needs = agent.get("context_needs", [])
+        template = config.templates[name]
+        context = SimulatedContext()
+        turns = []
+        for turn in range(args.turns):
+            context.turn = turn
+            turns.append(context.gather(needs))
+
+        format_us = timed(lambda turn: agent["prompt"].format(**turn[0]), turns)
+        compiled_us = timed(lambda turn: template.render(turn[0]), turns)
+
+        # Miss: budget fitting + render, as get_agent does after a context change
+        providers = config.config.get("context_providers") or {}
+        budget = agent.get("context_budget", config.config.get("context_budget"))
+        miss_us = timed(lambda turn: template.render(fit_context(turn[0], providers, budget)[0]), turns)
+
+        # The prompts get_agent actually returns, one per turn
+        config._rendered.clear()
+        config.context_manager = Replay(turns)
+        prompts = [config.get_agent(name)["system_prompt"] for _ in turns]
+
+        # Hit: the lookup alone, with the generations of the last turn
+        generations = turns[-1][1]
+        assert config._cached_prompt(name, generations, template) is prompts[-1]
+        hit_us = timed(lambda _: config._cached_prompt(name, generations, template), turns)
+
+        reused = sum(common_prefix(a, b) / len(b) for a, b in zip(prompts, prompts[1:])) / (len(prompts) - 1)
+        static_prefix = template.segments[0][0] if template.segments else ""
+        static = len(static_prefix) / len(prompts[-1])
+
+        print(f"{name:>14} | {format_us:>6.1f} us | {compiled_us:>6.1f} us | {miss_us:>7.1f} us | {hit_us:>6.2f} us | "
+              f"{static:>12.0%} | {reused:>12.0%}")
+
+
+if __name__ == "__main__":
+    main()
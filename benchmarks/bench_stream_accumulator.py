@@ -0,0 +1,191 @@
+"""
+Benchmark: the old per-loop chunk handling vs StreamAccumulator on long
+synthetic streams
+
+The old loop (copied below) did `+=` on content, tool-call arguments and the
+TTS buffer, and re-ran re.finditer over the whole pending TTS buffer on every
+delta. Text without sentence ends (code blocks, single-line lists) is never
+cut, so that rescan grows with the response.
+
+Streams:
+- prose: sentences of 5-25 words, 1-3 words per delta
+- no sentence ends: a long code block / list, lines but no blank lines
+- tool call: one create_tasks-style call with large JSON arguments
+
+Every stream is also checked for identical content, tool calls and TTS
+chunks (plus --fuzz random streams full of punctuation/whitespace edge cases).
+
+Usage:
+    python benchmarks/bench_stream_accumulator.py
+    python benchmarks/bench_stream_accumulator.py --chars 100000 --fuzz 5000
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from stream_accumulator import StreamAccumulator
+
+WORDS = "the model streams tokens while the agent speaks each finished sentence aloud to the user".split()
+
+
+def chunk(content=None, tool_calls=None):
+    delta = SimpleNamespace(content=content, tool_calls=tool_calls)
+    return SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+
+
+def tool_delta(index, id=None, name=None, arguments=None):
+    return SimpleNamespace(index=index, id=id, function=SimpleNamespace(name=name, arguments=arguments))
+
+
+def old_loop(stream, queue_tts):
+    """The manager's chunk loop before StreamAccumulator (printing removed)"""
+    content = ""
+    tool_calls = []
+    tts_buffer = ""
+
+    for chunk in stream:
+        delta = chunk.choices[0].delta
+
+        if delta.content:
+            content += delta.content
+            tts_buffer += delta.content
+
+            sentence_pattern = r'([.!?]+[\s\n]+|[\n]{2,})'
+            matches = list(re.finditer(sentence_pattern, tts_buffer))
+
+            if matches:
+                last_match = matches[-1]
+                complete_text = tts_buffer[:last_match.end()].strip()
+
+                if complete_text and len(complete_text) >= 15:
+                    queue_tts(complete_text)
+                    tts_buffer = tts_buffer[last_match.end():]
+                elif len(tts_buffer) > 200:
+                    queue_tts(tts_buffer.strip())
+                    tts_buffer = ""
+
+        if delta.tool_calls:
+            for tc in delta.tool_calls:
+                while len(tool_calls) <= tc.index:
+                    tool_calls.append({
+                        "id": "",
+                        "type": "function",
+                        "function": {"name": "", "arguments": ""}
+                    })
+
+                if tc.id: tool_calls[tc.index]["id"] = tc.id
+                if tc.function.name: tool_calls[tc.index]["function"]["name"] = tc.function.name
+                if tc.function.arguments: tool_calls[tc.index]["function"]["arguments"] += tc.function.arguments
+
+    if tts_buffer.strip():
+        queue_tts(tts_buffer.strip())
+    return content, tool_calls
+
+
+def new_loop(stream, queue_tts):
+    acc = StreamAccumulator(on_sentence=queue_tts)
+    for chunk in stream:
+        acc.add(chunk)
+    return acc.finish()
+
+
+def prose(chars, rng):
+    stream, total = [], 0
+    while total < chars:
+        words = [rng.choice(WORDS) for _ in range(rng.randint(5, 25))]
+        sentence = " ".join(words) + rng.choice([". ", "! ", "? ", ".\n\n"])
+        pieces = sentence.split(" ")
+        i = 0
+        while i < len(pieces):
+            n = rng.randint(1, 3)
+            text = " ".join(pieces[i:i + n]) + (" " if i + n < len(pieces) else "")
+            stream.append(chunk(text))
+            i += n
+        total += len(sentence)
+    return stream
+
+
+def no_sentence_ends(chars, rng):
+    stream, total = [], 0
+    while total < chars:
+        line = f"    result_{total} = compute({rng.choice(WORDS)}, {rng.randint(0, 99)})\n"
+        for i in range(0, len(line), 4):
+            stream.append(chunk(line[i:i + 4]))
+        total += len(line)
+    return stream
+
+
+def tool_call(chars, rng):
+    tasks = []
+    while len(json.dumps(tasks)) < chars:
+        tasks.append({"name": " ".join(rng.choice(WORDS) for _ in range(6)), "tag": "research",
+                      "due_date": "2026-11-01", "comments": " ".join(rng.choice(WORDS) for _ in range(12))})
+    arguments = json.dumps({"tasks": tasks})
+    stream = [chunk(tool_calls=[tool_delta(0, id="call_1", name="create_tasks")])]
+    for i in range(0, len(arguments), 8):
+        stream.append(chunk(tool_calls=[tool_delta(0, arguments=arguments[i:i + 8])]))
+    return stream
+
+
+def fuzz(rng):
+    """Short random stream heavy on terminators, whitespace runs and tool-call gaps"""
+    alphabet = ["a", "bc", "word", ".", "!", "?", "...", " ", "  ", "\n", "\n\n", "\t", ". ", "x.",
+                "\u00a0", "\u2003", "\r\n"]
+    stream = []
+    for _ in range(rng.randint(1, 80)):
+        if rng.random() < 0.1:
+            index = rng.randint(0, 2)
+            stream.append(chunk(tool_calls=[tool_delta(index, id=rng.choice([None, f"c{index}"]),
+                                                       name=rng.choice([None, "t"]), arguments=rng.choice(["", "{", "}"]))]))
+        else:
+            stream.append(chunk("".join(rng.choice(alphabet) for _ in range(rng.randint(1, 6)))))
+    return stream
+
+
+def run(loop, stream):
+    spoken = []
+    started = time.perf_counter()
+    result = loop(stream, spoken.append)
+    return (time.perf_counter() - started) * 1000, result, spoken
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    # The old loop is quadratic on text without sentence ends: 100k chars takes over a minute
+    parser.add_argument("--chars", type=int, default=30_000, help="approximate length of each stream")
+    parser.add_argument("--fuzz", type=int, default=500, help="random streams checked for parity")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    for i in range(args.fuzz):
+        stream = fuzz(rng)
+        _, old_result, old_spoken = run(old_loop, stream)
+        _, new_result, new_spoken = run(new_loop, stream)
+        assert new_result == old_result, f"fuzz stream {i}: content/tool calls differ"
+        # The old loop could queue "" for a >200-char whitespace-only buffer; the new one skips it
+        assert new_spoken == [s for s in old_spoken if s], f"fuzz stream {i}: TTS chunks differ"
+    print(f"✓ {args.fuzz} random streams: same content, tool calls and TTS chunks")
+
+    for label, make in (("prose", prose), ("no sentence ends", no_sentence_ends), ("tool call", tool_call)):
+        for chars in (args.chars // 10, args.chars):
+            stream = make(chars, rng)
+            old_ms, old_result, old_spoken = run(old_loop, stream)
+            new_ms, new_result, new_spoken = run(new_loop, stream)
+            assert new_result == old_result and new_spoken == [s for s in old_spoken if s], label
+
+            print(f"\n📜 {label}, {chars:,} chars in {len(stream):,} deltas ({len(new_spoken)} TTS chunks)")
+            print(f"   old loop:    {old_ms:8.1f} ms")
+            print(f"   accumulator: {new_ms:8.1f} ms  ({old_ms / new_ms:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Benchmark: tool calls of one assistant message, one by one vs tool_executor
+
+Stand-in tools sleep instead of doing I/O: brave_search takes --search-ms
+(the real one sleeps 1s before its HTTP request), task writes take
+--write-ms and are serialized ("tasks" class), bash_command is EXCLUSIVE.
+Each scenario checks that the concurrent run returns the same results in the
+same order, that no two "tasks" calls overlapped and that bash_command ran
+alone.
+
+Usage:
+    python benchmarks/bench_tool_calls.py
+    python benchmarks/bench_tool_calls.py --search-ms 1000
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from tool_executor import run_tool_calls
+from tool_registry import EXCLUSIVE, call_tool, tool
+
+SCENARIOS = {
+    "paper_agent: 4 searches": [("brave_search", {"query": f"q{i}"}) for i in range(4)],
+    "2 searches + 2 task writes": [
+        ("brave_search", {"query": "a"}), ("create_task", {"name": "t1"}),
+        ("brave_search", {"query": "b"}), ("create_task", {"name": "t2"}),
+    ],
+    "search, bash, search": [
+        ("brave_search", {"query": "a"}), ("bash_command", {"command": "ls"}), ("brave_search", {"query": "b"}),
+    ],
+}
+
+
+class Tracker:
+    """Counts overlapping calls per concurrency class"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = {}
+        self.peak = {}
+        self.total = 0
+        self.bash_overlap = False
+
+    def enter(self, kind):
+        with self.lock:
+            if kind == "bash" and self.total:
+                self.bash_overlap = True
+            if self.active.get("bash"):
+                self.bash_overlap = True
+            self.active[kind] = self.active.get(kind, 0) + 1
+            self.total += 1
+            self.peak[kind] = max(self.peak.get(kind, 0), self.active[kind])
+
+    def leave(self, kind):
+        with self.lock:
+            self.active[kind] -= 1
+            self.total -= 1
+
+
+def register_stand_ins(tracker, search_ms, write_ms):
+    def timed(kind, ms, result):
+        tracker.enter(kind)
+        try:
+            time.sleep(ms / 1000)
+        finally:
+            tracker.leave(kind)
+        return result
+
+    @tool("stand-in")
+    def brave_search(query: str):
+        return timed("search", search_ms, f"results for {query}")
+
+    @tool("stand-in", concurrency="tasks")
+    def create_task(name: str):
+        return timed("tasks", write_ms, f"created {name}")
+
+    @tool("stand-in", concurrency=EXCLUSIVE)
+    def bash_command(command: str):
+        return timed("bash", write_ms, f"ran {command}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--search-ms", type=float, default=300.0)
+    parser.add_argument("--write-ms", type=float, default=50.0)
+    args = parser.parse_args()
+
+    tracker = Tracker()
+    register_stand_ins(tracker, args.search_ms, args.write_ms)
+
+    for label, calls in SCENARIOS.items():
+        started = time.perf_counter()
+        expected = [call_tool(name, call_args) for name, call_args in calls]
+        sequential_ms = (time.perf_counter() - started) * 1000
+
+        tracker.peak = {}
+        started = time.perf_counter()
+        outcomes = run_tool_calls(calls, call_tool)
+        concurrent_ms = (time.perf_counter() - started) * 1000
+
+        assert [result for result, _ in outcomes] == expected, "results differ or out of order"
+        assert tracker.peak.get("tasks", 0) <= 1, "task writes overlapped"
+        assert not tracker.bash_overlap, "bash_command overlapped another call"
+
+        per_call = ", ".join(f"{name} {ms:.0f}" for (name, _), (_, ms) in zip(calls, outcomes))
+        print(f"\n🔧 {label}")
+        print(f"   one by one: {sequential_ms:7.0f} ms")
+        print(f"   executor:   {concurrent_ms:7.0f} ms  ({sequential_ms / concurrent_ms:.1f}x)")
+        print(f"   per call (ms, incl. waiting for its lock): {per_call}")
+
+    print("\n✓ same results, same order; task writes serialized; bash ran alone")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Benchmark: tool dispatch and per-agent tool lists, registry vs the old code
+
+- dispatch: the old if/elif chain in execute_tool (one string compare per
+  branch, plus the function-local import the task branches did) vs
+  tool_registry.call_tool (one dict lookup + argument filter)
+- tool lists: the old per-turn nested scan of the global schema list for each
+  agent tool vs AgentConfig's precomputed per-agent arrays
+
+Tool bodies are no-ops so only the dispatch overhead is measured; tool.py
+itself isn't imported (it pulls in audio/screenshot dependencies), the
+benchmark registers stand-ins with the same names and order.
+
+Usage:
+    python benchmarks/bench_tool_dispatch.py
+    python benchmarks/bench_tool_dispatch.py --calls 500000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from tool_registry import call_tool, schemas, tool
+
+# Same order as the old execute_tool chain
+NAMES = [
+    "bash_command", "create_task", "create_tasks", "update_tasks", "query_tasks", "get_tasks_summary",
+    "update_task", "log_activity", "update_instructions", "create_memory_file", "brave_search",
+    "delegate_to_agent", "ask_user_question", "start_session_timer",
+]
+# Branches that imported from time_depends_tasks / agent_log on every call
+IMPORTING = {"create_task", "create_tasks", "update_tasks", "query_tasks", "get_tasks_summary",
+             "update_task", "log_activity"}
+
+AGENT_TOOLS = {
+    "manager": ["delegate_to_agent", "bash_command", "create_task", "create_tasks", "query_tasks",
+                "start_session_timer"],
+    "task_agent": ["create_task", "update_task", "create_tasks", "update_tasks", "query_tasks"],
+    "session_agent": ["log_activity", "update_instructions"],
+}
+
+
+def build_chain():
+    """The old execute_tool shape: if/elif on the name, args read by key"""
+    lines = ["def execute_tool(name, args):"]
+    for i, name in enumerate(NAMES):
+        lines.append(f"    {'if' if i == 0 else 'elif'} name == {name!r}:")
+        if name in IMPORTING:
+            lines.append("        from json import dumps")
+        lines.append("        return args.get('value')")
+    lines.append("    return 'Unknown tool'")
+    namespace = {}
+    exec("\n".join(lines), namespace)
+    return namespace["execute_tool"]
+
+
+def register_stand_ins():
+    for name in NAMES:
+        def func(value: str = None):
+            return value
+        tool(f"stand-in for {name}", name=name)(func)
+
+
+def per_call_ns(fn, calls, repeat=5):
+    """Best of `repeat` runs, in ns per call"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(calls)
+        best = min(best, time.perf_counter() - start)
+    return best / calls * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=200000)
+    args = parser.parse_args()
+
+    execute_chain = build_chain()
+    register_stand_ins()
+    all_schemas = schemas()
+
+    # Parity: same result for every tool, and for unknown names
+    for name in NAMES + ["nope"]:
+        assert execute_chain(name, {"value": name}) == call_tool(name, {"value": name}), name
+    precomputed = {agent: schemas(names) for agent, names in AGENT_TOOLS.items()}
+    for agent, names in AGENT_TOOLS.items():
+        scanned = [d for n in names for d in all_schemas if d["function"]["name"] == n]
+        assert scanned == precomputed[agent], agent
+    print("✓ registry dispatch and precomputed tool lists match the old code\n")
+
+    print(f"{'dispatch':>34} | {'if/elif':>9} | {'registry':>9}")
+    print("-" * 60)
+    for label, name in [("first branch", NAMES[0]), ("middle branch", NAMES[len(NAMES) // 2]),
+                        ("last branch", NAMES[-1]), ("unknown tool", "nope")]:
+        call_args = {"value": "x"}
+
+        def chain(n, name=name):
+            for _ in range(n):
+                execute_chain(name, call_args)
+
+        def registry(n, name=name):
+            for _ in range(n):
+                call_tool(name, call_args)
+
+        print(f"{label + ' (' + name + ')':>34} | {per_call_ns(chain, args.calls):>6.0f} ns | "
+              f"{per_call_ns(registry, args.calls):>6.0f} ns")
+
+    print()
+    print(f"{'tool list per turn':>34} | {'scan':>9} | {'cached':>9}")
+    print("-" * 60)
+    for agent, names in AGENT_TOOLS.items():
+        def scan(n, names=names):
+            for _ in range(n):
+                agent_tools = []
+                for tool_name in names:
+                    for tool_def in all_schemas:
+                        if tool_def["function"]["name"] == tool_name:
+                            agent_tools.append(tool_def)
+                            break
+
+        def cached(n, agent=agent):
+            for _ in range(n):
+                precomputed.get(agent)
+
+        calls = args.calls // 10
+        print(f"{agent:>34} | {per_call_ns(scan, calls):>6.0f} ns | {per_call_ns(cached, calls):>6.0f} ns")
+
+
+if __name__ == "__main__":
+    main()
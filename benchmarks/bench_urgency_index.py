@@ -0,0 +1,98 @@
+"""
+Benchmark: top-10 latency of the urgency index vs the original full sort
+
+The baseline is the original load_top_tasks algorithm (score every task with
+_calculate_urgency, sort, slice) run on an in-memory list, so JSON parse time
+is NOT included - the real gap is larger.
+
+Usage:
+    python benchmarks/bench_urgency_index.py
+    python benchmarks/bench_urgency_index.py --sizes 10000 100000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from task_store import urgency
+from time_depends_tasks import TAG_WEIGHTS
+from urgency_index import UrgencyIndex
+
+TAGS = ["hw", "paper_review", "meeting", "office_hour", "research", "other"]
+
+
+def make_tasks(n, seed=0):
+    rng = random.Random(seed)
+    today = datetime.now()
+    return [
+        {
+            "name": f"task {i}",
+            "tag": rng.choice(TAGS),
+            "due_date": (today + timedelta(days=rng.randint(-30, 365))).strftime("%Y-%m-%d"),
+            "done": rng.random() < 0.2,
+        }
+        for i in range(n)
+    ]
+
+
+def baseline_top(tasks, count):
+    """Original load_top_tasks: score everything, sort, slice"""
+    now = datetime.now()
+    scored = [(t, urgency(t, now, TAG_WEIGHTS)) for t in tasks]
+    scored.sort(key=lambda x: x[1], reverse=True)
+    return [t for t, _ in scored[:count]]
+
+
+def timeit(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--count", type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{'tasks':>10} | {'baseline':>12} | {'index top':>12} | {'speedup':>8} | {'build':>10} | {'upsert':>10}")
+    print("-" * 78)
+
+    for n in args.sizes:
+        tasks = make_tasks(n)
+        repeat = 3 if n >= 1_000_000 else 5
+
+        index = UrgencyIndex(TAG_WEIGHTS)
+        build = timeit(lambda: index.build(enumerate(tasks)), 1)
+
+        # Parity with the original ordering before timing anything
+        assert [t["name"] for t in index.top(args.count)] == [t["name"] for t in baseline_top(tasks, args.count)]
+
+        base = timeit(lambda: baseline_top(tasks, args.count), repeat)
+        fast = timeit(lambda: index.top(args.count), repeat * 20)
+
+        # Incremental update cost (e.g. mark_done / due date change)
+        rng = random.Random(1)
+        ids = [rng.randrange(n) for _ in range(1000)]
+        start = time.perf_counter()
+        for task_id in ids:
+            task = dict(tasks[task_id], due_date=(datetime.now() + timedelta(days=rng.randint(0, 60))).strftime("%Y-%m-%d"))
+            index.upsert(task_id, task)
+            tasks[task_id] = task
+        upsert = (time.perf_counter() - start) / len(ids)
+        assert [t["name"] for t in index.top(args.count)] == [t["name"] for t in baseline_top(tasks, args.count)]
+
+        print(f"{n:>10,} | {base * 1e3:>9.2f} ms | {fast * 1e6:>9.1f} us | {base / fast:>7.0f}x | "
+              f"{build:>7.2f} s | {upsert * 1e6:>7.1f} us")
+
+
+if __name__ == "__main__":
+    main()
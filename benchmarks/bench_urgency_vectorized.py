@@ -0,0 +1,119 @@
+"""
+Benchmark: vectorized (NumPy) urgency scoring vs the scalar per-task path
+
+Checks parity with task_store.urgency() on the existing scoring rules first
+(every tag weight, unknown tags, done, overdue, due today, far future), then
+times top-10 and a 7-day what-if plan.
+
+Usage:
+    python benchmarks/bench_urgency_vectorized.py
+    python benchmarks/bench_urgency_vectorized.py --sizes 10000 100000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from task_store import urgency
+from time_depends_tasks import TAG_WEIGHTS
+from urgency_vectorized import TaskColumns
+
+TAGS = ["hw", "paper_review", "meeting", "office_hour", "research", "other", "unknown_tag"]
+
+
+def make_tasks(n, seed=0):
+    rng = random.Random(seed)
+    today = datetime.now()
+    return [
+        {
+            "name": f"task {i}",
+            "tag": rng.choice(TAGS),
+            "due_date": (today + timedelta(days=rng.randint(-30, 365))).strftime("%Y-%m-%d"),
+            "done": rng.random() < 0.2,
+            "created_at": today.isoformat(),
+        }
+        for i in range(n)
+    ]
+
+
+def check_parity():
+    """Vectorized scores and ordering must match the scalar rules exactly"""
+    now = datetime.now()
+    tasks = make_tasks(5000, seed=42)
+    for tag in TAGS:
+        for days in (-400, -1, 0, 1, 2, 30):
+            for done in (False, True):
+                tasks.append({"name": f"{tag} {days} {done}", "tag": tag, "done": done,
+                              "due_date": (now + timedelta(days=days)).strftime("%Y-%m-%d")})
+    tasks.append({"name": "untagged", "due_date": now.strftime("%Y-%m-%d")})
+
+    columns = TaskColumns(tasks, TAG_WEIGHTS)
+    scalar = np.array([urgency(t, now, TAG_WEIGHTS) for t in tasks])
+    assert np.allclose(columns.scores(now), scalar, rtol=1e-12, atol=1e-9)
+
+    for count in (1, 10, 100, len(tasks)):
+        expected = sorted(range(len(tasks)), key=lambda i: scalar[i], reverse=True)[:count]
+        assert [t["name"] for t in columns.top(count, now)] == [tasks[i]["name"] for i in expected]
+
+    # What-if rows equal scoring at each reference time separately
+    times = [now + timedelta(days=i) for i in range(7)]
+    batch = columns.scores_at(times)
+    for row, when in zip(batch, times):
+        assert np.allclose(row, [urgency(t, when, TAG_WEIGHTS) for t in tasks], rtol=1e-12, atol=1e-9)
+
+    print("✓ parity with scalar urgency rules")
+
+
+def scalar_top(tasks, count):
+    now = datetime.now()
+    scored = [(t, urgency(t, now, TAG_WEIGHTS)) for t in tasks]
+    scored.sort(key=lambda x: x[1], reverse=True)
+    return [t for t, _ in scored[:count]]
+
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    check_parity()
+    print()
+    print(f"{'tasks':>10} | {'scalar top10':>12} | {'numpy top10':>12} | {'speedup':>8} | "
+          f"{'scalar 7-day':>12} | {'numpy 7-day':>12} | {'snapshot':>9}")
+    print("-" * 95)
+
+    for n in args.sizes:
+        tasks = make_tasks(n)
+        repeat = 2 if n >= 1_000_000 else 5
+        week = [datetime.now() + timedelta(days=i) for i in range(7)]
+
+        snapshot = best_of(lambda: TaskColumns(tasks, TAG_WEIGHTS), 1)
+        columns = TaskColumns(tasks, TAG_WEIGHTS)
+
+        scalar = best_of(lambda: scalar_top(tasks, 10), repeat)
+        vector = best_of(lambda: columns.top(10), repeat * 4)
+        scalar_week = scalar * len(week)  # the scalar path has to rescore per reference time
+        vector_week = best_of(lambda: columns.scores_at(week), repeat)
+
+        print(f"{n:>10,} | {scalar * 1e3:>9.1f} ms | {vector * 1e3:>9.2f} ms | {scalar / vector:>7.0f}x | "
+              f"{scalar_week * 1e3:>9.0f} ms | {vector_week * 1e3:>9.1f} ms | {snapshot:>7.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,148 @@
+import threading
+import time
 import yaml
+from string import Formatter
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
 from datetime import datetime
 from typing import Dict, Any, List
 
+from context_budget import KEEP_MODES, describe_cuts, fit_context
+from context_cache import ContextCache, cache_key
+from context_providers import dependency_token, get_provider
+from file_watch import FileWatcher
+from tool_registry import TOOLS, schemas
+
+# Seconds a provider may take before its stale value (or a placeholder) is used;
+# override per provider with timeout_seconds in the YAML
+DEFAULT_PROVIDER_TIMEOUT = 3.0
+
 class ContextManager:
-    """Manages context gathering and caching"""
+    """
+    Manages context gathering and caching
+
+    Provider functions come from the context_providers registry. A cached value
+    is reused until one of the provider's declared dependencies (files, date)
+    changes; providers without dependencies fall back to cache_seconds.
+
+    Providers that need refreshing run concurrently on a thread pool, so a
+    prompt waits for the slowest provider instead of the sum of all of them.
+    A provider that times out or fails falls back to its last cached value
+    (stale-while-revalidate): the call keeps running and refreshes the cache
+    for the next prompt.
+
+    Values with a dependency token are also kept in the shared on-disk cache
+    (context_cache.py), so a fresh process starts warm when another process
+    already computed the same version.
+    """
     
-    def __init__(self, config: dict):
+    def __init__(self, config: dict, shared_cache: ContextCache = None):
         self.providers = config.get("context_providers", {})
+        self.shared_cache = shared_cache if shared_cache is not None else ContextCache()
         self.cache = {}
         self.cache_timestamps = {}
+        self.cache_versions = {}
+        self.generations = {}   # name -> counter bumped on every new cached value
+        self.timings = {}       # name -> {"source": cache/disk/fresh/stale/timeout/error, "ms": ...}
+        self._inflight = {}     # name -> Future of a running provider call
+        self._resolved = {}     # name -> registry entry, so modules are imported once
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max(4, len(self.providers)), thread_name_prefix="context")
+
+    def update_providers(self, providers: dict):
+        """Swap in new provider definitions, dropping cached values of the ones that changed"""
+        with self._lock:
+            for name in set(self.providers) | set(providers):
+                if self.providers.get(name) != providers.get(name):
+                    for cache in (self.cache, self.cache_timestamps, self.cache_versions, self._resolved):
+                        cache.pop(name, None)
+            self.providers = providers
+
+    def _resolve(self, name: str):
+        """Registry entry for a configured provider (imports its module on first use)"""
+        if name not in self._resolved:
+            provider = self.providers[name]
+            self._resolved[name] = get_provider(provider["function"], provider.get("module"))
+        return self._resolved[name]
+
+    def _is_fresh(self, name: str, provider: dict, version, current_time: float) -> bool:
+        """Cache check: by dependency token if the provider declares one, else by age"""
+        if name not in self.cache:
+            return False
+        if version is not None:
+            return self.cache_versions.get(name) == version
+        return current_time - self.cache_timestamps[name] < provider.get("cache_seconds", 0)
+
+    def _call_provider(self, name: str, version):
+        """
+        Run one provider function (on a pool thread), or read its output from
+        the shared cache
+
+        Returns:
+            (value, source) - source is "fresh" or "disk"
+        """
+        provider = self.providers[name]
+        registered = self._resolve(name)
+        if registered is None:
+            return f"[Unknown function: {provider['function']}]", "fresh"
+
+        args = provider.get("args", [])
+        key = cache_key(provider["function"], args, version) if version is not None else None
+        if key is not None:
+            cached = self.shared_cache.get(key)
+            if cached is not None:
+                return cached, "disk"
+
+        result = registered["func"](*args)
+        if key is not None and isinstance(result, str):
+            self.shared_cache.put(key, result)
+        return result, "fresh"
+
+    def _refresh(self, name: str, version):
+        """Start (or join) a provider call; the result is cached when it finishes"""
+        with self._lock:
+            future = self._inflight.get(name)
+            if future is not None:
+                return future
+
+            def run():
+                started = time.perf_counter()
+                try:
+                    result, source = self._call_provider(name, version)
+                except Exception:
+                    with self._lock:
+                        self._inflight.pop(name, None)
+                        self.timings[name] = {"source": "error", "ms": (time.perf_counter() - started) * 1000}
+                    raise
+                with self._lock:
+                    self._inflight.pop(name, None)
+                    self.cache[name] = result
+                    self.cache_timestamps[name] = datetime.now().timestamp()
+                    self.cache_versions[name] = version
+                    self.generations[name] = generation = self.generations.get(name, 0) + 1
+                    self.timings[name] = {"source": source, "ms": (time.perf_counter() - started) * 1000}
+                return result, generation
+
+            future = self._pool.submit(run)
+            self._inflight[name] = future
+            return future
     
     def get_context(self, context_names: List[str]) -> Dict[str, str]:
-        """Gather requested context, using cache when valid"""
+        """Gather requested context, using cache when valid and refreshing the rest in parallel"""
+        return self.gather(context_names)[0]
+
+    def gather(self, context_names: List[str]):
+        """
+        Like get_context, also returning which version of each value was served
+
+        Returns:
+            (context dict, tuple of generations in context_names order - None
+            for a placeholder that was never cached)
+        """
         context = {}
+        generations = {}
         current_time = datetime.now().timestamp()
+        started = time.perf_counter()
+        pending = {}
         
         for name in context_names:
             if name not in self.providers:
@@ -21,82 +150,293 @@ class ContextManager:
                 continue
             
             provider = self.providers[name]
-            cache_seconds = provider.get("cache_seconds", 0)
-            
-            # Check cache
-            if name in self.cache:
-                cache_age = current_time - self.cache_timestamps[name]
-                if cache_age < cache_seconds:
+            try:
+                registered = self._resolve(name)
+                version = dependency_token(registered) if registered else None
+            except Exception as e:
+                print(f"⚠️  Error checking {name} dependencies: {e}")
+                version = None
+
+            if self._is_fresh(name, provider, version, current_time):
+                with self._lock:
                     context[name] = self.cache[name]
-                    continue
-            
-            # Call provider function
-            func_name = provider["function"]
-            args = provider.get("args", [])
+                    generations[name] = self.generations.get(name)
+                self.timings[name] = {"source": "cache", "ms": 0.0}
+            else:
+                pending[name] = self._refresh(name, version)
 
+        # All calls are already running; each one only gets its own timeout
+        for name, future in pending.items():
+            timeout = self.providers[name].get("timeout_seconds", DEFAULT_PROVIDER_TIMEOUT)
             try:
-                # Import functions dynamically to avoid circular imports
-                from tool import get_datetime_context, get_conversation_summary, read_instructions, get_paper_template
-                from time_depends_tasks import get_tasks_summary
-                from agent_log import get_recent_logs
-
-                # Call your actual functions
-                if func_name == "get_datetime_context":
-                    result = get_datetime_context()
-                elif func_name == "get_tasks_summary":
-                    result = get_tasks_summary()
-                elif func_name == "get_recent_logs":
-                    result = get_recent_logs(*args)
-                elif func_name == "read_instructions":
-                    result = read_instructions()
-                elif func_name == "get_conversation_summary":
-                    result = get_conversation_summary(*args)
-                elif func_name == "get_paper_template":
-                    result = get_paper_template()
-                else:
-                    result = f"[Unknown function: {func_name}]"
-                
-                # Cache result
-                self.cache[name] = result
-                self.cache_timestamps[name] = current_time
-                context[name] = result
-                
+                context[name], generations[name] = future.result(
+                    timeout=max(0.0, timeout - (time.perf_counter() - started))
+                )
+                continue
+            except TimeoutError:
+                source = "timeout"
+                print(f"⚠️  {name} took longer than {timeout}s")
+                error = f"[{name} unavailable: timed out]"
             except Exception as e:
+                source = "error"
                 print(f"⚠️  Error getting {name}: {e}")
-                context[name] = f"[Error: {e}]"
+                error = f"[Error: {e}]"
+
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            if source == "error":
+                elapsed_ms = self.timings.get(name, {}).get("ms", elapsed_ms)
+
+            # Stale-while-revalidate: serve the last value, a running call keeps refreshing it
+            with self._lock:
+                if name in self.cache:
+                    context[name] = self.cache[name]
+                    generations[name] = self.generations.get(name)
+                    source = "stale"
+                else:
+                    context[name] = error
+            self.timings[name] = {"source": source, "ms": elapsed_ms}
+
+        if pending:
+            total_ms = (time.perf_counter() - started) * 1000
+            details = []
+            for name in pending:
+                timing = self.timings[name]
+                note = "" if timing["source"] == "fresh" else f" ({timing['source']})"
+                details.append(f"{name} {timing['ms']:.0f}ms{note}")
+            print(f"⏱️  Context in {total_ms:.0f}ms: {', '.join(details)}")
         
-        return context
+        return context, tuple(generations.get(name) for name in context_names)
+
+
+class PromptTemplate:
+    """
+    str.format template compiled once into (literal, field) segments
+
+    Rendering is a single join over the segments. A missing context value
+    leaves only its own {placeholder} in place instead of dropping every
+    substitution.
+    """
+
+    _formatter = Formatter()
+
+    def __init__(self, template: str):
+        self.template = template
+        self.segments = list(self._formatter.parse(template))
+        self.fields = [field for _, field, _, _ in self.segments if field is not None]
+
+    def render(self, context: Dict[str, Any]) -> str:
+        parts = []
+        for literal, field, format_spec, conversion in self.segments:
+            parts.append(literal)
+            if field is None:
+                continue
+            try:
+                value, _ = self._formatter.get_field(field, (), context)
+            except (KeyError, AttributeError, IndexError):
+                print(f"⚠️  Missing context variable in prompt: {field}")
+                parts.append("{" + field + "}")
+                continue
+            if conversion:
+                value = self._formatter.convert_field(value, conversion)
+            parts.append(format(value, format_spec) if format_spec else str(value))
+        return "".join(parts)
+
+
+def validate_config(config: dict) -> Dict[str, PromptTemplate]:
+    """
+    Check an agents config and compile its prompts
+
+    Returns:
+        {agent name: PromptTemplate}
+
+    Raises:
+        ValueError listing every problem found
+    """
+    if not isinstance(config, dict):
+        raise ValueError("config must be a mapping")
+
+    problems = []
+    models = config.get("models") or {}
+    providers = config.get("context_providers") or {}
+    agents = config.get("agents") or {}
+    if not agents:
+        problems.append("no agents defined")
+
+    def check_budget(where, value):
+        if value is not None and (not isinstance(value, int) or isinstance(value, bool) or value <= 0):
+            problems.append(f"{where}: must be a positive number of tokens, got {value!r}")
+
+    check_budget("context_budget", config.get("context_budget"))
+    for name, provider in providers.items():
+        if not isinstance(provider, dict) or not provider.get("function"):
+            problems.append(f"context provider {name}: missing function")
+            continue
+        check_budget(f"context provider {name}: max_tokens", provider.get("max_tokens"))
+        if provider.get("keep", "head") not in KEEP_MODES:
+            problems.append(f"context provider {name}: keep must be one of {', '.join(KEEP_MODES)}")
+        if not isinstance(provider.get("priority", 0), int):
+            problems.append(f"context provider {name}: priority must be a number")
+
+    templates = {}
+    for name, agent in agents.items():
+        if not isinstance(agent, dict):
+            problems.append(f"agent {name}: must be a mapping")
+            continue
+        if agent.get("model") not in models:
+            problems.append(f"agent {name}: unknown model {agent.get('model')!r}")
+        check_budget(f"agent {name}: context_budget", agent.get("context_budget"))
+        if not isinstance(agent.get("prompt"), str):
+            problems.append(f"agent {name}: missing prompt")
+            continue
+        needs = agent.get("context_needs", [])
+        for need in needs:
+            if need not in providers:
+                problems.append(f"agent {name}: unknown context {need!r}")
+        try:
+            template = PromptTemplate(agent["prompt"])
+        except ValueError as e:
+            problems.append(f"agent {name}: bad prompt template ({e})")
+            continue
+        for field in template.fields:
+            if field not in needs:
+                problems.append(f"agent {name}: prompt uses {{{field}}} which is not in context_needs")
+        templates[name] = template
+
+    if problems:
+        raise ValueError("; ".join(problems))
+    return templates
 
 
 class AgentConfig:
+    """
+    Agent definitions from agents_config.yaml, hot-reloaded when the file changes
+
+    Every get_agent() call checks the file (one stat). A changed file is parsed,
+    validated and swapped in atomically; an invalid edit is reported and the
+    previous config stays active. Runs already started keep the prompt, model
+    and tools they were given, new runs see the new config. Only agents whose
+    definition changed get their template recompiled and render cache dropped.
+
+    Context values are fitted to the token budgets (context_budget.py) before
+    rendering; sections that were cut are logged when the cut changes.
+
+    Each agent's tool schema array is built once from the tool registry
+    (the first time the agent is used, so tool.py has registered everything)
+    and handed out as-is until that agent's definition changes.
+    """
+
     def __init__(self, config_path="agents.yaml"):
+        self.config_path = config_path
+        self._reload_lock = threading.Lock()
+        self._watcher = FileWatcher([config_path])
+
         with open(config_path) as f:
-            self.config = yaml.safe_load(f)
-        
-        self.context_manager = ContextManager(self.config)
+            config = yaml.safe_load(f)
+
+        # (config, compiled templates), replaced as a whole on reload. Templates
+        # are compiled once; the last render per agent is reused while every
+        # context value it used is the same version
+        self._snapshot = (config, validate_config(config))
+        self._rendered = {}  # agent name -> (context generations, prompt, template)
+        self._tool_schemas = {}  # agent name -> list of tool schemas for the chat API
+        self._budget_cuts = {}  # agent name -> last logged cut summary
+
+        self.context_manager = ContextManager(config)
+
+    @property
+    def config(self) -> dict:
+        return self._snapshot[0]
+
+    @property
+    def templates(self) -> Dict[str, PromptTemplate]:
+        return self._snapshot[1]
+
+    def reload(self) -> bool:
+        """Re-read the config file if it changed, returns True if a new config was swapped in"""
+        with self._reload_lock:
+            if not self._watcher.changed():
+                return False
+            self._watcher.acknowledge()
+
+            try:
+                with open(self.config_path) as f:
+                    config = yaml.safe_load(f)
+                templates = validate_config(config)
+            except (OSError, yaml.YAMLError, ValueError) as e:
+                print(f"⚠️  Keeping previous agent config, {self.config_path} is invalid: {e}")
+                return False
+
+            # Unchanged agents keep their compiled template and rendered prompt
+            old_agents = self.config["agents"]
+            changed = {name for name, agent in config["agents"].items() if old_agents.get(name) != agent}
+            for name in set(config["agents"]) - changed:
+                templates[name] = self.templates[name]
+            if (config.get("context_providers"), config.get("context_budget")) != \
+                    (self.config.get("context_providers"), self.config.get("context_budget")):
+                # Budgets or providers changed: every rendered prompt may differ
+                self._rendered = {}
+            else:
+                self._rendered = {k: v for k, v in self._rendered.items() if k in config["agents"] and k not in changed}
+            self._tool_schemas = {k: v for k, v in self._tool_schemas.items() if k in config["agents"] and k not in changed}
+
+            self.context_manager.update_providers(config.get("context_providers", {}))
+            self._snapshot = (config, templates)
+
+        print(f"🔄 Reloaded agent config ({len(changed)} agent(s) changed: {', '.join(sorted(changed)) or 'none'})")
+        return True
     
     def get_agent(self, name: str) -> dict:
         """Get agent config with context injected into prompt"""
-        agent = self.config["agents"][name]
+        self.reload()
+        # One consistent snapshot for this call, even if another thread reloads
+        config, templates = self._snapshot
+        agent = config["agents"][name]
         
         # Gather context
         context_needs = agent.get("context_needs", [])
-        context = self.context_manager.get_context(context_needs)
-        
-        
-        # Inject context into prompt using .format()
-        try:
-            rendered_prompt = agent["prompt"].format(**context)
-        except KeyError as e:
-            print(f"⚠️  Missing context variable in prompt: {e}")
-            rendered_prompt = agent["prompt"]
+        context, generations = self.context_manager.gather(context_needs)
+
+        rendered_prompt = self._cached_prompt(name, generations, templates[name])
+        if rendered_prompt is None:
+            budget = agent.get("context_budget", config.get("context_budget"))
+            context, cuts = fit_context(context, config.get("context_providers") or {}, budget)
+            if cuts and describe_cuts(cuts) != self._budget_cuts.get(name):
+                print(f"✂️  {name} context cut to fit the budget: {describe_cuts(cuts)}")
+            self._budget_cuts[name] = describe_cuts(cuts) if cuts else None
+            rendered_prompt = templates[name].render(context)
+            # Placeholders (errors, timeouts) have no version, don't cache them
+            if None not in generations:
+                self._rendered[name] = (generations, rendered_prompt, templates[name])
         
         return {
-            "model": self.config["models"][agent["model"]],
+            "model": config["models"][agent["model"]],
             "system_prompt": rendered_prompt,
-            "tools": agent.get("tools", []),
+            "tools": list(agent.get("tools", [])),
+            "tool_schemas": self._agent_tool_schemas(name, agent),
             "role": agent.get("role", "")
         }
+
+    def _cached_prompt(self, name: str, generations: tuple, template: PromptTemplate):
+        """Last rendered prompt of an agent, if no context value it used has changed since (else None)"""
+        cached = self._rendered.get(name)
+        if cached and cached[0] == generations and cached[2] is template:
+            return cached[1]
+        return None
+
+    def _agent_tool_schemas(self, name: str, agent: dict) -> List[dict]:
+        """Tool schemas for an agent, in the order listed in the YAML (shared, don't modify)"""
+        cached = self._tool_schemas.get(name)
+        if cached is None:
+            names = agent.get("tools", [])
+            # An empty registry means tool.py isn't loaded (yet): don't warn,
+            # and don't cache, so the list is built once the tools register
+            if not TOOLS:
+                return schemas(names)
+            missing = [tool for tool in names if tool not in TOOLS]
+            if missing:
+                print(f"⚠️  {name}: no registered tool named {', '.join(missing)}")
+            cached = self._tool_schemas[name] = schemas(names)
+        return cached
     
     def list_agents(self) -> dict:
         """Show all agents and their roles"""
@@ -104,4 +444,3 @@ class AgentConfig:
             name: config["role"] 
             for name, config in self.config["agents"].items()
         }
-    
\ No newline at end of file
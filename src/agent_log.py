@@ -6,6 +6,8 @@ Logs daily activities like task creation, paper tracking, etc.
 import os
 from datetime import datetime, timedelta
 
+from context_providers import context_provider
+
 LOG_FILE = "/Users/xiaofanlu/Documents/github_repos/hackathon-umass/memory/agent_activity.log"
 
 def log_activity(summary, files_changed=None):
@@ -38,6 +40,8 @@ def log_activity(summary, files_changed=None):
 
     return log_entry
 
+# Output changes when the log is appended to, and as entries age out by day
+@context_provider(files=lambda: [LOG_FILE], key=lambda: datetime.now().date())
 def get_recent_logs(days=7):
     """
     Get logs from the last X days
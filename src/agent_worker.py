@@ -0,0 +1,424 @@
+"""
+Long-lived agent worker process
+
+The menu bar process (background_handler_simple.py) only listens for hotkeys
+and shows dialogs. Agent requests run in a separate process that is started
+once, keeps the OpenRouter client, agent config, context cache and TTS model
+loaded, and answers requests over a pipe:
+
+    worker = AgentWorker()
+    worker.start()                              # spawn + warm up in the background
+    result = worker.submit("text", "> plan my week")   # blocks this thread only
+
+Health:
+- the worker bumps a shared heartbeat every second; no heartbeat for
+  HUNG_SECONDS means the interpreter is frozen and it gets killed
+- it also records when the running request started; a request still
+  running after MAX_REQUEST_SECONDS (its caller's timeout plus a grace
+  period to honour the cancel sent on timeout) is stuck on a dead stream or
+  a blocked tool, and the worker is killed too
+- a crash, kill or recycle is noticed on the pipe (EOF); requests that were
+  running fail with RuntimeError and the worker is respawned (with backoff
+  if it keeps dying right after start)
+- after a request, a worker whose peak RSS passed MAX_RSS_MB exits and is
+  replaced by a fresh one
+
+Cancellation: submit(..., cancel=token) forwards token.cancel() to the worker,
+which fires the request's own CancelToken there (closing the HTTP stream and
+flushing TTS), or skips the request if it hasn't started yet (submit then
+returns None). A request whose submit() times out is cancelled the same way,
+so it doesn't hold up the requests queued behind it.
+
+prewarm() asks the worker to open a connection to the LLM API (hotkey dialog
+opened: a request is likely coming).
+
+Progress: submit(..., progress=callback) gets the run's progress events
+(manager tools, delegated workers' text and tools; see
+manager_agent.iter_worker_agent) as they happen, on the reader thread.
+"""
+
+import itertools
+import multiprocessing
+import os
+import queue
+import resource
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import Future, TimeoutError
+
+HEARTBEAT_SECONDS = 1.0
+HUNG_SECONDS = 30.0
+MONITOR_SECONDS = 5.0
+MAX_RSS_MB = 2048
+REQUEST_TIMEOUT = 600.0
+# A request running longer than this is stuck (it ignored the cancel sent on timeout)
+MAX_REQUEST_SECONDS = REQUEST_TIMEOUT + 30.0
+# How long a request waits for a worker that is being respawned
+RESPAWN_WAIT = 90.0
+
+# Respawn delay by number of consecutive quick deaths (worker up < QUICK_DEATH_SECONDS)
+RESPAWN_BACKOFF = [0, 1, 2, 5, 10, 30, 60]
+QUICK_DEATH_SECONDS = 10.0
+
+
+def _peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS, kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _handlers():
+    """Request kind -> function(*args, cancel=CancelToken, progress=callback), run inside the worker"""
+    import manager_agent
+    return {
+        "text": manager_agent.shortcut_text,
+        "screenshot": manager_agent.shortcut_screenshot,
+    }
+
+
+def _warmup():
+    """Load everything the first request would otherwise wait for"""
+    import manager_agent
+    from tool_acknowledgements import render_acknowledgements
+    from tts_pipeline import get_tts_pipeline
+
+    manager_agent.warmup()
+    get_tts_pipeline()
+    render_acknowledgements()
+
+
+def _worker_main(conn, heartbeat, busy_since):
+    """Worker process entry point: warm up, then serve requests until EOF or recycle"""
+    from request_scheduler import CancelToken
+
+    def beat():
+        while True:
+            heartbeat.value = time.time()
+            time.sleep(HEARTBEAT_SECONDS)
+
+    threading.Thread(target=beat, daemon=True, name="heartbeat").start()
+
+    started = time.perf_counter()
+    try:
+        _warmup()
+    except Exception as e:
+        print(f"⚠️  Agent worker warmup failed: {e}")
+    handlers = _handlers()
+    conn.send(("ready", os.getpid(), (time.perf_counter() - started) * 1000))
+
+    # A reader thread keeps the pipe drained so cancel messages arrive while a
+    # request is running
+    requests = queue.Queue()
+    tokens = {}  # request id -> CancelToken, queued or running
+    tokens_lock = threading.Lock()
+    # Progress events come from tool threads too (parallel delegations)
+    send_lock = threading.Lock()
+
+    def send(message):
+        with send_lock:
+            conn.send(message)
+
+    def read():
+        while True:
+            try:
+                message = conn.recv()
+            except (EOFError, OSError):
+                message = None
+            if message is None:
+                requests.put(None)
+                return
+            request_id, kind, args = message
+            if kind == "prewarm":
+                from http_client import prewarm_async
+                prewarm_async()
+                continue
+            if kind == "cancel":
+                with tokens_lock:
+                    token = tokens.get(request_id)
+                if token is not None:
+                    token.cancel()
+                continue
+            with tokens_lock:
+                tokens[request_id] = CancelToken()
+            requests.put(message)
+
+    threading.Thread(target=read, daemon=True, name="agent-worker-requests").start()
+
+    while True:
+        message = requests.get()
+        if message is None:
+            break
+
+        request_id, kind, args = message
+        with tokens_lock:
+            token = tokens[request_id]
+        if token.is_set():
+            # Cancelled while queued: don't run it at all
+            with tokens_lock:
+                tokens.pop(request_id, None)
+            send((request_id, "cancelled", None))
+            continue
+
+        def progress(event, request_id=request_id):
+            try:
+                send((request_id, "progress", event))
+            except (OSError, ValueError):
+                pass
+
+        busy_since.value = time.time()
+        try:
+            reply = (request_id, "ok", handlers[kind](*args, cancel=token, progress=progress))
+        except Exception as e:
+            traceback.print_exc()
+            reply = (request_id, "error", f"{type(e).__name__}: {e}")
+        finally:
+            busy_since.value = 0.0
+            with tokens_lock:
+                tokens.pop(request_id, None)
+        send(reply)
+
+        rss = _peak_rss_mb()
+        if rss > MAX_RSS_MB:
+            print(f"♻️  Agent worker reached {rss:.0f} MB, recycling")
+            break
+
+
+class AgentWorker:
+    """Client side: owns the worker process, respawns it, routes replies to callers"""
+
+    def __init__(self):
+        self._ctx = multiprocessing.get_context("spawn")
+        self._lock = threading.Lock()
+        self._spawned = threading.Condition(self._lock)
+        self._send_lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._pending = {}  # request id -> (Future, process it was sent to, progress callback)
+        self._process = None
+        self._conn = None
+        self._heartbeat = None
+        self._busy_since = None
+        self._started_at = 0.0
+        self._quick_deaths = 0
+        self._monitor = None
+        self._stopped = False
+        self.restarts = 0
+
+    def start(self):
+        """Spawn the worker (if not running) and the health monitor"""
+        with self._lock:
+            self._stopped = False
+            if self._process is None:
+                self._spawn()
+            if self._monitor is None:
+                self._monitor = threading.Thread(target=self._monitor_loop, daemon=True, name="agent-worker-monitor")
+                self._monitor.start()
+
+    def _spawn(self):
+        """Start a new worker process (caller holds _lock)"""
+        parent_conn, child_conn = self._ctx.Pipe()
+        heartbeat = self._ctx.Value("d", time.time(), lock=False)
+        # Start time of the running request, 0 while idle
+        busy_since = self._ctx.Value("d", 0.0, lock=False)
+        process = self._ctx.Process(
+            target=_worker_main, args=(child_conn, heartbeat, busy_since), daemon=True, name="agent-worker"
+        )
+        process.start()
+        child_conn.close()
+
+        self._process, self._conn, self._heartbeat = process, parent_conn, heartbeat
+        self._busy_since = busy_since
+        self._started_at = time.time()
+        self._spawned.notify_all()
+        threading.Thread(
+            target=self._read_loop, args=(process, parent_conn), daemon=True, name="agent-worker-reader"
+        ).start()
+        print(f"🚀 Agent worker starting (pid {process.pid})")
+
+    def _read_loop(self, process, conn):
+        """Deliver replies from one worker process; respawn when it goes away"""
+        while True:
+            try:
+                request_id, status, value = conn.recv()
+            except (EOFError, OSError):
+                break
+            if request_id == "ready":
+                print(f"✅ Agent worker ready (pid {status}, warmed up in {value:.0f}ms)")
+                continue
+            if status == "progress":
+                with self._lock:
+                    entry = self._pending.get(request_id)
+                if entry is not None and entry[2] is not None:
+                    try:
+                        entry[2](value)
+                    except Exception as e:
+                        print(f"⚠️  Progress callback failed: {e}")
+                continue
+            with self._lock:
+                entry = self._pending.pop(request_id, None)
+            if entry is None:
+                continue
+            if status == "ok":
+                entry[0].set_result(value)
+            elif status == "cancelled":
+                entry[0].set_result(None)
+            else:
+                entry[0].set_exception(RuntimeError(value))
+
+        conn.close()
+        process.join(timeout=5)
+        self._on_exit(process)
+
+    def _on_exit(self, process):
+        with self._lock:
+            lost = [rid for rid, (_, sent_to, _) in self._pending.items() if sent_to is process]
+            futures = [self._pending.pop(rid)[0] for rid in lost]
+            if process is not self._process or self._stopped:
+                delay = None
+            else:
+                uptime = time.time() - self._started_at
+                # Exit code 0 is a planned recycle, not a crash
+                crashed = process.exitcode != 0 and uptime < QUICK_DEATH_SECONDS
+                self._quick_deaths = self._quick_deaths + 1 if crashed else 0
+                delay = RESPAWN_BACKOFF[min(self._quick_deaths, len(RESPAWN_BACKOFF) - 1)]
+
+        for future in futures:
+            future.set_exception(RuntimeError(f"Agent worker exited (code {process.exitcode}) during the request"))
+        if delay is None:
+            return
+
+        print(f"🔁 Agent worker exited (code {process.exitcode}), restarting in {delay}s")
+        time.sleep(delay)
+        with self._lock:
+            if process is self._process and not self._stopped:
+                self.restarts += 1
+                self._spawn()
+
+    def _monitor_loop(self):
+        """Kill a worker that is frozen or stuck on a request; the reader thread then respawns it"""
+        while not self._stopped:
+            time.sleep(MONITOR_SECONDS)
+            with self._lock:
+                process, heartbeat, busy_since = self._process, self._heartbeat, self._busy_since
+            if process is None or not process.is_alive():
+                continue
+            now = time.time()
+            silent = now - heartbeat.value
+            if silent > HUNG_SECONDS:
+                print(f"⚠️  Agent worker silent for {silent:.0f}s, killing pid {process.pid}")
+                process.kill()
+                continue
+            started = busy_since.value
+            if started and now - started > MAX_REQUEST_SECONDS:
+                print(f"⚠️  Agent worker stuck on a request for {now - started:.0f}s, killing pid {process.pid}")
+                process.kill()
+
+    def submit(self, kind, *args, timeout=REQUEST_TIMEOUT, cancel=None, progress=None):
+        """
+        Run a request in the worker and wait for its result
+
+        Args:
+            kind: "text" (text) or "screenshot" (image_base64, comment)
+            cancel: optional CancelToken; cancelling it cancels the request in
+                    the worker, which then returns early
+            progress: optional progress(event), called on the reader thread
+
+        Returns:
+            the handler's result, or None if the request was cancelled before
+            it started
+
+        Raises:
+            RuntimeError if the request failed, or the worker died while running
+            it (or could not be restarted within RESPAWN_WAIT)
+            concurrent.futures.TimeoutError after `timeout` seconds (the
+            request is cancelled in the worker)
+        """
+        if self._process is None:
+            self.start()
+
+        future = Future()
+        deadline = time.time() + RESPAWN_WAIT
+        while True:
+            with self._lock:
+                process, conn = self._process, self._conn
+                if not process.is_alive():
+                    # Being respawned: wait for the next worker
+                    self._spawned.wait_for(lambda: self._process is not process, deadline - time.time())
+                    if self._process is process:
+                        raise RuntimeError("Agent worker is down and did not restart in time")
+                    continue
+                request_id = next(self._ids)
+                self._pending[request_id] = (future, process, progress)
+
+            try:
+                # Outside _lock: a large screenshot can block until the worker reads it
+                with self._send_lock:
+                    conn.send((request_id, kind, args))
+                break
+            except (OSError, ValueError):
+                # Died between the check and the send; retry on its replacement
+                with self._lock:
+                    self._pending.pop(request_id, None)
+
+        remove = lambda: None
+        if cancel is not None:
+            remove = cancel.on_cancel(lambda: self._send_cancel(conn, request_id))
+        try:
+            return future.result(timeout=timeout)
+        except TimeoutError:
+            # The worker runs one request at a time: don't leave it busy
+            self._send_cancel(conn, request_id)
+            raise
+        finally:
+            remove()
+            with self._lock:
+                self._pending.pop(request_id, None)
+
+    def prewarm(self):
+        """Have the worker open an LLM API connection now (no-op if it isn't running)"""
+        with self._lock:
+            process, conn = self._process, self._conn
+        if process is None or not process.is_alive():
+            return
+        try:
+            with self._send_lock:
+                conn.send((0, "prewarm", None))
+        except (OSError, ValueError):
+            pass
+
+    def _send_cancel(self, conn, request_id):
+        try:
+            with self._send_lock:
+                conn.send((request_id, "cancel", None))
+        except (OSError, ValueError):
+            # Worker already gone; its requests fail on their own
+            pass
+
+    def status(self):
+        """Health snapshot for logs/menus"""
+        with self._lock:
+            process, heartbeat, busy_since = self._process, self._heartbeat, self._busy_since
+            pending = len(self._pending)
+        alive = process is not None and process.is_alive()
+        running_since = busy_since.value if alive else 0.0
+        return {
+            "alive": alive,
+            "pid": process.pid if process else None,
+            "heartbeat_age": time.time() - heartbeat.value if alive else None,
+            "request_age": time.time() - running_since if running_since else None,
+            "pending": pending,
+            "restarts": self.restarts,
+        }
+
+    def stop(self):
+        """Ask the worker to exit after its current request"""
+        with self._lock:
+            self._stopped = True
+            conn = self._conn
+        if conn is not None:
+            try:
+                with self._send_lock:
+                    conn.send(None)
+            except (OSError, ValueError):
+                pass
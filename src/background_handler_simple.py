@@ -7,6 +7,27 @@ Shortcut 2 (Cmd+Shift+4): Screenshot → Text input → Classify → Append with
 Modes:
 - simple (default): Uses simple_classifier for quick classification
 - agent: Uses manager_agent for full agent system with delegation
+
+Startup only imports what the menu bar icon and hotkeys need. Once the icon
+is up, a background thread pre-imports the classifier and starts the agent
+worker process (--no-warmup to skip), so neither the first dialog nor the
+first request waits on imports.
+
+Agent requests ('>') run in that worker process (agent_worker.py), which
+keeps the client, config and TTS model loaded; a crash or memory growth
+there restarts the worker, never this process. --in-process-agent runs them
+in a thread here instead.
+
+Requests go through a RequestScheduler (request_scheduler.py): a small worker
+pool where notes run ahead of agent runs, only one agent run streams (and
+speaks) at a time, and a repeat of a pending request is dropped. "Cancel
+running requests" in the menu aborts the in-flight stream and its speech.
+
+While an agent request runs, its progress (tool calls, delegated workers)
+is shown next to the menu bar icon.
+
+Opening a hotkey dialog prewarms the LLM API connection (here for notes, in
+the worker for agent requests), so the request starts on a hot socket.
 """
 
 import os
@@ -16,10 +37,20 @@ import threading
 import queue
 import subprocess
 import logging
+import time
 from pynput import keyboard
-from pync import Notifier
 import rumps
 import argparse
+import hashlib
+
+from agent_worker import AgentWorker
+from request_scheduler import RequestScheduler
+
+# Seconds after the icon is up before warming up, so startup itself stays idle
+WARMUP_DELAY = 1.0
+
+# Longest progress text shown next to the menu bar icon
+PROGRESS_CHARS = 28
 
 # Suppress pynput keyboard errors (F11/F12 volume keys cause KeyError)
 # logging.getLogger('pynput').setLevel(logging.CRITICAL)
@@ -28,9 +59,17 @@ import argparse
 class SimpleBackgroundHandler(rumps.App):
     """Background handler with two shortcuts"""
 
-    def __init__(self, mode='simple'):
-        super().__init__("📝" if mode == 'simple' else "🤖")
+    def __init__(self, mode='simple', warmup=True, agent_worker=True):
+        self.icon_text = "📝" if mode == 'simple' else "🤖"
+        super().__init__(self.icon_text)
         self.mode = mode
+        # Agent requests go to a separate warm process (started on warmup or first use)
+        self.agent_worker = AgentWorker() if agent_worker else None
+        self.scheduler = RequestScheduler()
+        self._scheduler_version = None
+        # Latest agent progress (set from worker threads, shown by check_queues)
+        self._progress = None
+        self._shown_progress = None
         self.avatar_path = os.path.abspath(
             "/Users/xiaofanlu/Documents/github_repos/hackathon-umass/avatars/melina 2/melina-cute-256.png"
         )
@@ -46,6 +85,13 @@ class SimpleBackgroundHandler(rumps.App):
         
         mode_name = "Hybrid (Simple Default)"
 
+        self.requests_item = rumps.MenuItem("No requests running")
+        self.menu = [
+            self.requests_item,
+            rumps.MenuItem("Cancel running requests", callback=self.cancel_requests),
+            None,
+        ]
+
         # Queues for both shortcuts
         self.text_queue = queue.Queue()
         self.screenshot_queue = queue.Queue()
@@ -57,6 +103,11 @@ class SimpleBackgroundHandler(rumps.App):
         self.timer = rumps.Timer(self.check_queues, 0.1)
         self.timer.start()
 
+        # rumps timers only fire once the run loop (and the icon) is up
+        if warmup:
+            self.warmup_timer = rumps.Timer(self.start_warmup, WARMUP_DELAY)
+            self.warmup_timer.start()
+
         self.notify("Ready", f"{mode_name} | Cmd+Shift+E: Note | Cmd+Shift+4: Screenshot")
         print(f"✅ Shortcuts ready ({mode_name} mode):")
         print("   Cmd+Shift+E: Quick text note (type 'C' for 40min timer)")
@@ -111,12 +162,58 @@ class SimpleBackgroundHandler(rumps.App):
         
         threading.Thread(target=listener.start, daemon=True).start()
 
+    def start_warmup(self, _):
+        """One-shot timer callback: warm up on a daemon thread"""
+        self.warmup_timer.stop()
+        threading.Thread(target=self.warmup, daemon=True, name="warmup").start()
+
+    def warmup(self):
+        """Pre-import the modules the first request would otherwise load"""
+
+        def classifier():
+            import simple_classifier
+
+        def agent():
+            import manager_agent
+            manager_agent.warmup()
+
+        def audio():
+            import tts_pipeline
+            tts_pipeline.load_audio_modules()
+
+        if self.agent_worker:
+            # The worker warms itself up; this process only needs the classifier
+            self.agent_worker.start()
+            steps = (("classifier", classifier),)
+        else:
+            steps = (("classifier", classifier), ("agent", agent), ("audio", audio))
+
+        timings = []
+        for name, step in steps:
+            started = time.perf_counter()
+            try:
+                step()
+                timings.append(f"{name} {(time.perf_counter() - started) * 1000:.0f}ms")
+            except Exception as e:
+                timings.append(f"{name} failed ({e})")
+        print(f"🔥 Warmed up: {', '.join(timings)}")
+
     def check_queues(self, _):
         """Check both queues on main thread"""
 
+        if self.scheduler.version != self._scheduler_version:
+            self._scheduler_version = self.scheduler.version
+            self.update_requests_item()
+
+        progress = self._progress
+        if progress != self._shown_progress:
+            self._shown_progress = progress
+            self.title = f"{self.icon_text} {progress[:PROGRESS_CHARS]}" if progress else self.icon_text
+
         # Check text queue
         try:
             self.text_queue.get_nowait()
+            self.prewarm_connections()
             print("💬 Showing text input dialog...")
             text = self.show_input_dialog("Enter your notes:")
             if text and text.strip():
@@ -127,12 +224,93 @@ class SimpleBackgroundHandler(rumps.App):
         # Check screenshot queue
         try:
             screenshot = self.screenshot_queue.get_nowait()
+            self.prewarm_connections()
             print("💬 Showing screenshot comment dialog...")
             comment = self.show_input_dialog("Add comment for screenshot (optional):")
             self.process_screenshot(screenshot, comment)
         except queue.Empty:
             pass
 
+    def prewarm_connections(self):
+        """A dialog is opening: connect to the LLM API while the user types"""
+        if self.agent_worker:
+            self.agent_worker.prewarm()
+
+        def prewarm_here():
+            # Lazy import (httpx)
+            from http_client import prewarm
+            prewarm()
+
+        threading.Thread(target=prewarm_here, daemon=True, name="prewarm").start()
+
+    def update_requests_item(self):
+        """Show what the scheduler is running in the menu"""
+        snapshot = self.scheduler.snapshot()
+        running, queued = snapshot["running"], snapshot["queued"]
+        if not running and not queued:
+            self.requests_item.title = "No requests running"
+            return
+        title = ", ".join(f"▶ {r.label[:30]}" for r in running)
+        if queued:
+            title += f" (+{len(queued)} queued)"
+        self.requests_item.title = title.strip()
+
+    def cancel_requests(self, _):
+        """Menu callback: cancel queued and running requests"""
+        cancelled = self.scheduler.cancel()
+        print(f"✖ Cancelled {cancelled} request(s)")
+
+    def submit_request(self, kind, key, message, label, func):
+        """
+        Queue func(cancel) on the scheduler
+
+        Args:
+            kind: "note" or "agent"
+            key: identity of the request; a repeat of a pending one is dropped
+            message, label: "processing" notification text
+        """
+        request, coalesced = self.scheduler.submit(kind, key, label, func, done=self._request_done)
+        if coalesced:
+            self.notify("Already queued", label)
+        else:
+            self.notify(message, label)
+
+    def _request_done(self, request, result, error):
+        if request.kind == "agent":
+            self._progress = None
+        if error == "Cancelled":
+            self.notify("✖ Cancelled", request.label)
+        elif error:
+            self.notify("Error", error)
+        else:
+            self.notify(f"✅ Saved to {result['target']}", "Click to open", open_path=result['file'])
+
+    def _run_agent(self, kind, *args, cancel=None):
+        """Run an agent request in the worker process (or here with --in-process-agent)"""
+        if self.agent_worker:
+            return self.agent_worker.submit(kind, *args, cancel=cancel, progress=self._agent_progress)
+        # Lazy import
+        import manager_agent
+        handler = manager_agent.shortcut_text if kind == "text" else manager_agent.shortcut_screenshot
+        return handler(*args, cancel=cancel, progress=self._agent_progress)
+
+    def _agent_progress(self, event):
+        """Progress event of the running agent request (any thread)"""
+        agent = event["agent"]
+        prefix = "" if agent == "manager" else f"{agent}: "
+        kind = event["type"]
+        if kind == "start":
+            status = f"🚀 {agent}"
+        elif kind == "tool_start":
+            status = f"{prefix}🔧 {event['tool']}"
+        elif kind == "tool_result":
+            status = f"{prefix}✓ {event['tool']}"
+        elif kind == "text":
+            status = f"{prefix}✍️ writing"
+        else:
+            status = f"✅ {agent}"
+        self._progress = status
+
     def show_input_dialog(self, prompt_text):
         """Show AppleScript input dialog"""
         applescript = f'''
@@ -239,18 +417,18 @@ class SimpleBackgroundHandler(rumps.App):
             # Check for Agent Mode (starts with >)
             if text.strip().startswith('>'):
                 real_text = text.strip()[1:].strip()
-                self.notify("Processing (Agent)...", real_text[:50])
-                # Lazy import
-                from manager_agent import shortcut_text as agent_text
-                result = agent_text(real_text)
+                self.submit_request(
+                    "agent", ("text", real_text), "Processing (Agent)...", real_text[:50],
+                    lambda cancel: self._run_agent("text", real_text, cancel=cancel)
+                )
             else:
                 # Default: Simple Mode
-                self.notify("Processing (Simple)...", text[:50])
-                # Lazy import
-                from simple_classifier import shortcut_text as simple_text
-                result = simple_text(text)
-            
-            self.notify(f"✅ Saved to {result['target']}", "Click to open", open_path=result['file'])
+                def simple_note(cancel):
+                    # Lazy import
+                    from simple_classifier import shortcut_text as simple_text
+                    return simple_text(text)
+
+                self.submit_request("note", ("text", text), "Processing (Simple)...", text[:50], simple_note)
 
         except Exception as e:
             print(f"❌ Error: {e}")
@@ -269,21 +447,27 @@ class SimpleBackgroundHandler(rumps.App):
     def _process_screenshot_async(self, screenshot_base64, comment):
         """Async screenshot processing"""
         try:
+            # Same image + comment = same request (key stays small for the scheduler)
+            digest = hashlib.blake2b(f"{screenshot_base64}\0{comment or ''}".encode(), digest_size=16).hexdigest()
+
             # Check for Agent Mode (comment starts with >)
             if comment and comment.strip().startswith('>'):
                 real_comment = comment.strip()[1:].strip()
-                self.notify("Processing screenshot (Agent)...", real_comment[:50])
-                # Lazy import
-                from manager_agent import shortcut_screenshot as agent_screenshot
-                result = agent_screenshot(screenshot_base64, real_comment)
+                self.submit_request(
+                    "agent", ("screenshot", digest), "Processing screenshot (Agent)...", real_comment[:50] or "Screenshot",
+                    lambda cancel: self._run_agent("screenshot", screenshot_base64, real_comment, cancel=cancel)
+                )
             else:
                 # Default: Simple Mode
-                self.notify("Processing screenshot (Simple)...", comment[:50] if comment else "")
-                # Lazy import
-                from simple_classifier import shortcut_screenshot as simple_screenshot
-                result = simple_screenshot(screenshot_base64, comment or "")
-                
-            self.notify(f"✅ Saved to {result['target']}", "Click to open", open_path=result['file'])
+                def simple_note(cancel):
+                    # Lazy import
+                    from simple_classifier import shortcut_screenshot as simple_screenshot
+                    return simple_screenshot(screenshot_base64, comment or "")
+
+                self.submit_request(
+                    "note", ("screenshot", digest), "Processing screenshot (Simple)...",
+                    comment[:50] if comment else "Screenshot", simple_note
+                )
 
         except Exception as e:
             print(f"❌ Error: {e}")
@@ -375,6 +559,16 @@ Shortcuts:
         default='simple',
         help='Processing mode: simple (fast classifier) or agent (full agent system)'
     )
+    parser.add_argument(
+        '--no-warmup',
+        action='store_true',
+        help="Don't pre-import the classifier/agent/audio modules after startup"
+    )
+    parser.add_argument(
+        '--in-process-agent',
+        action='store_true',
+        help="Run agent requests in a thread of this process instead of the agent worker process"
+    )
 
     args = parser.parse_args()
 
@@ -395,7 +589,11 @@ Shortcuts:
 
 Starting...
 """)
-    SimpleBackgroundHandler(mode='simple').run()
+    SimpleBackgroundHandler(
+        mode='simple',
+        warmup=not args.no_warmup,
+        agent_worker=not args.in_process_agent
+    ).run()
 
 
 if __name__ == "__main__":
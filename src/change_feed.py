@@ -0,0 +1,112 @@
+"""
+Change feed for the task store
+
+- version(): monotonically increasing number, shared by all processes through
+  a small sentinel file next to the store (e.g. memory/tasks.db.version)
+- publish(): bump the version after a write and notify in-process subscribers
+- subscribe(): callback(version, change) on every change, local or external
+- poll() / watch(): deliver changes made by other processes (a cheap file
+  read, or a background thread blocked on file_watch.FileWatcher)
+
+Consumers cache by version instead of by TTL: if version() is unchanged,
+nothing was written and nothing needs recomputing.
+"""
+
+import fcntl
+import os
+import threading
+
+from file_watch import FileWatcher
+
+
+class ChangeFeed:
+    """Version counter + pub/sub over a sentinel file"""
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.RLock()
+        self._subscribers = []
+        self._delivered = self.version()
+        self._watch_thread = None
+
+    def version(self):
+        """Current version (0 before the first write)"""
+        try:
+            with open(self.path) as f:
+                return int(f.read() or 0)
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def publish(self, **change):
+        """
+        Record a committed write: bump the version and notify subscribers
+
+        Args:
+            change: free-form details passed to subscribers (e.g. kind, names)
+
+        Returns:
+            the new version
+        """
+        with self._lock, open(self.path + ".lock", "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            version = self.version() + 1
+            # Replace, never rewrite in place, so readers don't see a partial number
+            tmp = f"{self.path}.tmp.{os.getpid()}"
+            with open(tmp, "w") as f:
+                f.write(str(version))
+            os.replace(tmp, self.path)
+
+        self._deliver(version, change)
+        return version
+
+    def subscribe(self, callback):
+        """
+        Call callback(version, change) on every change
+
+        Returns:
+            function that removes the subscription
+        """
+        with self._lock:
+            self._subscribers.append(callback)
+
+        def unsubscribe():
+            with self._lock:
+                if callback in self._subscribers:
+                    self._subscribers.remove(callback)
+
+        return unsubscribe
+
+    def poll(self):
+        """Deliver a change made by another process, returns True if there was one"""
+        version = self.version()
+        if version == self._delivered:
+            return False
+        self._deliver(version, {"kind": "external"})
+        return True
+
+    def watch(self):
+        """Start a daemon thread that delivers external changes as they happen"""
+        with self._lock:
+            if self._watch_thread is None:
+                self._watch_thread = threading.Thread(target=self._watch_loop, daemon=True)
+                self._watch_thread.start()
+
+    def _watch_loop(self):
+        watcher = FileWatcher([self.path])
+        while True:
+            watcher.wait()
+            self.poll()
+
+    def _deliver(self, version, change):
+        with self._lock:
+            if version <= self._delivered:
+                return
+            self._delivered = version
+            subscribers = list(self._subscribers)
+
+        for callback in subscribers:
+            try:
+                callback(version, change)
+            except Exception as e:
+                print(f"⚠️  Change subscriber failed: {e}")
@@ -0,0 +1,133 @@
+"""
+Token budgets for prompt context
+
+Context values are estimated with a local heuristic (no tokenizer download,
+no API call) and cut on line boundaries when they exceed their budget:
+
+- max_tokens per provider (agents_config.yaml, context_providers)
+- context_budget for everything an agent inlines (top level, or per agent)
+
+Over the total budget, the lowest `priority` sections are cut first. `keep`
+says which end of a section survives: head (tasks, most urgent first), tail
+(logs and conversation, newest last) or ends (append-only files like
+user_instruction.md: the original header plus the newest entries).
+"""
+
+import re
+from functools import lru_cache
+
+DEFAULT_PRIORITY = 50
+KEEP_MODES = ("head", "tail", "ends")
+CUT_MARKER = "[... {lines} line(s) cut to fit the context budget ...]"
+
+# Word chunks of up to 6 characters plus single punctuation marks: roughly a
+# BPE token count for English prose, markdown and paths
+_PIECES = re.compile(r"\w{1,6}|[^\w\s]")
+
+
+@lru_cache(maxsize=256)
+def estimate_tokens(text):
+    """Approximate token count of `text`"""
+    return len(_PIECES.findall(text))
+
+
+def _marker(lines):
+    return CUT_MARKER.format(lines=lines)
+
+
+@lru_cache(maxsize=64)
+def truncate(text, max_tokens, keep="head"):
+    """
+    Cut whole lines from `text` until it fits in max_tokens
+
+    The cut lines are replaced by a one-line marker (counted in the budget).
+
+    Returns:
+        (text, estimated tokens)
+    """
+    tokens = estimate_tokens(text)
+    if tokens <= max_tokens:
+        return text, tokens
+
+    lines = text.split("\n")
+    costs = [estimate_tokens(line) for line in lines]
+    budget = max_tokens - estimate_tokens(_marker(len(lines)))
+
+    def take(indices, budget):
+        kept, used = [], 0
+        for i in indices:
+            if used + costs[i] > budget:
+                break
+            kept.append(i)
+            used += costs[i]
+        return kept, used
+
+    head = tail = []
+    if keep == "head":
+        head, _ = take(range(len(lines)), budget)
+    elif keep == "tail":
+        tail, _ = take(range(len(lines) - 1, -1, -1), budget)
+    else:
+        head, used = take(range(len(lines)), budget // 3)
+        tail, _ = take(range(len(lines) - 1, len(head) - 1, -1), budget - used)
+
+    cut = len(lines) - len(head) - len(tail)
+    kept = [lines[i] for i in head] + [_marker(cut)] + [lines[i] for i in reversed(tail)]
+    result = "\n".join(kept)
+    return result, estimate_tokens(result)
+
+
+def fit_context(context, providers, total=None):
+    """
+    Apply per-provider max_tokens, then the total budget
+
+    Args:
+        context: {provider name: value} as gathered by ContextManager
+        providers: context_providers section of the agents config
+        total: token budget for all values together (None = unlimited)
+
+    Returns:
+        (fitted context, {name: (tokens before, tokens after)} for every cut section)
+    """
+    fitted, tokens, cuts = {}, {}, {}
+    for name, value in context.items():
+        if not isinstance(value, str):
+            fitted[name], tokens[name] = value, 0
+            continue
+        settings = providers.get(name) or {}
+        before = estimate_tokens(value)
+        limit = settings.get("max_tokens")
+        if limit is not None and before > limit:
+            value, after = truncate(value, limit, settings.get("keep", "head"))
+            cuts[name] = (before, after)
+        else:
+            after = before
+        fitted[name], tokens[name] = value, after
+
+    over = sum(tokens.values()) - total if total is not None else 0
+    if over > 0:
+        # Lowest priority first; among equals, the largest section first
+        order = sorted(
+            (name for name in fitted if tokens[name]),
+            key=lambda n: ((providers.get(n) or {}).get("priority", DEFAULT_PRIORITY), -tokens[n]),
+        )
+        for name in order:
+            if over <= 0:
+                break
+            settings = providers.get(name) or {}
+            target = max(tokens[name] - over, 0)
+            value, after = truncate(fitted[name], target, settings.get("keep", "head"))
+            if after > tokens[name]:
+                # Too small for even the marker: nothing left to cut
+                continue
+            before = cuts.get(name, (tokens[name],))[0]
+            over -= tokens[name] - after
+            fitted[name], tokens[name] = value, after
+            cuts[name] = (before, after)
+
+    return fitted, cuts
+
+
+def describe_cuts(cuts):
+    """One-line log text, e.g. 'instructions 5120→2000, recent_logs 900→310 tokens'"""
+    return ", ".join(f"{name} {before}→{after}" for name, (before, after) in sorted(cuts.items())) + " tokens"
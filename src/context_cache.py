@@ -0,0 +1,129 @@
+"""
+Persistent context cache shared by every process
+
+ContextManager keeps provider results in memory; this SQLite file keeps them
+across restarts and between processes (manager_agent, background handler
+threads, the experiment UI), so the first prompt after a restart reuses the
+summaries another process already computed.
+
+Entries are keyed by provider function + args + dependency token (file
+content hashes, date), so an entry can never be stale: when an input changes
+the key changes, and the old entry just ages out. Least recently used
+entries are evicted once the file holds more than max_bytes of values.
+Providers without declared dependencies (cache_seconds) are not stored.
+
+Any SQLite error is reported once and treated as a miss: the cache only
+ever saves work.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+CONTEXT_CACHE_DB = "/Users/xiaofanlu/Documents/github_repos/hackathon-umass/memory/context_cache.db"
+MAX_BYTES = 4 * 1024 * 1024
+
+# Hits refresh used_at at most this often, so reads rarely take the write lock
+TOUCH_SECONDS = 60
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS context_cache (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    used_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_context_cache_used ON context_cache(used_at);
+"""
+
+
+def cache_key(function, args, version):
+    """Key for one provider output (version = dependency token)"""
+    return hashlib.blake2b(repr((function, list(args), version)).encode(), digest_size=16).hexdigest()
+
+
+class ContextCache:
+    """LRU key/value store in SQLite (WAL, safe for concurrent processes)"""
+
+    def __init__(self, path=CONTEXT_CACHE_DB, max_bytes=MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._conn = None
+        self._lock = threading.Lock()
+        self._failed = False
+
+    def _connect(self):
+        # Opened on first use: importing agent_loader shouldn't touch the disk
+        if self._conn is None:
+            if self._failed:
+                raise sqlite3.OperationalError("disabled after an earlier error")
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def _error(self, e):
+        if not self._failed:
+            self._failed = True
+            print(f"⚠️  Context cache unavailable ({self.path}): {e}")
+
+    def get(self, key):
+        """Cached value or None"""
+        try:
+            with self._lock:
+                conn = self._connect()
+                row = conn.execute("SELECT value, used_at FROM context_cache WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    return None
+                now = time.time()
+                if now - row[1] > TOUCH_SECONDS:
+                    with conn:
+                        conn.execute("UPDATE context_cache SET used_at = ? WHERE key = ?", (now, key))
+                return row[0]
+        except (sqlite3.Error, OSError) as e:
+            self._error(e)
+            return None
+
+    def put(self, key, value):
+        """Store a value, then evict least recently used entries over max_bytes"""
+        size = len(value.encode())
+        if size > self.max_bytes:
+            return
+        try:
+            with self._lock:
+                conn = self._connect()
+                with conn:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO context_cache (key, value, size, used_at) VALUES (?, ?, ?, ?)",
+                        (key, value, size, time.time()),
+                    )
+                    conn.execute(
+                        """
+                        DELETE FROM context_cache WHERE key IN (
+                            SELECT key FROM (
+                                SELECT key, SUM(size) OVER (ORDER BY used_at DESC, key) AS total
+                                FROM context_cache
+                            ) WHERE total > ?
+                        )
+                        """,
+                        (self.max_bytes,),
+                    )
+        except (sqlite3.Error, OSError) as e:
+            self._error(e)
+
+    def stats(self):
+        """{"entries": n, "bytes": total size of values}"""
+        try:
+            with self._lock:
+                count, total = self._connect().execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM context_cache"
+                ).fetchone()
+            return {"entries": count, "bytes": total}
+        except (sqlite3.Error, OSError) as e:
+            self._error(e)
+            return {"entries": 0, "bytes": 0}
@@ -0,0 +1,80 @@
+"""
+Registry of prompt context providers
+
+Provider functions register themselves with @context_provider and declare
+what their output is derived from. ContextManager (agent_loader.py) finds
+them by the `function` name given in agents_config.yaml (importing the
+provider's `module` once) and reuses a cached value until one of those
+dependencies changes, instead of expiring it on a wall-clock TTL.
+
+    @context_provider(files=lambda: [INSTRUCTION_FILE])
+    def read_instructions():
+        ...
+"""
+
+import hashlib
+import importlib
+import os
+import time
+
+PROVIDERS = {}
+_hashes = {}  # path -> ((inode, mtime, size), content hash)
+
+# Files modified this recently are re-hashed on every check: two writes within
+# the mtime granularity can leave (mtime, size) unchanged
+RACY_SECONDS = 2.0
+
+
+def context_provider(files=None, key=None):
+    """
+    Register a context provider function under its own name
+
+    Args:
+        files: callable returning the paths the output is read from
+        key: callable returning anything else the output depends on
+             (e.g. today's date for "days left" text)
+    """
+    def decorator(func):
+        PROVIDERS[func.__name__] = {"func": func, "files": files, "key": key}
+        return func
+    return decorator
+
+
+def get_provider(function, module=None):
+    """Registered provider for `function`, importing `module` first if needed"""
+    if function not in PROVIDERS and module:
+        importlib.import_module(module)
+    return PROVIDERS.get(function)
+
+
+def file_signature(path):
+    """Content hash of a file (re-read only when its stat changes), None if missing"""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+
+    stat = (st.st_ino, st.st_mtime_ns, st.st_size)
+    cached = _hashes.get(path)
+    # Re-hash only when the stat changed, or while the file is too fresh to trust it
+    if cached is None or cached[0] != stat or time.time() - st.st_mtime < RACY_SECONDS:
+        with open(path, "rb") as f:
+            cached = (stat, hashlib.blake2b(f.read(), digest_size=16).hexdigest())
+        _hashes[path] = cached
+    return cached[1]
+
+
+def dependency_token(provider):
+    """
+    Token that changes whenever a declared dependency changes
+
+    Returns:
+        None if the provider declares no dependencies (fall back to cache_seconds)
+    """
+    if provider["files"] is None and provider["key"] is None:
+        return None
+    files = provider["files"]() if provider["files"] else []
+    return (
+        tuple(file_signature(path) for path in files),
+        provider["key"]() if provider["key"] else None,
+    )
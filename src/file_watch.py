@@ -0,0 +1,104 @@
+"""
+Minimal file watcher (no extra dependencies)
+
+Blocks until one of the watched paths changes, using kqueue vnode events on
+macOS so an idle watcher costs no CPU. Other platforms fall back to a cheap
+stat() check once a second (development only).
+
+Usage:
+    watcher = FileWatcher([TASKS_DB, TASKS_DB + "-wal"])
+    while True:
+        if watcher.wait(timeout=60):
+            reload()
+"""
+
+import os
+import select
+import sys
+import time
+
+HAS_KQUEUE = hasattr(select, "kqueue")
+# macOS O_EVTONLY: open for event notification only, doesn't block unmounts
+_OPEN_FLAGS = 0x8000 if sys.platform == "darwin" else os.O_RDONLY
+
+
+def _signature(paths):
+    """(inode, mtime, size) per path - changes on write, replace and delete"""
+    sig = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+            sig.append((st.st_ino, st.st_mtime_ns, st.st_size))
+        except FileNotFoundError:
+            sig.append(None)
+    return tuple(sig)
+
+
+class FileWatcher:
+    """Waits for changes to a fixed set of files (missing files are fine)"""
+
+    def __init__(self, paths):
+        self.paths = list(paths)
+        # Watch the parent directories too, so created/replaced files are seen
+        self._dirs = sorted({os.path.dirname(os.path.abspath(p)) for p in self.paths})
+        self.seen = _signature(self.paths)
+
+    def changed(self):
+        """True if anything changed since the last acknowledged state"""
+        return _signature(self.paths) != self.seen
+
+    def acknowledge(self):
+        self.seen = _signature(self.paths)
+
+    def wait(self, timeout=None):
+        """
+        Block until a watched file changes or `timeout` seconds pass
+
+        Returns:
+            True if something changed (the new state is acknowledged)
+        """
+        if not self.changed():
+            if HAS_KQUEUE:
+                self._wait_kqueue(timeout)
+            else:
+                self._wait_stat(timeout)
+
+        if self.changed():
+            self.acknowledge()
+            return True
+        return False
+
+    def _wait_kqueue(self, timeout):
+        kq = select.kqueue()
+        fds = []
+        try:
+            for path in self.paths + self._dirs:
+                try:
+                    fds.append(os.open(path, _OPEN_FLAGS))
+                except OSError:
+                    continue
+
+            fflags = (select.KQ_NOTE_WRITE | select.KQ_NOTE_EXTEND | select.KQ_NOTE_DELETE
+                      | select.KQ_NOTE_RENAME | select.KQ_NOTE_ATTRIB)
+            events = [
+                select.kevent(fd, filter=select.KQ_FILTER_VNODE,
+                              flags=select.KQ_EV_ADD | select.KQ_EV_CLEAR, fflags=fflags)
+                for fd in fds
+            ]
+            kq.control(events, 0)
+
+            # Re-check after arming so a write between stat and arm is not missed
+            if not self.changed():
+                kq.control(None, 1, timeout)
+        finally:
+            for fd in fds:
+                os.close(fd)
+            kq.close()
+
+    def _wait_stat(self, timeout):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self.changed():
+            remaining = 1.0 if deadline is None else min(1.0, deadline - time.monotonic())
+            if remaining <= 0:
+                return
+            time.sleep(remaining)
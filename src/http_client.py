@@ -0,0 +1,133 @@
+"""
+Shared HTTP and LLM clients
+
+Every OpenRouter call (manager/worker agents, simple_classifier, the vision
+tool) and brave_search go through one httpx.Client per process, so requests
+reuse pooled keep-alive connections instead of paying a TCP + TLS handshake
+each time:
+
+    get_llm_client().chat.completions.create(...)   # OpenAI SDK on the shared pool
+    get_http_client().get(url, params=...)           # plain HTTP (Brave)
+    prewarm()                                        # open a socket ahead of a request
+
+- HTTP/2 when the optional `h2` package is installed (one multiplexed
+  connection per host), HTTP/1.1 keep-alive otherwise
+- timeouts: short connect/pool waits, long reads (gaps between streamed
+  chunks), room for screenshot uploads
+- retries: the transport retries failed connects; the OpenAI SDK retries
+  408/409/429/5xx with backoff (LLM_RETRIES)
+- prewarm(): the background handler calls it when a hotkey dialog opens, so
+  the request starts on a hot socket while the user is still typing
+"""
+
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+
+OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
+
+MAX_CONNECTIONS = 20
+MAX_KEEPALIVE_CONNECTIONS = 10
+# Idle pooled connections are closed after this long
+KEEPALIVE_SECONDS = 120.0
+
+CONNECT_TIMEOUT = 5.0
+READ_TIMEOUT = 120.0
+WRITE_TIMEOUT = 30.0
+POOL_TIMEOUT = 10.0
+
+CONNECT_RETRIES = 2
+LLM_RETRIES = 2
+
+# prewarm() skips a host warmed this recently (its connection is still pooled)
+PREWARM_INTERVAL = 30.0
+
+_http_client = None
+_llm_client = None
+_clients_lock = threading.Lock()
+_prewarmed = {}  # host -> time.monotonic() of the last prewarm
+_prewarm_lock = threading.Lock()
+
+
+def http2_available():
+    """HTTP/2 needs the optional h2 package"""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _timeout():
+    import httpx
+    return httpx.Timeout(connect=CONNECT_TIMEOUT, read=READ_TIMEOUT, write=WRITE_TIMEOUT, pool=POOL_TIMEOUT)
+
+
+def get_http_client():
+    """Pooled httpx.Client shared by the whole process (thread-safe singleton)"""
+    global _http_client
+
+    if _http_client is None:
+        with _clients_lock:
+            if _http_client is None:
+                import httpx
+                limits = httpx.Limits(
+                    max_connections=MAX_CONNECTIONS,
+                    max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=KEEPALIVE_SECONDS,
+                )
+                transport = httpx.HTTPTransport(http2=http2_available(), limits=limits, retries=CONNECT_RETRIES)
+                _http_client = httpx.Client(transport=transport, timeout=_timeout())
+
+    return _http_client
+
+
+def get_llm_client():
+    """OpenRouter client (OpenAI SDK) on the shared connection pool (thread-safe singleton)"""
+    global _llm_client
+
+    if _llm_client is None:
+        http_client = get_http_client()
+        with _clients_lock:
+            if _llm_client is None:
+                from openai import OpenAI
+                _llm_client = OpenAI(
+                    base_url=OPENROUTER_BASE_URL,
+                    api_key=os.getenv("OPENROUTER_API_KEY"),
+                    http_client=http_client,
+                    max_retries=LLM_RETRIES,
+                    timeout=_timeout(),
+                )
+
+    return _llm_client
+
+
+def prewarm(url=OPENROUTER_BASE_URL):
+    """
+    Open a pooled connection to url's host (handshake done, socket kept alive)
+
+    Returns:
+        True if a request was made, False if skipped (warmed recently) or failed
+    """
+    host = urlsplit(url).netloc
+    now = time.monotonic()
+    with _prewarm_lock:
+        if now - _prewarmed.get(host, float("-inf")) < PREWARM_INTERVAL:
+            return False
+        _prewarmed[host] = now
+
+    try:
+        # Any response will do (even 404): the connection goes back to the pool
+        get_http_client().head(url, timeout=CONNECT_TIMEOUT)
+        return True
+    except Exception as e:
+        with _prewarm_lock:
+            _prewarmed.pop(host, None)
+        print(f"⚠️  Prewarm of {host} failed: {e}")
+        return False
+
+
+def prewarm_async(url=OPENROUTER_BASE_URL):
+    """prewarm() on a daemon thread"""
+    threading.Thread(target=prewarm, args=(url,), daemon=True, name="prewarm").start()
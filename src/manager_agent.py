@@ -8,31 +8,149 @@ This script implements a manager/worker agent architecture:
 - Supports text, image, and voice (TTS) inputs
 """
 
-import os
 import json
 import gc
-from openai import OpenAI
+import threading
 from dotenv import load_dotenv
 from tool import *
 from agent_loader import AgentConfig
-import re
+from http_client import get_llm_client, prewarm
+from tool_executor import iter_tool_calls
+from stream_accumulator import StreamAccumulator
+from tool_acknowledgements import ToolAcknowledger
+import time
 import warnings
-from tts_pipeline import queue_tts
+from tts_pipeline import queue_tts, flush_tts
 
 # Suppress warnings
 warnings.filterwarnings('ignore')
 
 load_dotenv()
 
-client = OpenAI(
-    base_url="https://openrouter.ai/api/v1",
-    api_key=os.getenv("OPENROUTER_API_KEY"),
-)
+# Created on first use (openai import + YAML parse), not at import: the
+# background handler imports this module from a hotkey thread
+_agent_config = None
+_lazy_lock = threading.Lock()
 
-# Load agent config
-agent_config = AgentConfig("src/agents_config.yaml")
-print(agent_config.get_agent("paper_agent")['system_prompt'])
-def run_worker_agent(agent_name, task_description, max_iter=15):
+
+def get_client():
+    """OpenRouter client, shared and pooled (http_client.get_llm_client)"""
+    return get_llm_client()
+
+
+def get_agent_config():
+    """Agent definitions from agents_config.yaml (thread-safe singleton)"""
+    global _agent_config
+
+    if _agent_config is None:
+        with _lazy_lock:
+            if _agent_config is None:
+                _agent_config = AgentConfig("src/agents_config.yaml")
+
+    return _agent_config
+
+
+def warmup():
+    """Create the client and config, open a connection and fill the manager's context cache ahead of the first request"""
+    get_client()
+    prewarm()
+    config = get_agent_config()
+    config.get_agent("manager")
+
+
+class RunCancelled(Exception):
+    """Raised inside an agent run once its cancel token is set"""
+
+
+def _check_cancel(cancel):
+    if cancel is not None and cancel.is_set():
+        raise RunCancelled()
+
+
+def _iter_stream(stream, cancel):
+    """
+    Iterate a streaming completion, aborting it when `cancel` fires
+
+    Cancelling closes the HTTP response, so a run blocked on the next chunk
+    stops right away instead of after the model finishes talking.
+    """
+    if cancel is None:
+        yield from stream
+        return
+
+    remove = cancel.on_cancel(stream.close)
+    try:
+        for chunk in stream:
+            _check_cancel(cancel)
+            yield chunk
+    except RunCancelled:
+        raise
+    except Exception:
+        # Reading a closed stream fails with whatever the HTTP stack raises
+        _check_cancel(cancel)
+        raise
+    finally:
+        remove()
+    _check_cancel(cancel)
+
+
+# Longest tool result carried in a progress event (the full one goes to the model)
+EVENT_RESULT_CHARS = 200
+
+
+def _event(type, agent, **fields):
+    """Progress event: {"type": start|text|tool_start|tool_result|done, "agent": name, ...}"""
+    return {"type": type, "agent": agent, **fields}
+
+
+def _forward(events, progress):
+    """Drain an event generator into progress(event); returns the generator's return value"""
+    while True:
+        try:
+            event = next(events)
+        except StopIteration as stop:
+            return stop.value
+        if progress:
+            progress(event)
+
+
+def _run_tools(tool_calls, run, agent, label="Tool"):
+    """
+    Run the tool calls of one assistant message concurrently (tool_executor)
+
+    Generator: yields a tool_start event per call, then a tool_result event
+    for each call as soon as it finishes (a fast tool isn't held back by a
+    slow delegation in the same message).
+
+    Returns:
+        [(tool_call, result)] in the order the model sent them
+    """
+    calls = []
+    for tc in tool_calls:
+        args = json.loads(tc["function"]["arguments"])
+        print(f"\n🔧 {label}: {tc['function']['name']}({args})")
+        calls.append((tc["function"]["name"], args))
+        yield _event("tool_start", agent, tool=tc["function"]["name"], args=args)
+
+    started = time.perf_counter()
+    outcomes = [None] * len(calls)
+    for index, (result, ms) in iter_tool_calls(calls, run):
+        outcomes[index] = (result, ms)
+        print(f"📤 {calls[index][0]} ({ms:.0f}ms): {result}")
+        yield _event("tool_result", agent, tool=calls[index][0],
+                     result=str(result)[:EVENT_RESULT_CHARS], ms=ms)
+    if len(calls) > 1:
+        wall = (time.perf_counter() - started) * 1000
+        print(f"\n⚡ {len(calls)} tool calls in {wall:.0f}ms (one by one: {sum(ms for _, ms in outcomes):.0f}ms)")
+
+    return [(tc, result) for tc, (result, _) in zip(tool_calls, outcomes)]
+
+
+def _print_delta(text):
+    print(text, end="", flush=True)
+
+
+def run_worker_agent(agent_name, task_description, max_iter=15, cancel=None, progress=None):
     """
     Execute a worker agent with a specific task
 
@@ -40,17 +158,41 @@ def run_worker_agent(agent_name, task_description, max_iter=15):
         agent_name: Name of worker agent (paper_agent, task_agent, session_agent)
         task_description: What the worker should do (includes all context from manager)
         max_iter: Maximum tool call iterations
+        cancel: Optional CancelToken (request_scheduler); raises RunCancelled once set
+        progress: Optional progress(event) for every event of iter_worker_agent
 
     Returns:
         Final result from worker agent
     """
+    result = None
+    for event in iter_worker_agent(agent_name, task_description, max_iter, cancel):
+        if event["type"] == "text":
+            print(event["text"], end="", flush=True)
+        elif event["type"] == "done":
+            result = event["result"]
+        if progress:
+            progress(event)
+    return result
+
+
+def iter_worker_agent(agent_name, task_description, max_iter=15, cancel=None):
+    """
+    Run a worker agent, yielding progress events while it works
+
+    Events (dicts with "type" and "agent"):
+        start       {"task"}
+        text        {"text"} - streamed reply text, delta by delta
+        tool_start  {"tool", "args"}
+        tool_result {"tool", "result" (truncated), "ms"}
+        done        {"result"} - always the last event
+    """
     print(f"\n{'='*60}")
     print(f"🔧 WORKER: {agent_name}")
     print(f"📋 Task: {task_description}")
     print(f"{'='*60}\n")
 
     # Get agent config with minimal context (just datetime from YAML)
-    agent = agent_config.get_agent(agent_name)
+    agent = get_agent_config().get_agent(agent_name)
 
     # Build worker message - simple text only
     user_message = {
@@ -63,50 +205,32 @@ def run_worker_agent(agent_name, task_description, max_iter=15):
         user_message
     ]
     print(f"{agent['system_prompt']}")
-    # Get tool list for this agent
-    agent_tools = []
-    for tool_name in agent.get("tools", []):
-        # Find matching tool definition
-        for tool_def in tools:
-            if tool_def["function"]["name"] == tool_name:
-                agent_tools.append(tool_def)
-                break
+    # Tool list for this agent (precomputed by AgentConfig)
+    agent_tools = agent["tool_schemas"]
 
     print(f"🔨 Worker tools: {[t['function']['name'] for t in agent_tools]}")
+    yield _event("start", agent_name, task=task_description)
 
     # Execute worker agent loop
     for i in range(max_iter):
         print(f"\n--- Worker Iteration {i+1} ---")
+        _check_cancel(cancel)
 
-        stream = client.chat.completions.create(
+        stream = get_client().chat.completions.create(
             model=agent["model"],
             messages=messages,
             tools=agent_tools if agent_tools else None,
             stream=True
         )
 
-        content = ""
-        tool_calls = []
-
-        for chunk in stream:
-            delta = chunk.choices[0].delta
-
-            if delta.content:
-                print(delta.content, end="", flush=True)
-                content += delta.content
-
-            if delta.tool_calls:
-                for tc in delta.tool_calls:
-                    while len(tool_calls) <= tc.index:
-                        tool_calls.append({
-                            "id": "",
-                            "type": "function",
-                            "function": {"name": "", "arguments": ""}
-                        })
-
-                    if tc.id: tool_calls[tc.index]["id"] = tc.id
-                    if tc.function.name: tool_calls[tc.index]["function"]["name"] = tc.function.name
-                    if tc.function.arguments: tool_calls[tc.index]["function"]["arguments"] += tc.function.arguments
+        texts = []
+        acc = StreamAccumulator(on_content=texts.append)
+        for chunk in _iter_stream(stream, cancel):
+            acc.add(chunk)
+            for text in texts:
+                yield _event("text", agent_name, text=text)
+            texts.clear()
+        content, tool_calls = acc.finish()
 
         print()
 
@@ -118,24 +242,26 @@ def run_worker_agent(agent_name, task_description, max_iter=15):
 
         if not tool_calls:
             print(f"\n✅ Worker {agent_name} completed")
-            return content
+            yield _event("done", agent_name, result=content)
+            return
+
+        # Execute tool calls (side by side where safe, results in call order)
+        def run(name, args):
+            _check_cancel(cancel)
+            return execute_tool(name, args)
 
-        # Execute tool calls
-        for tc in tool_calls:
-            args = json.loads(tc["function"]["arguments"])
-            print(f"\n🔧 Tool: {tc['function']['name']}({args})")
-            result = execute_tool(tc["function"]["name"], args)
-            print(f"📤 Result: {result}")
+        results = yield from _run_tools(tool_calls, run, agent_name)
+        for tc, result in results:
             messages.append({
                 "role": "tool",
                 "tool_call_id": tc["id"],
                 "content": str(result)
             })
 
-    return "Worker max iterations reached"
+    yield _event("done", agent_name, result="Worker max iterations reached")
 
 
-def run_manager_agent(task, image_base64=None, max_iter=15):
+def run_manager_agent(task, image_base64=None, max_iter=15, cancel=None, progress=None):
     """
     Run manager agent with delegation support
 
@@ -143,21 +269,38 @@ def run_manager_agent(task, image_base64=None, max_iter=15):
         task: User's task/request
         image_base64: Optional screenshot
         max_iter: Maximum iterations
+        cancel: Optional CancelToken (request_scheduler). Once set, the HTTP
+                stream is closed, no further tools run and this run's
+                queued speech is dropped
+        progress: Optional progress(event) for the manager's tool events and
+                  every event of delegated workers (see iter_worker_agent);
+                  called from tool threads when delegations run side by side
 
     Returns:
-        Final response to user
+        Final response to user ("Cancelled" if cancelled)
 
     Note: Manager handles ALL context (conversation, tasks, logs, instructions).
           When delegating, manager extracts only relevant info for workers.
           Manager can handle simple tasks directly (timers, reminders, file reading).
     """
+    try:
+        return _run_manager_agent(task, image_base64, max_iter, cancel, progress)
+    except RunCancelled:
+        # Only this run's speech: other requests and timers keep talking
+        flush_tts(cancel)
+        print("\n✖ Agent run cancelled")
+        save_conversation(task, "Cancelled by user", "")
+        return "Cancelled"
+
+
+def _run_manager_agent(task, image_base64, max_iter, cancel, progress):
     print(f"\n{'='*60}")
     print(f"🎯 MANAGER AGENT")
     print(f"{'='*60}\n")
 
     # Get manager agent config with FULL context injected
     # Context comes from YAML: datetime, tasks, conversation, recent_logs, instructions
-    manager = agent_config.get_agent("manager")
+    manager = get_agent_config().get_agent("manager")
 
     # Build manager message
     user_message = {
@@ -176,72 +319,35 @@ def run_manager_agent(task, image_base64=None, max_iter=15):
         user_message
     ]
 
-    # Get manager tools
-    manager_tools = []
-    for tool_name in manager.get("tools", []):
-        for tool_def in tools:
-            if tool_def["function"]["name"] == tool_name:
-                manager_tools.append(tool_def)
-                break
+    # Manager tools (precomputed by AgentConfig)
+    manager_tools = manager["tool_schemas"]
 
     print(f"🔨 Manager tools: {[t['function']['name'] for t in manager_tools]}")
 
+    # Says "Tracking that paper now." etc. as soon as a tool call starts streaming
+    acknowledger = ToolAcknowledger(owner=cancel)
+
     # Manager execution loop
     for i in range(max_iter):
         print(f"\n{'='*50}")
         print(f"MANAGER ITER {i+1}")
         print(f"{'='*50}")
+        _check_cancel(cancel)
 
-        stream = client.chat.completions.create(
+        stream = get_client().chat.completions.create(
             model=manager["model"],
             messages=messages,
             tools=manager_tools if manager_tools else None,
             stream=True
         )
 
-        content = ""
-        tool_calls = []
-        tts_buffer = ""  # For TTS streaming
-
-        for chunk in stream:
-            delta = chunk.choices[0].delta
-
-            if delta.content:
-                print(delta.content, end="", flush=True)
-                content += delta.content
-                tts_buffer += delta.content
-
-                # TTS streaming logic (same as streaming_agent.py)
-                sentence_pattern = r'([.!?]+[\s\n]+|[\n]{2,})'
-                matches = list(re.finditer(sentence_pattern, tts_buffer))
-
-                if matches:
-                    last_match = matches[-1]
-                    complete_text = tts_buffer[:last_match.end()].strip()
-
-                    if complete_text and len(complete_text) >= 15:
-                        queue_tts(complete_text)
-                        tts_buffer = tts_buffer[last_match.end():]
-                    elif len(tts_buffer) > 200:
-                        queue_tts(tts_buffer.strip())
-                        tts_buffer = ""
-
-            if delta.tool_calls:
-                for tc in delta.tool_calls:
-                    while len(tool_calls) <= tc.index:
-                        tool_calls.append({
-                            "id": "",
-                            "type": "function",
-                            "function": {"name": "", "arguments": ""}
-                        })
-
-                    if tc.id: tool_calls[tc.index]["id"] = tc.id
-                    if tc.function.name: tool_calls[tc.index]["function"]["name"] = tc.function.name
-                    if tc.function.arguments: tool_calls[tc.index]["function"]["arguments"] += tc.function.arguments
-
-        # Queue remaining TTS
-        if tts_buffer.strip():
-            queue_tts(tts_buffer.strip())
+        # Speaks each sentence as soon as it is complete; finish() queues the rest
+        acc = StreamAccumulator(on_content=_print_delta,
+                                on_sentence=lambda text: queue_tts(text, owner=cancel))
+        acknowledger.watch(acc)
+        for chunk in _iter_stream(stream, cancel):
+            acc.add(chunk)
+        content, tool_calls = acc.finish()
 
         print()
 
@@ -256,13 +362,12 @@ def run_manager_agent(task, image_base64=None, max_iter=15):
             save_conversation(task, msg, "")
             return content
 
-        # Execute tool calls
-        for tc in tool_calls:
-            args = json.loads(tc["function"]["arguments"])
-            print(f"\n🔧 Manager Tool: {tc['function']['name']}({args})")
+        # Execute tool calls (side by side where safe, results in call order)
+        def run(name, args):
+            _check_cancel(cancel)
 
             # Check if this is a delegation
-            if tc["function"]["name"] == "delegate_to_agent":
+            if name == "delegate_to_agent":
                 print(f"\n{'='*60}")
                 print(f"🚀 DELEGATING TO: {args['agent_name']}")
                 print(f"📋 Task: {args['task_description'][:150]}...")
@@ -270,19 +375,23 @@ def run_manager_agent(task, image_base64=None, max_iter=15):
 
                 # Worker gets simple interface: just agent_name + task_description
                 # Manager has already packed all context into task_description
+                started = time.perf_counter()
                 worker_result = run_worker_agent(
                     agent_name=args["agent_name"],
-                    task_description=args["task_description"]
+                    task_description=args["task_description"],
+                    cancel=cancel,
+                    progress=progress
                 )
+                acknowledger.worker_done(args["agent_name"], time.perf_counter() - started)
 
                 result = f"Worker {args['agent_name']} completed. Result:\n{worker_result}"
                 print(f"\n✅ Worker returned: {result[:200]}...")
+                return result
 
-            else:
-                # Normal tool execution
-                result = execute_tool(tc["function"]["name"], args)
-                print(f"📤 Result: {result}")
+            # Normal tool execution
+            return execute_tool(name, args)
 
+        for tc, result in _forward(_run_tools(tool_calls, run, "manager", label="Manager Tool"), progress):
             # Add tool result to messages
             messages.append({
                 "role": "tool",
@@ -303,12 +412,14 @@ def run_manager_agent(task, image_base64=None, max_iter=15):
 
 
 # Shortcuts for background_handler integration
-def shortcut_text(text):
+def shortcut_text(text, cancel=None, progress=None):
     """
     Text-only shortcut for background handler
 
     Args:
         text: User's text input
+        cancel: Optional CancelToken
+        progress: Optional progress(event) callback (see run_manager_agent)
 
     Returns:
         dict: {
@@ -319,7 +430,7 @@ def shortcut_text(text):
             "image": None
         }
     """
-    response = run_manager_agent(text)
+    response = run_manager_agent(text, cancel=cancel, progress=progress)
     return {
         "target": "agent",
         "file": "N/A",  # Manager handles its own file operations
@@ -329,13 +440,15 @@ def shortcut_text(text):
     }
 
 
-def shortcut_screenshot(image_base64, comment=""):
+def shortcut_screenshot(image_base64, comment="", cancel=None, progress=None):
     """
     Screenshot + optional comment shortcut for background handler
 
     Args:
         image_base64: Base64 encoded screenshot
         comment: Optional user comment
+        cancel: Optional CancelToken
+        progress: Optional progress(event) callback (see run_manager_agent)
 
     Returns:
         dict: {
@@ -347,7 +460,7 @@ def shortcut_screenshot(image_base64, comment=""):
         }
     """
     task = comment if comment else "Analyze this screenshot"
-    response = run_manager_agent(task, image_base64=image_base64)
+    response = run_manager_agent(task, image_base64=image_base64, cancel=cancel, progress=progress)
     return {
         "target": "agent",
         "file": "N/A",  # Manager handles its own file operations
@@ -360,7 +473,7 @@ def shortcut_screenshot(image_base64, comment=""):
 def main():
     """Main entry point for testing manager/worker system"""
     print("🎯 Manager/Worker Agent System Ready!")
-    print(f"\nAvailable agents: {list(agent_config.list_agents().keys())}")
+    print(f"\nAvailable agents: {list(get_agent_config().list_agents().keys())}")
 
     print("\nSimple CLI Mode:")
     print("  - Type message: Send text to manager agent")
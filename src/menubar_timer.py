@@ -18,13 +18,36 @@ class CountdownTimer(rumps.App):
         self.end_time = datetime.now() + timedelta(minutes=duration_minutes)
         self.alerted_2min = False
 
+        # Tasks due today, recomputed only when the task change feed moves
+        self.tasks_item = rumps.MenuItem("📋 Tasks")
+        self.menu = [self.tasks_item]
+        self.feed = None
+        try:
+            from time_depends_tasks import get_change_feed
+            self.feed = get_change_feed()
+            self.feed.subscribe(self.refresh_tasks)
+            self.refresh_tasks()
+        except Exception as e:
+            print(f"⚠️  Task feed unavailable: {e}")
+
         # Start countdown
         self.timer = rumps.Timer(self.update_countdown, 1)
         self.timer.start()
 
+    def refresh_tasks(self, version=None, change=None):
+        from time_depends_tasks import query_tasks
+        # Read-only: rollover is left to the processes that write tasks
+        today = datetime.now().strftime("%Y-%m-%d")
+        result = query_tasks(due_from=today, due_to=today, limit=None, auto_update=False)
+        self.tasks_item.title = f"📋 {result.get('count', 0)} tasks due today"
+
     def update_countdown(self, _):
         remaining = self.end_time - datetime.now()
 
+        # Cheap sentinel read; refresh_tasks only runs if another process wrote
+        if self.feed:
+            self.feed.poll()
+
         if remaining.total_seconds() <= 0:
             # Timer complete
             self.title = "✅"
@@ -0,0 +1,160 @@
+"""
+RRULE-style recurrence for meeting/office_hour tasks
+
+A recurring task is stored once per series:
+- due_date: first occurrence (DTSTART)
+- rrule: "FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,WE;UNTIL=2025-12-15" (optional,
+  defaults to weekly on the due_date's weekday)
+- deadline: last allowed date (same as UNTIL, inclusive)
+- done_through: date of the last occurrence marked done (a plain done=True
+  from older records means "the current occurrence is done")
+
+Occurrences are computed on the fly and never written back, so catching up
+after a long gap is O(1) per series.
+"""
+
+from datetime import date, datetime, timedelta
+
+RECURRING_TAGS = ["meeting", "office_hour"]
+WEEKDAYS = ["MO", "TU", "WE", "TH", "FR", "SA", "SU"]
+
+
+def _to_date(value):
+    """Parse YYYY-MM-DD, YYYYMMDD or a full ISO datetime into a date"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    value = value.strip()
+    if len(value) == 8 and value.isdigit():
+        return datetime.strptime(value, "%Y%m%d").date()
+    return datetime.fromisoformat(value).date()
+
+
+def parse_rrule(text):
+    """
+    Parse the supported RRULE subset
+
+    Returns:
+        dict with freq ("WEEKLY"/"DAILY"), interval, byday (weekday ints), until (date or None)
+    """
+    parts = {}
+    for item in (text or "").upper().replace("RRULE:", "").split(";"):
+        if "=" in item:
+            key, value = item.split("=", 1)
+            parts[key.strip()] = value.strip()
+
+    freq = parts.get("FREQ", "WEEKLY")
+    if freq not in ("WEEKLY", "DAILY"):
+        raise ValueError(f"Unsupported FREQ: {freq}")
+
+    interval = int(parts.get("INTERVAL", 1))
+    if interval < 1:
+        raise ValueError("INTERVAL must be >= 1")
+
+    byday = []
+    if parts.get("BYDAY"):
+        for day in parts["BYDAY"].split(","):
+            if day not in WEEKDAYS:
+                raise ValueError(f"Unknown BYDAY value: {day}")
+            byday.append(WEEKDAYS.index(day))
+
+    until = _to_date(parts["UNTIL"]) if parts.get("UNTIL") else None
+    return {"freq": freq, "interval": interval, "byday": sorted(set(byday)), "until": until}
+
+
+def is_recurring(task):
+    return task.get("tag", "other") in RECURRING_TAGS
+
+
+class Series:
+    """Lazy view over the occurrences of one recurring task"""
+
+    def __init__(self, task):
+        rule = parse_rrule(task.get("rrule", ""))
+        self.start = _to_date(task.get("series_start") or task["due_date"])
+        self.freq = rule["freq"]
+        self.interval = rule["interval"]
+        self.byday = rule["byday"] or [self.start.weekday()]
+
+        limits = [d for d in (rule["until"], task.get("deadline")) if d]
+        self.until = min(_to_date(d) for d in limits) if limits else None
+        self.done_through = _to_date(task["done_through"]) if task.get("done_through") else None
+        self.legacy_done = bool(task.get("done"))
+
+    def next_on_or_after(self, day):
+        """First occurrence >= day, or None once the series is over - O(1)"""
+        day = max(_to_date(day), self.start)
+
+        if self.freq == "DAILY":
+            offset = -(-(day - self.start).days // self.interval) * self.interval
+            found = self.start + timedelta(days=offset)
+        else:
+            # Weeks are counted from the Monday of the start week; only every
+            # `interval`-th week is active
+            week0 = self.start - timedelta(days=self.start.weekday())
+            weeks = (day - week0).days // 7
+            week = weeks + (-weeks % self.interval)
+            found = None
+            for w in (week, week + self.interval):
+                for weekday in self.byday:
+                    candidate = week0 + timedelta(days=7 * w + weekday)
+                    if candidate >= day:
+                        found = candidate
+                        break
+                if found:
+                    break
+
+        if self.until and found > self.until:
+            return None
+        return found
+
+    def current(self, now=None):
+        """Occurrence the user should see now: today or later, after done_through"""
+        day = _to_date(now or datetime.now())
+        if self.done_through and self.done_through >= day:
+            day = self.done_through + timedelta(days=1)
+        found = self.next_on_or_after(day)
+        if found and self.legacy_done:
+            found = self.next_on_or_after(found + timedelta(days=1))
+        return found
+
+    def occurrences(self, start, end=None):
+        """Yield occurrences in [start, end] lazily"""
+        day = self.next_on_or_after(start)
+        end = _to_date(end) if end else None
+        while day and (end is None or day <= end):
+            yield day
+            day = self.next_on_or_after(day + timedelta(days=1))
+
+    def project(self, count, now=None):
+        """Next `count` upcoming occurrences, nothing is written"""
+        current = self.current(now)
+        if current is None:
+            return []
+        days = []
+        for day in self.occurrences(current):
+            days.append(day)
+            if len(days) >= count:
+                break
+        return days
+
+
+def expand(task, now=None):
+    """
+    Return the task as the user should see it right now
+
+    For recurring tasks due_date becomes the current occurrence (series_start
+    keeps the stored anchor); exhausted series are returned unchanged.
+    """
+    if not is_recurring(task):
+        return task
+
+    current = Series(task).current(now)
+    if current is None:
+        return task
+    view = dict(task)
+    view["series_start"] = task.get("series_start") or task["due_date"]
+    view["due_date"] = current.strftime("%Y-%m-%d")
+    view["done"] = False
+    return view
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Deadline-driven reminder scheduler
+
+Run as a separate long-lived process:
+    python src/reminder_scheduler.py          # notifications only
+    python src/reminder_scheduler.py --tts    # also speak reminders
+
+- Keeps a heap of reminder instants (due / remind-before) for tasks due in
+  the next HORIZON_DAYS, loaded with an indexed due-date range query
+- Sleeps until the next instant; store writes wake it through a kqueue file
+  watch (file_watch.py), so there is no fixed-interval polling or rescanning
+- Fires a pync notification (and optional TTS) for each reminder
+"""
+
+import argparse
+import heapq
+from datetime import datetime, time, timedelta
+
+from file_watch import FileWatcher
+from recurrence import RECURRING_TAGS, expand
+from time_depends_tasks import get_task_store
+
+HORIZON_DAYS = 3
+DUE_TIME = time(9, 0)                  # date-only due dates are reminded at 9:00
+# Per-tag exceptions: rollover removes hw at the start of its due date, so a
+# date-only hw due date means midnight and its reminders go out the day before
+DUE_TIMES = {"hw": time.min}
+MISSED_GRACE = timedelta(minutes=15)   # still fire reminders we overslept by this much
+
+# Reminder offsets before the due instant, per tag
+REMIND_BEFORE = {
+    "hw": [timedelta(hours=15), timedelta(hours=3)],   # 9:00 and 21:00 the day before
+    "paper_review": [timedelta(0)],
+    "meeting": [timedelta(0)],
+    "office_hour": [timedelta(0)],
+}
+DEFAULT_REMIND_BEFORE = [timedelta(0)]
+MAX_REMIND_BEFORE = max(max(v) for v in REMIND_BEFORE.values())
+
+
+def due_instant(task):
+    """Due date as a datetime; date-only values get their tag's DUE_TIMES entry or DUE_TIME"""
+    due = datetime.fromisoformat(task["due_date"])
+    if len(task["due_date"]) <= 10:
+        due = datetime.combine(due.date(), DUE_TIMES.get(task.get("tag", "other"), DUE_TIME))
+    return due
+
+
+def reminder_text(task, offset):
+    """(title, message) for one reminder"""
+    if offset == timedelta(0):
+        return "📌 Due today", task["name"]
+    if offset >= timedelta(days=1):
+        days = offset.days
+        return f"⏰ Due in {days} day{'s' if days > 1 else ''}", task["name"]
+    if offset >= timedelta(hours=1):
+        return f"⏰ Due in {int(offset.total_seconds() // 3600)} h", task["name"]
+    return f"⏰ Due in {int(offset.total_seconds() // 60)} min", task["name"]
+
+
+class ReminderScheduler:
+    """Heap of upcoming reminders, reloaded only when the task store changes"""
+
+    def __init__(self, store, speak=False, horizon_days=HORIZON_DAYS):
+        self.store = store
+        self.speak = speak
+        self.horizon = timedelta(days=horizon_days)
+        self.horizon_end = None
+        self.heap = []      # (fire_at, seq, key, title, message)
+        self.fired = {}     # key -> fire_at, so reloads don't repeat reminders
+        self._seq = 0
+        self.watcher = FileWatcher(store.watch_paths())
+
+    def _tasks_in_window(self, now):
+        """Pending tasks due inside the horizon, plus current recurring occurrences"""
+        first_day = now.date().isoformat()
+        last_day = (now + self.horizon + MAX_REMIND_BEFORE + timedelta(days=1)).date().isoformat()
+
+        for _, task in self.store.select(done=False, due_after=first_day, due_before=last_day):
+            if task.get("tag", "other") not in RECURRING_TAGS:
+                yield task
+
+        for _, task in self.store.select(tags=RECURRING_TAGS):
+            view = expand(task, now)
+            if first_day <= view["due_date"] < last_day:
+                yield view
+
+    def reload(self, now=None):
+        """Rebuild the heap for [now, now + horizon]"""
+        now = now or datetime.now()
+        self.horizon_end = now + self.horizon
+        self.heap = []
+
+        # Forget fired reminders that can no longer come back
+        self.fired = {k: at for k, at in self.fired.items() if at > now - timedelta(days=1)}
+
+        for task in self._tasks_in_window(now):
+            try:
+                due = due_instant(task)
+            except (KeyError, ValueError):
+                continue
+
+            for offset in REMIND_BEFORE.get(task.get("tag", "other"), DEFAULT_REMIND_BEFORE):
+                fire_at = due - offset
+                key = (task["name"], task["due_date"], offset)
+                if key in self.fired or fire_at < now - MISSED_GRACE or fire_at > self.horizon_end:
+                    continue
+                title, message = reminder_text(task, offset)
+                self._seq += 1
+                self.heap.append((fire_at, self._seq, key, title, message))
+
+        heapq.heapify(self.heap)
+        print(f"🔔 {len(self.heap)} reminders scheduled until {self.horizon_end:%Y-%m-%d %H:%M}")
+
+    def fire(self, title, message):
+        print(f"🔔 {title}: {message}")
+        try:
+            from pync import Notifier
+            Notifier.notify(message, title=title, sound="Glass")
+        except:
+            pass
+
+        if self.speak:
+            try:
+                from tts_pipeline import queue_tts
+                queue_tts(f"{title.split(' ', 1)[-1]}: {message}")
+            except:
+                pass
+
+    def run_once(self, now=None):
+        """Fire everything that is due, returns seconds until the next wake-up"""
+        now = now or datetime.now()
+        while self.heap and self.heap[0][0] <= now:
+            fire_at, _, key, title, message = heapq.heappop(self.heap)
+            self.fired[key] = fire_at
+            self.fire(title, message)
+
+        wake_at = min(self.heap[0][0], self.horizon_end) if self.heap else self.horizon_end
+        return max(0.0, (wake_at - now).total_seconds())
+
+    def run(self):
+        """Block forever: sleep until the next reminder or a store change"""
+        self.reload()
+        while True:
+            timeout = self.run_once()
+            if self.watcher.wait(timeout) or datetime.now() >= self.horizon_end:
+                self.reload()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fire task reminders at their due times")
+    parser.add_argument('--tts', action='store_true', help='Also speak reminders')
+    parser.add_argument('--horizon-days', type=int, default=HORIZON_DAYS,
+                        help='How far ahead reminders are loaded')
+    args = parser.parse_args()
+
+    scheduler = ReminderScheduler(get_task_store(), speak=args.tts, horizon_days=args.horizon_days)
+    try:
+        scheduler.run()
+    except KeyboardInterrupt:
+        print("\n👋 Reminder scheduler stopped")
+
+
+if __name__ == "__main__":
+    main()
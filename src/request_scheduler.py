@@ -0,0 +1,235 @@
+"""
+Request scheduler for the background handler
+
+Every hotkey request (simple note, agent run) is submitted here instead of
+getting its own thread:
+
+- a bounded pool of MAX_WORKERS threads runs requests
+- priority queue: simple notes run ahead of agent runs
+- per-kind limits: at most one agent run at a time (one streaming
+  connection, one voice on the TTS queue); notes still get a free worker
+- coalescing: a request identical to one already queued or running is not
+  run again
+- cancellation: cancel() drops queued requests and fires the CancelToken of
+  running ones, which aborts their HTTP stream and flushes their TTS
+
+    scheduler = RequestScheduler()
+    request, coalesced = scheduler.submit("agent", text, text[:50],
+                                          lambda cancel: run(text, cancel=cancel),
+                                          done=on_done)
+    scheduler.cancel(kind="agent")
+"""
+
+import heapq
+import itertools
+import threading
+import time
+import traceback
+
+MAX_WORKERS = 2
+PRIORITIES = {"note": 0, "agent": 1}  # lower runs first
+LIMITS = {"agent": 1}
+
+
+class CancelToken:
+    """Cancellation flag plus callbacks to run on cancel (e.g. close an HTTP stream)"""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+    def is_set(self):
+        return self._event.is_set()
+
+    def cancel(self):
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"⚠️  Cancel callback failed: {e}")
+
+    def on_cancel(self, callback):
+        """
+        Run callback() on cancel (right away if already cancelled)
+
+        Returns:
+            function that removes the callback
+        """
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+
+                def remove():
+                    with self._lock:
+                        if callback in self._callbacks:
+                            self._callbacks.remove(callback)
+
+                return remove
+        callback()
+        return lambda: None
+
+
+class Request:
+    """One submitted request; state is queued, running, done or cancelled"""
+
+    def __init__(self, request_id, kind, key, label, func, done):
+        self.id = request_id
+        self.kind = kind
+        self.key = key
+        self.label = label
+        self.func = func
+        self.done = done
+        self.cancel_token = CancelToken()
+        self.state = "queued"
+        self.submitted_at = time.time()
+
+
+class RequestScheduler:
+    """Priority queue + bounded worker pool with coalescing and cancellation"""
+
+    def __init__(self, max_workers=MAX_WORKERS, priorities=None, limits=None):
+        self.max_workers = max_workers
+        self.priorities = PRIORITIES if priorities is None else priorities
+        self.limits = LIMITS if limits is None else limits
+        self.version = 0  # bumped on every state change, for UI refresh
+        self._cond = threading.Condition()
+        self._queue = []    # heap of (priority, seq, Request)
+        self._running = {}  # request id -> Request
+        self._by_key = {}   # (kind, key) -> queued or running Request
+        self._ids = itertools.count(1)
+        self._workers = []
+
+    def submit(self, kind, key, label, func, done=None):
+        """
+        Queue func(cancel_token) to run on a worker
+
+        Args:
+            kind: "note", "agent", ... (sets priority and concurrency limit)
+            key: identity for coalescing (e.g. the note text)
+            label: short text for menus/notifications
+            done: done(request, result, error) called on the worker afterwards
+                  (error is None on success, "Cancelled" if cancelled)
+
+        Returns:
+            (Request, coalesced) - coalesced is True if an identical request
+            was already queued or running; that one is returned instead
+        """
+        with self._cond:
+            existing = self._by_key.get((kind, key))
+            if existing is not None and not existing.cancel_token.is_set():
+                return existing, True
+
+            request = Request(next(self._ids), kind, key, label, func, done)
+            heapq.heappush(self._queue, (self.priorities.get(kind, len(self.priorities)), request.id, request))
+            self._by_key[(kind, key)] = request
+            if len(self._workers) < self.max_workers:
+                worker = threading.Thread(target=self._worker_loop, daemon=True, name=f"request-{len(self._workers) + 1}")
+                self._workers.append(worker)
+                worker.start()
+            self._changed()
+        return request, False
+
+    def cancel(self, request_id=None, kind=None):
+        """
+        Cancel queued and running requests (all of them, or by id / kind)
+
+        Returns:
+            number of requests cancelled
+        """
+        with self._cond:
+            queued = [item[2] for item in self._queue if item[2].state == "queued"]
+            targets = [
+                r for r in queued + list(self._running.values())
+                if (request_id is None or r.id == request_id) and (kind is None or r.kind == kind)
+                and not r.cancel_token.is_set()
+            ]
+            dropped = [r for r in targets if r.state == "queued"]
+            for request in dropped:
+                # Left in the heap, skipped when popped
+                request.state = "cancelled"
+                self._forget(request)
+            self._changed()
+
+        # Outside the lock: callbacks may close sockets or write to pipes
+        for request in targets:
+            request.cancel_token.cancel()
+        for request in dropped:
+            self._finish(request, None, "Cancelled")
+        return len(targets)
+
+    def snapshot(self):
+        """{"running": [Request], "queued": [Request]} in run order"""
+        with self._cond:
+            queued = [item[2] for item in sorted(self._queue) if item[2].state == "queued"]
+            return {"running": list(self._running.values()), "queued": queued}
+
+    def _changed(self):
+        # Caller holds _cond
+        self.version += 1
+        self._cond.notify_all()
+
+    def _forget(self, request):
+        if self._by_key.get((request.kind, request.key)) is request:
+            del self._by_key[(request.kind, request.key)]
+
+    def _next_runnable(self):
+        """Pop the best queued request whose kind is under its limit (caller holds _cond)"""
+        blocked = []
+        picked = None
+        while self._queue:
+            item = heapq.heappop(self._queue)
+            request = item[2]
+            if request.state != "queued":
+                continue
+            limit = self.limits.get(request.kind)
+            if limit is not None and sum(r.kind == request.kind for r in self._running.values()) >= limit:
+                blocked.append(item)
+                continue
+            picked = request
+            break
+        for item in blocked:
+            heapq.heappush(self._queue, item)
+        return picked
+
+    def _worker_loop(self):
+        while True:
+            with self._cond:
+                request = self._next_runnable()
+                while request is None:
+                    self._cond.wait()
+                    request = self._next_runnable()
+                request.state = "running"
+                self._running[request.id] = request
+                self._changed()
+
+            result, error = None, None
+            try:
+                result = request.func(request.cancel_token)
+            except Exception as e:
+                traceback.print_exc()
+                error = f"{type(e).__name__}: {e}"
+
+            with self._cond:
+                del self._running[request.id]
+                request.state = "cancelled" if request.cancel_token.is_set() else "done"
+                self._forget(request)
+                # Also wakes workers waiting on this kind's limit
+                self._changed()
+
+            if request.state == "cancelled":
+                error = "Cancelled"
+            self._finish(request, result, error)
+
+    def _finish(self, request, result, error):
+        if request.done is None:
+            return
+        try:
+            request.done(request, result, error)
+        except Exception as e:
+            print(f"⚠️  Request callback failed: {e}")
@@ -0,0 +1,196 @@
+"""
+Incremental rollover engine for auto_update_tasks
+
+Tag rules (same as before):
+- hw: removed once past due and not done
+- paper_review: pushed 2 days later while past due and not done
+- meeting/office_hour: recurrent series (recurrence.py), the current
+  occurrence is computed lazily; the series is removed once it is exhausted
+- research/other: no auto-update
+
+Instead of walking and rewriting every task on each call, the engine remembers
+the next rollover instant (earliest due date among tasks these rules apply to)
+and skips the pass entirely until then. A pass only loads the tasks that
+crossed a boundary and writes only the rows it changed, reading and writing
+them in one store transaction (TaskStore.modify), so a concurrent writer
+can't slip in between. Recurring series are
+never rewritten when an occurrence passes; they are only reported as "moved"
+so in-memory views (the urgency index) can re-key them.
+"""
+
+from datetime import datetime, time, timedelta
+from recurrence import RECURRING_TAGS, Series
+
+EXPIRING_TAGS = ["hw", "paper_review"]
+
+
+def _boundary(task, now=None):
+    """Instant at which a task next needs rollover, or None if it never does"""
+    tag = task.get("tag", "other")
+    if tag in RECURRING_TAGS:
+        if task.get("done"):
+            return datetime.min  # old-style done flag, converted right away
+        current = Series(task).current(now)
+        if current is None:
+            return datetime.min  # exhausted series, removed right away
+        # The occurrence stops being current once its day is over
+        return datetime.combine(current + timedelta(days=1), time.min)
+
+    if tag not in EXPIRING_TAGS or task.get("done"):
+        return None
+
+    try:
+        return datetime.fromisoformat(task["due_date"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def roll_task(task, now):
+    """
+    Apply the tag rules to one task that crossed its boundary
+
+    Returns:
+        updated task dict, or None if the task should be removed
+    """
+    task = dict(task)
+    tag = task.get("tag", "other")
+
+    if tag in RECURRING_TAGS:
+        # Only old-style done flags get here: record which occurrence was done
+        done_occurrence = Series(dict(task, done=False)).current(now)
+        if done_occurrence is None or Series(task).current(now) is None:
+            return None
+        task["done"] = False
+        task["done_through"] = done_occurrence.strftime("%Y-%m-%d")
+        return task
+
+    if tag == "hw":
+        return None
+
+    # paper_review: catch up in one write, 2-day steps until it is upcoming again
+    due_date = datetime.fromisoformat(task["due_date"])
+    steps = int((now - due_date).total_seconds() // (2 * 86400)) + 1
+    task["due_date"] = (due_date + timedelta(days=2 * steps)).strftime("%Y-%m-%d")
+    return task
+
+
+class RolloverEngine:
+    """Tracks the next rollover instant and only does work once it has passed"""
+
+    def __init__(self, store):
+        self.store = store
+        self.next_at = None   # None = unknown, recomputed on the next run
+        self.stamp = None     # store stamp next_at was computed against
+        self.last_write = (None, None)  # store stamps around the last pass's write
+        self.stats = {"skipped": 0, "performed": 0, "touched": 0, "removed": 0, "moved": 0}
+        self._current = {}    # task_id -> current occurrence of each recurring series
+
+    def invalidate(self):
+        """Forget the next instant (bulk rewrite, external change)"""
+        self.next_at = None
+
+    def note_change(self, tasks, before, after):
+        """
+        Pull the next instant forward for tasks we just wrote
+
+        `before`/`after` are the store stamps around the write
+        (TaskStore.last_write). If ours wasn't `before`, someone else wrote in
+        between and the stamp is left alone, so run() recomputes next_at.
+        """
+        if self.stamp != before:
+            return
+        for task in tasks:
+            boundary = _boundary(task)
+            if boundary is not None and self.next_at is not None:
+                self.next_at = min(self.next_at, boundary)
+        self.stamp = after
+
+    def _compute_next_at(self, now):
+        """
+        Earliest boundary in the store: one indexed lookup for expiring tasks,
+        plus an O(1) occurrence lookup per recurring series
+        """
+        boundaries = [
+            _boundary(t)
+            for _, t in self.store.select(tags=EXPIRING_TAGS, done=False, order="due_date", limit=1)
+        ]
+
+        self._current = {}
+        for task_id, task in self.store.select(tags=RECURRING_TAGS):
+            boundaries.append(_boundary(task, now))
+            if not task.get("done"):
+                self._current[task_id] = Series(task).current(now)
+
+        boundaries = [b for b in boundaries if b is not None]
+        return min(boundaries) if boundaries else datetime.max
+
+    def run(self, now=None):
+        """
+        Roll over every task whose boundary has passed
+
+        Returns:
+            (updates, removals, moved): {task_id: task} written, task_ids
+            removed, and {task_id: task} recurring series whose current
+            occurrence advanced (not written) - all empty when skipped.
+            After a pass, self.last_write holds the store stamps around it.
+        """
+        now = now or datetime.now()
+
+        stamp = self.store.stamp()
+        if stamp != self.stamp:
+            self.next_at = None
+            self.stamp = stamp
+
+        if self.next_at is None:
+            self.next_at = self._compute_next_at(now)
+
+        if now < self.next_at:
+            self.stats["skipped"] += 1
+            return {}, [], {}
+
+        previous = self._current
+        moved = {}
+
+        def decide(expiring, recurring):
+            """Tag rules over rows read inside the store transaction"""
+            updates, removals = {}, []
+            for task_id, task in expiring:
+                rolled = roll_task(task, now)
+                if rolled is None:
+                    removals.append(task_id)
+                else:
+                    updates[task_id] = rolled
+
+            for task_id, task in recurring:
+                if task.get("done"):
+                    rolled = roll_task(task, now)
+                    if rolled is None:
+                        removals.append(task_id)
+                    else:
+                        updates[task_id] = rolled
+                    continue
+
+                current = Series(task).current(now)
+                if current is None:
+                    removals.append(task_id)
+                elif previous.get(task_id) != current:
+                    moved[task_id] = task
+            return updates, removals
+
+        updates, removals = self.store.modify(
+            [{"tags": EXPIRING_TAGS, "done": False, "due_before": now.isoformat()}, {"tags": RECURRING_TAGS}],
+            decide,
+        )
+
+        self.stats["performed"] += 1
+        self.stats["touched"] += len(updates)
+        self.stats["removed"] += len(removals)
+        self.stats["moved"] += len(moved)
+        self.last_write = self.store.last_write()
+
+        # Stamp first: a write landing during the recompute shows up as a
+        # stamp change on the next run instead of being missed
+        stamp = self.store.stamp()
+        self.next_at = self._compute_next_at(now)
+        self.stamp = stamp
+        return updates, removals, moved
@@ -6,8 +6,8 @@ import os
 import json
 import base64
 from datetime import datetime
-from openai import OpenAI
 from dotenv import load_dotenv
+from http_client import get_llm_client
 
 load_dotenv()
 
@@ -18,12 +18,6 @@ RESEARCH_FILE = os.path.join(FLOW_DIR, "projects/research-uncertainty-reasoning-
 DIARY_TEMPLATE = "/Users/xiaofanlu/Documents/road/template/diary.md"
 PAPERS_DIR = os.path.join(FLOW_DIR, "areas/papers")
 
-# OpenRouter client
-client = OpenAI(
-    base_url="https://openrouter.ai/api/v1",
-    api_key=os.getenv("OPENROUTER_API_KEY"),
-)
-
 
 def get_diary_path():
     """Get today's diary file path"""
@@ -158,7 +152,7 @@ For content:  provide 1-2 sentences of brief description of what you see. if use
 
     print("🤖 Classifying...")
     try:
-        response = client.chat.completions.create(
+        response = get_llm_client().chat.completions.create(
             model=model,
             messages=[{"role": "user", "content": message_content}],
             response_format=response_format,
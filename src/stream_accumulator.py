@@ -0,0 +1,187 @@
+"""
+Accumulates a streaming chat completion (content + tool calls)
+
+The manager and worker loops share this instead of each keeping their own
+chunk loop:
+
+    acc = StreamAccumulator(on_content=print_delta, on_sentence=queue_tts)
+    for chunk in stream:
+        acc.add(chunk)
+    content, tool_calls = acc.finish()
+
+- content and tool-call arguments are collected as lists of pieces and
+  joined once in finish(), instead of `+=` on every delta
+- SentenceSplitter cuts the text for TTS with the same rule as the old loop
+  but only scans the new text of each delta (plus the few trailing
+  punctuation/space characters a terminator could still extend), not the
+  whole pending buffer
+- hooks: on_content(delta) for the UI, on_sentence(text) for TTS,
+  on_tool_call(index, name, arguments_delta) as tool calls stream in (e.g.
+  to acknowledge them aloud before they finish), on_finish(content,
+  tool_calls) for logging
+"""
+
+import re
+
+# A sentence end for TTS: punctuation followed by whitespace, or a blank line
+SENTENCE_END = re.compile(r'([.!?]+[\s\n]+|[\n]{2,})')
+# Only spoken once this long (shorter pieces wait for the next sentence)...
+MIN_SENTENCE_CHARS = 15
+# ...unless the buffer grows past this
+MAX_BUFFER_CHARS = 200
+
+
+def _is_terminator_char(c):
+    # Every SENTENCE_END match is made only of these (re's \s == str.isspace)
+    return c in ".!?" or c.isspace()
+
+
+class SentenceSplitter:
+    """
+    Incremental TTS chunker
+
+    Emits exactly what the old per-delta `re.finditer` over the whole buffer
+    did: after each delta, if the buffer has a sentence end, everything up
+    to the last one is emitted when it is at least MIN_SENTENCE_CHARS long;
+    otherwise a buffer over MAX_BUFFER_CHARS is emitted whole.
+
+    Matches are made only of [.!?] and whitespace, so a match can only
+    change when text is appended inside the trailing run of those
+    characters. Each feed scans that run plus the new text; matches before
+    it are final and only their end is remembered.
+    """
+
+    def __init__(self, min_chars=MIN_SENTENCE_CHARS, max_chars=MAX_BUFFER_CHARS):
+        self.min_chars = min_chars
+        self.max_chars = max_chars
+        self._reset()
+
+    def _reset(self):
+        self._parts = []      # pending text
+        self._length = 0
+        self._tail = ""       # pending text from _tail_start (still to be scanned)
+        self._tail_start = 0
+        self._last_end = None  # end of the last sentence end in the pending text
+
+    def feed(self, text):
+        """Add a delta; returns the chunks ready to be spoken (usually none or one)"""
+        self._parts.append(text)
+        self._length += len(text)
+        tail = self._tail + text
+
+        for match in SENTENCE_END.finditer(tail):
+            self._last_end = self._tail_start + match.end()
+
+        # Keep the trailing run of terminator characters for the next scan
+        run = len(tail)
+        while run > 0 and _is_terminator_char(tail[run - 1]):
+            run -= 1
+        self._tail_start += run
+        self._tail = tail[run:]
+
+        if self._last_end is None:
+            return []
+
+        pending = "".join(self._parts)
+        complete = pending[:self._last_end].strip()
+        if complete and len(complete) >= self.min_chars:
+            cut = self._last_end
+            rest = pending[cut:]
+            self._parts = [rest] if rest else []
+            self._length = len(rest)
+            self._tail = self._tail[max(0, cut - self._tail_start):]
+            self._tail_start = max(0, self._tail_start - cut)
+            self._last_end = None
+            return [complete]
+        if self._length > self.max_chars:
+            self._reset()
+            text = pending.strip()
+            return [text] if text else []
+        return []
+
+    def flush(self):
+        """Whatever is left at the end of the stream (None if only whitespace)"""
+        text = "".join(self._parts).strip()
+        self._reset()
+        return text or None
+
+
+class StreamAccumulator:
+    """Collects content and tool calls from chat completion chunks"""
+
+    def __init__(self, on_content=None, on_sentence=None, on_tool_call=None, on_finish=None):
+        """
+        Args:
+            on_content: on_content(delta) for every content delta (UI)
+            on_sentence: on_sentence(text) for each TTS-sized piece; no
+                         sentence splitting at all if None
+            on_tool_call: on_tool_call(index, name, arguments_delta) for every
+                          tool-call delta (name is the one streamed so far)
+            on_finish: on_finish(content, tool_calls) once finish() is called
+        """
+        self.on_content = on_content
+        self.on_sentence = on_sentence
+        self.on_tool_call = on_tool_call
+        self.on_finish = on_finish
+        self.splitter = SentenceSplitter() if on_sentence else None
+        # True once any non-whitespace content arrived
+        self.has_text = False
+        self._content = []
+        self._tool_calls = {}  # index -> {"id", "name", "arguments": [pieces]}
+
+    def add(self, chunk):
+        """Fold one streamed chunk in"""
+        if not chunk.choices:
+            return
+        delta = chunk.choices[0].delta
+
+        if delta.content:
+            self._content.append(delta.content)
+            if not self.has_text and not delta.content.isspace():
+                self.has_text = True
+            if self.on_content:
+                self.on_content(delta.content)
+            if self.splitter:
+                for sentence in self.splitter.feed(delta.content):
+                    self.on_sentence(sentence)
+
+        if delta.tool_calls:
+            for tc in delta.tool_calls:
+                entry = self._tool_calls.get(tc.index)
+                if entry is None:
+                    entry = self._tool_calls[tc.index] = {"id": "", "name": "", "arguments": []}
+                if tc.id:
+                    entry["id"] = tc.id
+                if tc.function.name:
+                    entry["name"] = tc.function.name
+                if tc.function.arguments:
+                    entry["arguments"].append(tc.function.arguments)
+                if self.on_tool_call:
+                    self.on_tool_call(tc.index, entry["name"], tc.function.arguments or "")
+
+    def finish(self):
+        """
+        Flush the last TTS piece and build the message parts
+
+        Returns:
+            (content, tool_calls) - tool_calls in the chat API shape, ordered
+            by index (an index the stream skipped gets an empty entry)
+        """
+        if self.splitter:
+            rest = self.splitter.flush()
+            if rest:
+                self.on_sentence(rest)
+
+        content = "".join(self._content)
+        tool_calls = []
+        for index in range(max(self._tool_calls, default=-1) + 1):
+            entry = self._tool_calls.get(index, {"id": "", "name": "", "arguments": []})
+            tool_calls.append({
+                "id": entry["id"],
+                "type": "function",
+                "function": {"name": entry["name"], "arguments": "".join(entry["arguments"])}
+            })
+
+        if self.on_finish:
+            self.on_finish(content, tool_calls)
+        return content, tool_calls
@@ -0,0 +1,633 @@
+"""
+Storage backends for time-dependent tasks
+- SqliteTaskStore: WAL-mode SQLite, indexed on name, due_date,
+  (tag, due_date) and (done, due_date) (default)
+- JsonTaskStore: JSON-compat mode, original {"tasks": [...]} layout plus an
+  append-only journal and cross-process file locking
+- migrate_json_to_sqlite: one-shot import of an existing tasks.json
+"""
+
+import fcntl
+import json
+import os
+import re
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from datetime import datetime
+from functools import lru_cache
+
+# Task fields that get their own column; anything else goes into the "extra" JSON blob
+TASK_COLUMNS = ("name", "tag", "due_date", "done", "note_directory", "comments", "created_at", "deadline")
+
+
+class TaskStore(ABC):
+    """Interface shared by all task backends (a backend missing a method fails to instantiate)"""
+
+    # False when task ids are list positions that shift after a removal
+    stable_ids = True
+
+    def all(self):
+        """Return every task as a list of dicts, in insertion order"""
+        return [task for _, task in self.items()]
+
+    @abstractmethod
+    def items(self):
+        """Return (task_id, task) pairs in insertion order"""
+
+    @abstractmethod
+    def add(self, task):
+        """Append a task dict, returns its task_id"""
+
+    def find(self, name):
+        """Return (task_id, task) for the first task called `name`, or None"""
+        for task_id, task in self.items():
+            if task["name"] == name:
+                return task_id, task
+        return None
+
+    @abstractmethod
+    def update(self, name, fields):
+        """Update the first task called `name`, returns (task_id, task) or None"""
+
+    def add_many(self, tasks):
+        """Append several tasks in one write, returns their task_ids"""
+        return [self.add(task) for task in tasks]
+
+    def update_many(self, changes):
+        """Apply [(name, fields), ...] in one write, returns (task_id, task) or None per item"""
+        return [self.update(name, fields) for name, fields in changes]
+
+    @abstractmethod
+    def replace_all(self, tasks):
+        """Overwrite the whole store with `tasks`"""
+
+    def select(self, tags=None, done=None, due_before=None, due_after=None, text=None, pattern=None,
+               order="id", limit=None):
+        """
+        Return (task_id, task) pairs matching the filters
+
+        Args:
+            tags: only these tags
+            done: only done (True) / pending (False) tasks
+            due_before: ISO date/datetime string, due_date strictly earlier
+            due_after: ISO date/datetime string, due_date on or after
+            text: case-insensitive substring of name or comments
+            pattern: case-insensitive regex searched in name or comments
+            order: "id" (insertion order), "due_date" or "name"
+            limit: max number of results
+        """
+        return _filter_tasks(self.items(), tags, done, due_before, due_after, text, pattern, order, limit)
+
+    @abstractmethod
+    def modify(self, queries, decide):
+        """
+        Read-modify-write in one exclusive transaction (e.g. a rollover pass)
+
+        No other thread or process can write between the reads and the
+        write, so the task ids handed to `decide` still point at the same
+        tasks when the changes are written.
+
+        Args:
+            queries: list of select() keyword dicts, run inside the transaction
+            decide: decide(*results) -> ({task_id: task} to write, [task_id]
+                    to remove), called with one select() result per query
+
+        Returns:
+            (updates, removals) as returned by decide
+        """
+
+    @abstractmethod
+    def stamp(self):
+        """Opaque token that changes when another process modifies the store"""
+
+    @abstractmethod
+    def watch_paths(self):
+        """Files whose modification signals a write (for file_watch.FileWatcher)"""
+
+    def last_write(self):
+        """
+        (stamp before, stamp after) of the calling thread's latest write
+
+        Both are taken while the write holds the store's exclusive lock, so a
+        cache built at the "before" stamp can fold the write in and move to
+        the "after" stamp; any other stamp means it missed someone's write.
+        """
+        return getattr(self._writes, "stamps", (None, None))
+
+    def close(self):
+        pass
+
+
+@lru_cache(maxsize=64)
+def compile_pattern(pattern):
+    """Compiled case-insensitive regex, raises re.error if invalid"""
+    return re.compile(pattern, re.IGNORECASE)
+
+
+def _filter_tasks(items, tags=None, done=None, due_before=None, due_after=None, text=None, pattern=None,
+                  order="id", limit=None):
+    """TaskStore.select() over (task_id, task) pairs already in memory"""
+    matches = [
+        (task_id, task) for task_id, task in items
+        if (tags is None or task.get("tag", "other") in tags)
+        and (done is None or bool(task.get("done")) == done)
+        and (due_before is None or task.get("due_date", "") < due_before)
+        and (due_after is None or task.get("due_date", "") >= due_after)
+        and _text_match(task, text, pattern)
+    ]
+    if order in ("due_date", "name"):
+        matches.sort(key=lambda x: x[1].get(order) or "")
+    return matches[:limit] if limit is not None else matches
+
+
+def _text_match(task, text=None, pattern=None):
+    """Substring / regex filter on name and comments"""
+    fields = (task.get("name") or "", task.get("comments") or "")
+    if text is not None and not any(text.lower() in f.lower() for f in fields):
+        return False
+    if pattern is not None and not any(compile_pattern(pattern).search(f) for f in fields):
+        return False
+    return True
+
+
+def urgency(task, now, tag_weights):
+    """Urgency score - higher = more urgent (done tasks sink to the bottom)"""
+    if task.get("done"):
+        return -1000
+
+    due_date = datetime.fromisoformat(task["due_date"])
+    days_until = (due_date - now).total_seconds() / 86400
+
+    # Overdue tasks get highest priority, otherwise sooner = higher score
+    if days_until < 0:
+        score = 1000 + abs(days_until)
+    else:
+        score = 100 / (days_until + 1)
+
+    return score * tag_weights.get(task.get("tag", "other"), 1.0)
+
+
+# ============================================================================
+# JSON-compat backend (original tasks.json layout)
+# ============================================================================
+
+class JsonTaskStore(TaskStore):
+    """
+    JSON store with a write-ahead journal, kept for tools that read tasks.json
+
+    - tasks.json is the snapshot ({"tasks": [...], "journal_seq": n})
+    - every mutation is one appended line in tasks.json.journal (O(1) write)
+    - every COMPACT_EVERY records the state is folded back into tasks.json
+      via temp file + os.replace and the journal is truncated
+    - an flock on tasks.json.lock serializes writers across processes
+      (hotkey threads, worker agents, other scripts)
+
+    A crash mid-append leaves at most one torn journal line, which is ignored
+    and cut off by the next writer. A corrupt snapshot raises instead of being
+    read as an empty list (which the next save would have written back).
+    """
+
+    stable_ids = False
+    COMPACT_EVERY = 200
+
+    def __init__(self, path):
+        self.path = path
+        self.journal_path = path + ".journal"
+        self.lock_path = path + ".lock"
+        self._thread_lock = threading.RLock()
+        self._writes = threading.local()   # last_write() stamps, per thread
+        self._tasks = None          # replayed state
+        self._snapshot_id = None    # stat of the snapshot the state is based on
+        self._offset = 0            # journal bytes already replayed
+        self._records = 0           # journal records since the last compaction
+        self._seq = 0               # last applied journal sequence number
+
+    @contextmanager
+    def _locked(self, exclusive=False):
+        """Thread lock + cross-process flock (shared for readers)"""
+        with self._thread_lock:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.lock_path, "a") as lock:
+                fcntl.flock(lock, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+                try:
+                    before = self.stamp() if exclusive else None
+                    yield
+                    if exclusive:
+                        self._writes.stamps = (before, self.stamp())
+                finally:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _stat(self, path):
+        try:
+            st = os.stat(path)
+            return (st.st_ino, st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            return None
+
+    def _refresh(self):
+        """Bring the in-memory state up to date (caller holds the lock)"""
+        snapshot_id = self._stat(self.path)
+        journal_size = os.path.getsize(self.journal_path) if os.path.exists(self.journal_path) else 0
+
+        if self._tasks is None or snapshot_id != self._snapshot_id or journal_size < self._offset:
+            data = {}
+            if snapshot_id is not None:
+                with open(self.path, 'r') as f:
+                    try:
+                        data = json.load(f)
+                    except json.JSONDecodeError as e:
+                        raise ValueError(f"Corrupt task snapshot {self.path}: {e}")
+            self._tasks = data.get("tasks", [])
+            self._seq = data.get("journal_seq", 0)
+            self._snapshot_id = snapshot_id
+            self._offset = 0
+            self._records = 0
+
+        if journal_size <= self._offset:
+            return
+
+        with open(self.journal_path, 'rb') as f:
+            f.seek(self._offset)
+            chunk = f.read()
+
+        # Only complete lines count; a torn tail from a crash is left alone
+        for line in chunk.split(b"\n")[:-1]:
+            self._offset += len(line) + 1
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if record["seq"] > self._seq:  # older records are already in the snapshot
+                self._replay(record)
+                self._seq = record["seq"]
+            self._records += 1
+
+    def _replay(self, record):
+        op = record["op"]
+        if op == "add":
+            self._tasks.append(record["task"])
+        elif op == "set":
+            self._tasks[record["id"]] = record["task"]
+        elif op == "remove":
+            removals = set(record["ids"])
+            self._tasks = [t for i, t in enumerate(self._tasks) if i not in removals]
+
+    def _append(self, records):
+        """Journal and apply mutations (caller holds the exclusive lock)"""
+        lines = []
+        for record in records:
+            self._seq += 1
+            record["seq"] = self._seq
+            self._replay(record)
+            lines.append(json.dumps(record) + "\n")
+
+        with open(self.journal_path, 'ab') as f:
+            if f.tell() > self._offset:
+                f.truncate(self._offset)  # drop a torn line left by a crashed writer
+            data = "".join(lines).encode()
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        self._offset += len(data)
+        self._records += len(records)
+
+        if self._records >= self.COMPACT_EVERY:
+            self._compact()
+
+    def _compact(self):
+        """Fold the journal into tasks.json atomically, then truncate it"""
+        tmp_path = f"{self.path}.tmp.{os.getpid()}"
+        with open(tmp_path, 'w') as f:
+            json.dump({"tasks": self._tasks, "journal_seq": self._seq}, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+        # A crash before this point is harmless: journal_seq makes replay skip
+        # the records the new snapshot already contains
+        with open(self.journal_path, 'wb'):
+            pass
+        self._snapshot_id = self._stat(self.path)
+        self._offset = 0
+        self._records = 0
+
+    def all(self):
+        with self._locked():
+            self._refresh()
+            return [dict(t) for t in self._tasks]
+
+    def items(self):
+        # Task ids are list positions, valid until the next removal
+        return list(enumerate(self.all()))
+
+    def replace_all(self, tasks):
+        with self._locked(exclusive=True):
+            self._refresh()
+            self._tasks = [dict(t) for t in tasks]
+            self._compact()
+
+    def add(self, task):
+        return self.add_many([task])[0]
+
+    def add_many(self, tasks):
+        with self._locked(exclusive=True):
+            self._refresh()
+            first = len(self._tasks)
+            self._append([{"op": "add", "task": task} for task in tasks])
+            return list(range(first, first + len(tasks)))
+
+    def update(self, name, fields):
+        return self.update_many([(name, fields)])[0]
+
+    def update_many(self, changes):
+        with self._locked(exclusive=True):
+            self._refresh()
+            positions = {}
+            for task_id, task in enumerate(self._tasks):
+                positions.setdefault(task["name"], task_id)
+
+            pending, records, results = {}, [], []
+            for name, fields in changes:
+                task_id = positions.get(name)
+                if task_id is None:
+                    results.append(None)
+                    continue
+                task = dict(pending.get(task_id, self._tasks[task_id]), **fields)
+                pending[task_id] = task
+                records.append({"op": "set", "id": task_id, "task": task})
+                results.append((task_id, dict(task)))
+
+            if records:
+                self._append(records)
+            return results
+
+    def modify(self, queries, decide):
+        with self._locked(exclusive=True):
+            self._refresh()
+            # Positions are resolved under the exclusive lock, so the journaled
+            # ids match the state the records are replayed onto
+            items = [(i, dict(t)) for i, t in enumerate(self._tasks)]
+            updates, removals = decide(*[_filter_tasks(items, **query) for query in queries])
+            records = [{"op": "set", "id": i, "task": t} for i, t in updates.items()]
+            if removals:
+                records.append({"op": "remove", "ids": sorted(removals)})
+            if records:
+                self._append(records)
+            return updates, removals
+
+    def stamp(self):
+        return (self._stat(self.path), self._stat(self.journal_path))
+
+    def watch_paths(self):
+        return [self.path, self.journal_path]
+
+
+# ============================================================================
+# SQLite backend
+# ============================================================================
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id             INTEGER PRIMARY KEY AUTOINCREMENT,
+    name           TEXT NOT NULL,
+    tag            TEXT,
+    due_date       TEXT NOT NULL,
+    done           INTEGER NOT NULL DEFAULT 0,
+    note_directory TEXT,
+    comments       TEXT,
+    created_at     TEXT,
+    deadline       TEXT,
+    extra          TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_name ON tasks(name);
+CREATE INDEX IF NOT EXISTS idx_tasks_due_date ON tasks(due_date);
+-- Composite (column, due_date) indexes serve "tag/status within a due range, by due date"
+DROP INDEX IF EXISTS idx_tasks_tag;
+DROP INDEX IF EXISTS idx_tasks_done;
+CREATE INDEX IF NOT EXISTS idx_tasks_tag_due ON tasks(tag, due_date);
+CREATE INDEX IF NOT EXISTS idx_tasks_done_due ON tasks(done, due_date);
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def _task_to_row(task):
+    """Split a task dict into column values + JSON blob of unknown fields"""
+    row = {col: task.get(col) for col in TASK_COLUMNS}
+    row["done"] = 1 if task.get("done") else 0
+    extra = {k: v for k, v in task.items() if k not in TASK_COLUMNS}
+    row["extra"] = json.dumps(extra) if extra else None
+    return row
+
+
+def _row_to_task(row):
+    """Rebuild the task dict, dropping columns that were never set"""
+    task = {}
+    for col in TASK_COLUMNS:
+        value = row[col]
+        if col == "done":
+            task["done"] = bool(value)
+        elif value is not None:
+            task[col] = value
+    if row["extra"]:
+        task.update(json.loads(row["extra"]))
+    return task
+
+
+class SqliteTaskStore(TaskStore):
+    """
+    SQLite task store in WAL mode
+
+    Single-task updates are one indexed write, and filtered lookups (select)
+    run on the (tag, due_date) / (done, due_date) indexes, so only matching
+    rows are deserialized. Top-N is served by the in-memory UrgencyIndex
+    (urgency_index.py), which needs every task once per build.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # One shared connection; hotkey threads and worker agents serialize on the lock
+        self._lock = threading.RLock()
+        self._writes = threading.local()   # last_write() stamps, per thread
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.create_function(
+            "REGEXP", 2, lambda p, value: value is not None and compile_pattern(p).search(value) is not None,
+            deterministic=True,
+        )
+
+    @contextmanager
+    def _transaction(self):
+        """
+        Write transaction that takes the database write lock up front
+
+        No other connection can commit between BEGIN IMMEDIATE and our commit,
+        and our own commit doesn't move data_version, so the stamp read here is
+        both the before and the after stamp of the write.
+        """
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            stamp = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            yield
+            self._writes.stamps = (stamp, stamp)
+
+    def _insert(self, task):
+        row = _task_to_row(task)
+        cols = ", ".join(row)
+        marks = ", ".join(f":{c}" for c in row)
+        return self._conn.execute(f"INSERT INTO tasks ({cols}) VALUES ({marks})", row).lastrowid
+
+    def items(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM tasks ORDER BY id").fetchall()
+        return [(r["id"], _row_to_task(r)) for r in rows]
+
+    def add(self, task):
+        with self._transaction():
+            return self._insert(task)
+
+    def add_many(self, tasks):
+        with self._transaction():
+            return [self._insert(task) for task in tasks]
+
+    def _write(self, task_id, task):
+        values = _task_to_row(task)
+        assignments = ", ".join(f"{c} = :{c}" for c in values)
+        values["id"] = task_id
+        self._conn.execute(f"UPDATE tasks SET {assignments} WHERE id = :id", values)
+
+    def find(self, name):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM tasks WHERE name = ? ORDER BY id LIMIT 1", (name,)
+            ).fetchone()
+        return (row["id"], _row_to_task(row)) if row else None
+
+    def _update(self, name, fields):
+        found = self.find(name)
+        if found is None:
+            return None
+
+        task_id, task = found
+        task.update(fields)
+        self._write(task_id, task)
+        return task_id, task
+
+    def update(self, name, fields):
+        with self._transaction():
+            return self._update(name, fields)
+
+    def update_many(self, changes):
+        with self._transaction():
+            return [self._update(name, fields) for name, fields in changes]
+
+    def select(self, tags=None, done=None, due_before=None, due_after=None, text=None, pattern=None,
+               order="id", limit=None):
+        clauses, params = [], []
+        if tags is not None:
+            # Plain "tag IN" keeps idx_tasks_tag_due usable; untagged rows count as "other"
+            clause = f"tag IN ({', '.join('?' for _ in tags)})"
+            clauses.append(f"({clause} OR tag IS NULL)" if "other" in tags else clause)
+            params.extend(tags)
+        if done is not None:
+            clauses.append("done = ?")
+            params.append(1 if done else 0)
+        if due_before is not None:
+            clauses.append("due_date < ?")
+            params.append(due_before)
+        if due_after is not None:
+            clauses.append("due_date >= ?")
+            params.append(due_after)
+        if text is not None:
+            like = "%" + re.sub(r"([%_\\])", r"\\\1", text) + "%"
+            clauses.append("(name LIKE ? ESCAPE '\\' OR comments LIKE ? ESCAPE '\\')")
+            params.extend([like, like])
+        if pattern is not None:
+            clauses.append("(name REGEXP ? OR comments REGEXP ?)")
+            params.extend([pattern, pattern])
+
+        query = "SELECT * FROM tasks"
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += {"due_date": " ORDER BY due_date, id", "name": " ORDER BY name, id"}.get(order, " ORDER BY id")
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [(r["id"], _row_to_task(r)) for r in rows]
+
+    def modify(self, queries, decide):
+        # The write lock is taken before reading: no other connection can
+        # commit between the selects and the writes
+        with self._transaction():
+            updates, removals = decide(*[self.select(**query) for query in queries])
+            for task_id, task in updates.items():
+                self._write(task_id, task)
+            self._conn.executemany("DELETE FROM tasks WHERE id = ?", [(i,) for i in removals])
+            return updates, removals
+
+    def replace_all(self, tasks):
+        with self._transaction():
+            self._conn.execute("DELETE FROM tasks")
+            for task in tasks:
+                self._insert(task)
+
+    def stamp(self):
+        # data_version only moves when *another* connection commits
+        with self._lock:
+            return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def watch_paths(self):
+        # In WAL mode commits land in the -wal file until a checkpoint
+        return [self.path, self.path + "-wal"]
+
+    def get_meta(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row["value"] if row else None
+
+    def set_meta(self, key, value):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value)
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def migrate_json_to_sqlite(json_path, store):
+    """
+    One-shot import of tasks.json into a SqliteTaskStore
+
+    Runs at most once per database (recorded in the meta table); the JSON file
+    is left in place as a backup.
+
+    Returns:
+        number of tasks imported (0 if already migrated or nothing to import)
+    """
+    if store.get_meta("migrated_from") is not None:
+        return 0
+
+    tasks = JsonTaskStore(json_path).all() if os.path.exists(json_path) else []
+    with store._lock, store._conn:
+        for task in tasks:
+            store._insert(task)
+        store._conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+            ("migrated_from", f"{json_path} @ {datetime.now().isoformat()}"),
+        )
+
+    if tasks:
+        print(f"📦 Migrated {len(tasks)} tasks from {json_path} to {store.path}")
+    return len(tasks)
@@ -3,60 +3,146 @@ Simple time-dependent tasks management
 - Load top 10 most urgent tasks
 - Auto-update tasks based on tag (hw/paper_review/meeting/office_hour/research)
 - LLM interface for task creation
+- Storage via task_store (SQLite by default, TASKS_BACKEND=json for the original tasks.json)
+- Every write bumps the change feed version (change_feed.py)
 """
 
-import json
 import os
+import re
+import threading
 from datetime import datetime, timedelta
-
-# Task storage path
+from change_feed import ChangeFeed
+from context_providers import context_provider
+from task_store import JsonTaskStore, SqliteTaskStore, compile_pattern, migrate_json_to_sqlite, urgency
+from urgency_index import UrgencyIndex
+from rollover import RolloverEngine
+from recurrence import RECURRING_TAGS, Series, expand, is_recurring, parse_rrule
+
+# Task storage paths
 TASKS_FILE = "/Users/xiaofanlu/Documents/github_repos/hackathon-umass/memory/tasks.json"
+TASKS_DB = "/Users/xiaofanlu/Documents/github_repos/hackathon-umass/memory/tasks.db"
+
+# "sqlite" (default, indexed) or "json" (JSON-compat mode, original tasks.json layout)
+TASKS_BACKEND = os.getenv("TASKS_BACKEND", "sqlite")
+
+# Tag-based importance
+TAG_WEIGHTS = {
+    "hw": 1.5,
+    "paper_review": 1.3,
+    "meeting": 1.2,
+    "office_hour": 1.1,
+    "research": 1.0
+}
+
+_store = None
+_store_lock = threading.Lock()
+
+# In-memory urgency heaps, kept in sync incrementally by the functions below
+_index = None
+_index_lock = threading.RLock()
+
+# Tracks the next due-rollover instant so auto_update_tasks can skip idle passes
+_rollover = None
+
+# Version + pub/sub for task changes, shared across processes via a sentinel file
+_feed = None
+
+def get_task_store():
+    """Get or create the task store for the configured backend (thread-safe singleton)"""
+    global _store
+
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                if TASKS_BACKEND == "json":
+                    _store = JsonTaskStore(TASKS_FILE)
+                else:
+                    _store = SqliteTaskStore(TASKS_DB)
+                    # No-op once the database has been seeded
+                    migrate_json_to_sqlite(TASKS_FILE, _store)
+
+    return _store
+
+def get_change_feed():
+    """Get the change feed for the task store (sentinel file next to it)"""
+    global _feed
+
+    if _feed is None:
+        store = get_task_store()
+        with _store_lock:
+            if _feed is None:
+                _feed = ChangeFeed(store.path + ".version")
+
+    return _feed
+
+def _get_index():
+    """
+    Get the urgency index, rebuilding it if another process changed the store
 
-def _load_all_tasks():
-    """Load all tasks from JSON file"""
-    if not os.path.exists(TASKS_FILE):
-        os.makedirs(os.path.dirname(TASKS_FILE), exist_ok=True)
-        return []
+    A build reads every task once (the stores have no top-N query of their
+    own: recurring series need their current occurrence computed in Python);
+    after that, our own writes are folded in incrementally.
+    """
+    global _index
+    store = get_task_store()
+
+    with _index_lock:
+        stamp = store.stamp()
+        if _index is None or _index.stamp != stamp:
+            index = UrgencyIndex(TAG_WEIGHTS)
+            now = datetime.now()
+            # Recurring series are indexed at their current occurrence
+            index.build(((i, expand(t, now)) for i, t in store.items()), stamp)
+            _index = index
+        return _index
+
+def _get_rollover():
+    global _rollover
+    with _index_lock:
+        if _rollover is None:
+            _rollover = RolloverEngine(get_task_store())
+        return _rollover
+
+def _after_write(written):
+    """
+    Apply our own write ([(task_id, task), ...]) to the index and rollover
+    engine without a rebuild
 
-    try:
-        with open(TASKS_FILE, 'r') as f:
-            data = json.load(f)
-            return data.get("tasks", [])
-    except:
-        return []
+    Call it on the writing thread right after the write. The index only takes
+    the write if it was current just before it; if another process wrote in
+    between, it is dropped and rebuilt on next use.
+    """
+    global _index
+    before, after = get_task_store().last_write()
+
+    with _index_lock:
+        if _index is not None and _index.stamp == before:
+            for task_id, task in written:
+                _index.upsert(task_id, expand(task))
+            _index.stamp = after
+        else:
+            _index = None
+        _get_rollover().note_change([task for _, task in written], before, after)
+
+def _invalidate_index():
+    global _index
+    with _index_lock:
+        _index = None
+        _get_rollover().invalidate()
+
+def _load_all_tasks():
+    """Load all tasks from the task store"""
+    return get_task_store().all()
 
 def _save_all_tasks(tasks):
-    """Save all tasks to JSON file"""
-    with open(TASKS_FILE, 'w') as f:
-        json.dump({"tasks": tasks}, f, indent=2)
+    """Overwrite the task store with `tasks`"""
+    get_task_store().replace_all(tasks)
+    _invalidate_index()
+    get_change_feed().publish(kind="replace")
 
 def _calculate_urgency(task):
     """Calculate urgency score - higher = more urgent"""
-    if task.get("done"):
-        return -1000  # Done tasks go to bottom
-
-    # Calculate days until due
-    due_date = datetime.fromisoformat(task["due_date"])
-    now = datetime.now()
-    days_until = (due_date - now).total_seconds() / 86400
-
-    # Overdue tasks get highest priority
-    if days_until < 0:
-        urgency = 1000 + abs(days_until)
-    else:
-        urgency = 100 / (days_until + 1)  # Soon = higher score
-
-    # Tag-based importance
-    tag_weights = {
-        "hw": 1.5,
-        "paper_review": 1.3,
-        "meeting": 1.2,
-        "office_hour": 1.1,
-        "research": 1.0
-    }
-    urgency *= tag_weights.get(task.get("tag", "other"), 1.0)
-
-    return urgency
+    return urgency(task, datetime.now(), TAG_WEIGHTS)
 
 def load_top_tasks(count=10):
     """
@@ -69,71 +155,92 @@ def load_top_tasks(count=10):
     - done: True/False
     - notes: path to related notes file
     """
-    tasks = _load_all_tasks()
-
-    # Sort by urgency
-    tasks_with_urgency = [(t, _calculate_urgency(t)) for t in tasks]
-    tasks_with_urgency.sort(key=lambda x: x[1], reverse=True)
-
-    # Return top N
-    return [t for t, _ in tasks_with_urgency[:count]]
+    # Heap walk over the urgency index, O(count log N)
+    with _index_lock:
+        return _get_index().top(count, datetime.now())
 
 def auto_update_tasks():
     """
     Auto-update tasks based on tag:
     - hw: ignore if past due date
     - paper_review: move deadline 2 days later if not done
-    - meeting/office_hour: recurrent, reset to next week if done/passed
+    - meeting/office_hour: recurrent series, shown at their next occurrence,
+      removed once past deadline (see recurrence.py)
     - research: no auto-update
+
+    Incremental: does nothing until the next rollover instant, then writes only
+    the tasks that crossed a boundary (see rollover.py).
     """
-    tasks = _load_all_tasks()
-    updated_tasks = []
-    now = datetime.now()
+    global _index
+    engine = _get_rollover()
+
+    with _index_lock:
+        updates, removals, moved = engine.run()
+        before, after = engine.last_write
+
+        if not (updates or removals or moved):
+            pass  # skipped pass, nothing to fold in
+        elif removals and not get_task_store().stable_ids:
+            _invalidate_index()  # positional ids shifted
+        elif _index is not None and _index.stamp == before:
+            # Rollover writes may only be folded into an index that was up to date
+            now = datetime.now()
+            for task_id, task in {**updates, **moved}.items():
+                _index.upsert(task_id, expand(task, now))
+            for task_id in removals:
+                _index.remove(task_id)
+            _index.stamp = after
+        else:
+            _index = None  # another process wrote, rebuilt on next use
 
-    for task in tasks:
-        due_date = datetime.fromisoformat(task["due_date"])
-        is_past = due_date < now
-        tag = task.get("tag", "other")
-
-        # hw: skip if past due date
-        if tag == "hw" and is_past and not task.get("done"):
-            continue  # Don't add to updated_tasks (remove it)
-
-        # paper_review: extend 2 days if past due and not done
-        elif tag == "paper_review" and is_past and not task.get("done"):
-            new_date = due_date + timedelta(days=2)
-            task["due_date"] = new_date.strftime("%Y-%m-%d")
-            updated_tasks.append(task)
-
-        # meeting/office_hour: recurrent, move to next week
-        elif tag in ["meeting", "office_hour"]:
-            if is_past or task.get("done"):
-                # Check if we've reached deadline (if specified)
-                if task.get("deadline"):
-                    deadline = datetime.fromisoformat(task["deadline"])
-                    if due_date >= deadline:
-                        continue  # Remove task
-
-                # Move to next week
-                next_date = due_date + timedelta(days=7)
-                task["due_date"] = next_date.strftime("%Y-%m-%d")
-                task["done"] = False
-                updated_tasks.append(task)
-            else:
-                updated_tasks.append(task)
+    if updates or removals or moved:
+        get_change_feed().publish(kind="rollover")
 
-        else:
-            # No auto-update, keep as-is
-            updated_tasks.append(task)
+    return {"updated": len(updates), "removed": len(removals), "moved": len(moved)}
 
-    _save_all_tasks(updated_tasks)
-    return {"updated": len(updated_tasks), "removed": len(tasks) - len(updated_tasks)}
+def get_rollover_stats():
+    """Counters for skipped vs performed rollover passes"""
+    return dict(_get_rollover().stats)
 
 # ============================================================================
 # LLM Interface Functions
 # ============================================================================
 
-def create_task(name, tag, due_date, done=False, note_directory="", comments="", deadline=None):
+def _build_task(name, tag, due_date, done=False, note_directory="", comments="", deadline=None, recurrence=None):
+    """Validate fields and build the stored task dict (raises ValueError)"""
+    datetime.fromisoformat(due_date)  # reject unparsable dates before writing
+    if recurrence:
+        parse_rrule(recurrence)
+
+    task = {
+        "name": name,
+        "tag": tag,
+        "due_date": due_date,
+        "done": done,
+        "note_directory": note_directory,
+        "comments": comments,
+        "created_at": datetime.now().isoformat()
+    }
+
+    if deadline:
+        task["deadline"] = deadline
+
+    if recurrence:
+        task["rrule"] = recurrence
+
+    return task
+
+def _normalize_updates(store, name, updates):
+    """Recurring series: "done" only applies to the current occurrence"""
+    if updates.get("done"):
+        found = store.find(name)
+        if found and is_recurring(found[1]):
+            current = Series(found[1]).current()
+            if current:
+                return dict(updates, done=False, done_through=current.strftime("%Y-%m-%d"))
+    return updates
+
+def create_task(name, tag, due_date, done=False, note_directory="", comments="", deadline=None, recurrence=None):
     """
     Create a new task (LLM-callable)
 
@@ -145,32 +252,60 @@ def create_task(name, tag, due_date, done=False, note_directory="", comments="",
         note_directory: path to relevant notes file/directory
         comments: explanation of task importance, context, or details
         deadline: for recurrent tasks, final deadline (YYYY-MM-DD)
+        recurrence: for meeting/office_hour, RRULE like "FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,WE"
+                    (default: weekly on the due_date's weekday)
 
     Returns:
         dict with success status and task info
     """
     try:
-        task = {
-            "name": name,
-            "tag": tag,
-            "due_date": due_date,
-            "done": done,
-            "note_directory": note_directory,
-            "comments": comments,
-            "created_at": datetime.now().isoformat()
-        }
-
-        if deadline:
-            task["deadline"] = deadline
-
-        tasks = _load_all_tasks()
-        tasks.append(task)
-        _save_all_tasks(tasks)
+        task = _build_task(name, tag, due_date, done, note_directory, comments, deadline, recurrence)
+
+        # Write and index update under one lock, so in-process writers reach
+        # the index in the order they reached the store
+        with _index_lock:
+            task_id = get_task_store().add(task)
+            _after_write([(task_id, task)])
+        get_change_feed().publish(kind="create", names=[name])
 
         return {"success": True, "task": task}
     except Exception as e:
         return {"success": False, "error": str(e)}
 
+def create_tasks(tasks):
+    """
+    Create several tasks in one write (LLM-callable)
+
+    Args:
+        tasks: list of dicts with the same fields as create_task
+
+    Returns:
+        dict with overall success and one result per item (invalid items are
+        reported and skipped, the valid ones are still written)
+    """
+    results = [None] * len(tasks)
+    valid = []
+
+    for i, item in enumerate(tasks):
+        try:
+            valid.append((i, _build_task(**item)))
+        except Exception as e:
+            results[i] = {"success": False, "name": item.get("name"), "error": str(e)}
+
+    try:
+        with _index_lock:
+            task_ids = get_task_store().add_many([task for _, task in valid])
+            _after_write(list(zip(task_ids, [task for _, task in valid])))
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+    for i, task in valid:
+        results[i] = {"success": True, "task": task}
+    if valid:
+        get_change_feed().publish(kind="create", names=[task["name"] for _, task in valid])
+
+    return {"success": all(r["success"] for r in results), "created": len(valid), "results": results}
+
 def update_task(name, **updates):
     """
     Update a task by name (LLM-callable)
@@ -182,20 +317,172 @@ def update_task(name, **updates):
     Returns:
         dict with success status
     """
-    tasks = _load_all_tasks()
-
-    for task in tasks:
-        if task["name"] == name:
-            task.update(updates)
-            _save_all_tasks(tasks)
-            return {"success": True, "updated": name}
+    store = get_task_store()
+    fields = _normalize_updates(store, name, updates)
+    with _index_lock:
+        updated = store.update(name, fields)
+        if updated:
+            _after_write([updated])
+    if updated:
+        get_change_feed().publish(kind="update", names=[name])
+        return {"success": True, "updated": name}
 
     return {"success": False, "error": "Task not found"}
 
+def update_tasks(changes):
+    """
+    Update several tasks in one write (LLM-callable)
+
+    Args:
+        changes: list of dicts, each with "name" plus the fields to update
+
+    Returns:
+        dict with overall success and one result per item
+    """
+    store = get_task_store()
+    pairs = []
+    for change in changes:
+        fields = {k: v for k, v in change.items() if k != "name"}
+        pairs.append((change.get("name"), _normalize_updates(store, change.get("name"), fields)))
+
+    try:
+        with _index_lock:
+            updated = store.update_many(pairs)
+            _after_write([item for item in updated if item])
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+    results = []
+    for (name, _), item in zip(pairs, updated):
+        if item:
+            results.append({"success": True, "updated": name})
+        else:
+            results.append({"success": False, "name": name, "error": "Task not found"})
+    if any(updated):
+        get_change_feed().publish(kind="update", names=[name for (name, _), item in zip(pairs, updated) if item])
+
+    return {"success": all(r["success"] for r in results), "results": results}
+
 def mark_done(name):
     """Mark a task as done by name (LLM-callable)"""
     return update_task(name, done=True)
 
+def _format_task(task, index, now):
+    """Summary lines for one task (title, aligned details, trailing blank line)"""
+    due = datetime.fromisoformat(task["due_date"])
+    days = (due - now).days
+
+    if task.get("done"):
+        due_status = "DONE"
+    elif days < 0:
+        due_status = "OVERDUE"
+    elif days == 0:
+        due_status = "DUE TODAY"
+    else:
+        due_status = f"{days} days left"
+
+    # Task title
+    lines = [f"{index}. {task['name']}"]
+
+    # Details (aligned)
+    lines.append(f"    Due Date : {task['due_date']} ({due_status})")
+    lines.append(f"    Tag      : {task.get('tag', 'other')}")
+
+    if task.get("note_directory"):
+        lines.append(f"    Notes    : {task['note_directory']}")
+
+    if task.get("comments"):
+        lines.append(f"    Comments : {task['comments']}")
+
+    if is_recurring(task) and not task.get("done"):
+        upcoming = Series(task).project(3, now)
+        lines.append(f"    Next     : {', '.join(d.strftime('%Y-%m-%d') for d in upcoming)}")
+
+    lines.append("")  # blank line between tasks
+    return lines
+
+def query_tasks(tag=None, due_from=None, due_to=None, status="pending", text=None, regex=None,
+                sort="due_date", limit=20, auto_update=True):
+    """
+    Find tasks by tag, due range, status and text (LLM-callable)
+
+    Filters run as indexed store queries, so the agent never needs to read
+    tasks.json itself. Recurring series are matched on their current occurrence.
+
+    Args:
+        tag: tag or list of tags
+        due_from / due_to: YYYY-MM-DD, both inclusive
+        status: "pending", "done" or "all"
+        text: case-insensitive substring of name or comments
+        regex: case-insensitive regex searched in name or comments
+        sort: "due_date", "urgency" or "name"
+        limit: max number of tasks returned
+        auto_update: run the rollover pass first (a write); False for
+                     read-only callers such as the menu bar
+
+    Returns:
+        dict with success, count (tasks listed), more (True if the limit cut
+        the list short) and a formatted summary
+    """
+    if status not in ("pending", "done", "all"):
+        return {"success": False, "error": f"Invalid status: {status} (use pending, done or all)"}
+    if sort not in ("due_date", "urgency", "name"):
+        return {"success": False, "error": f"Invalid sort: {sort} (use due_date, urgency or name)"}
+    try:
+        if regex:
+            compile_pattern(regex)
+        # due_to is inclusive: everything before the next day
+        due_before = (datetime.fromisoformat(due_to) + timedelta(days=1)).strftime("%Y-%m-%d") if due_to else None
+        due_after = datetime.fromisoformat(due_from).strftime("%Y-%m-%d") if due_from else None
+    except (re.error, ValueError) as e:
+        return {"success": False, "error": str(e)}
+
+    if auto_update:
+        auto_update_tasks()
+
+    store = get_task_store()
+    now = datetime.now()
+    tags = [tag] if isinstance(tag, str) else tag
+    done = {"pending": False, "done": True, "all": None}[status]
+    text_filters = {"text": text or None, "pattern": regex or None}
+
+    # Recurring series: few rows, their due date is the computed current occurrence
+    recurring_tags = [t for t in (tags or RECURRING_TAGS) if t in RECURRING_TAGS]
+    series = store.select(tags=recurring_tags, **text_filters) if recurring_tags else []
+    matches = []
+    for _, task in series:
+        view = expand(task, now)
+        if done is not None and bool(view.get("done")) != done:
+            continue
+        if (due_after and view["due_date"] < due_after) or (due_before and view["due_date"] >= due_before):
+            continue
+        matches.append(view)
+
+    # Everything else straight from the store; with a sort the store can do,
+    # only limit + len(series) rows are needed (+1 to tell whether there are more)
+    pushdown = limit + len(series) + 1 if sort != "urgency" and limit is not None else None
+    rows = store.select(tags=tags, done=done, due_before=due_before, due_after=due_after,
+                        order="name" if sort == "name" else "due_date", limit=pushdown, **text_filters)
+    matches.extend(task for _, task in rows if not is_recurring(task))
+
+    if sort == "urgency":
+        matches.sort(key=lambda t: urgency(t, now, TAG_WEIGHTS), reverse=True)
+    else:
+        matches.sort(key=lambda t: t.get(sort) or "")
+
+    shown = matches[:limit] if limit is not None else matches
+    lines = []
+    for index, task in enumerate(shown, 1):
+        lines.extend(_format_task(task, index, now))
+    if not shown:
+        lines.append("No matching tasks.")
+    elif len(shown) < len(matches):
+        lines.append("... more matches (raise limit to see them)")
+
+    return {"success": True, "count": len(shown), "more": len(shown) < len(matches), "summary": "\n".join(lines)}
+
+# The change feed sentinel moves on every task write; "days left" moves with the date
+@context_provider(files=lambda: [get_change_feed().path], key=lambda: datetime.now().date())
 def get_tasks_summary():
     """Get formatted summary of top 10 tasks (LLM-callable)
     Auto-updates tasks before returning summary."""
@@ -219,32 +506,9 @@ def get_tasks_summary():
         if task.get("done"):
             continue
 
-        due = datetime.fromisoformat(task["due_date"])
-        days = (due - now).days
-
-        if days < 0:
-            due_status = "OVERDUE"
-        elif days == 0:
-            due_status = "DUE TODAY"
-        else:
-            due_status = f"{days} days left"
-
-        # Task title
-        lines.append(f"{index}. {task['name']}")
+        lines.extend(_format_task(task, index, now))
         index += 1
 
-        # Details (aligned)
-        lines.append(f"    Due Date : {task['due_date']} ({due_status})")
-        lines.append(f"    Tag      : {task.get('tag', 'other')}")
-
-        if task.get("note_directory"):
-            lines.append(f"    Notes    : {task['note_directory']}")
-
-        if task.get("comments"):
-            lines.append(f"    Comments : {task['comments']}")
-
-        lines.append("")  # blank line between tasks
-
     # If nothing to list
     if index == 1:
         lines.append("No pending tasks.")
@@ -254,6 +518,39 @@ def get_tasks_summary():
 
     return "\n".join(lines)
 
+def get_weekly_plan(days=7, per_day=3):
+    """Get formatted what-if plan: most urgent pending tasks on each of the next N days (get_weekly_plan tool)"""
+    # NumPy is only loaded when a plan is requested
+    from urgency_vectorized import TaskColumns
+
+    now = datetime.now()
+    end = now + timedelta(days=days)
+    pending = []
+    for _, task in get_task_store().select(done=False):
+        if not is_recurring(task):
+            pending.append(task)
+            continue
+        # One row per occurrence in the window, each drops out after its day
+        series = Series(task)
+        current = series.current(now)
+        for day in series.occurrences(current, end) if current else []:
+            pending.append(dict(task, series_start=task.get("series_start") or task["due_date"],
+                                due_date=day.strftime("%Y-%m-%d")))
+    plan = TaskColumns(pending, TAG_WEIGHTS).plan(now, days=days, per_day=per_day)
+
+    header = f"PLAN FOR THE NEXT {days} DAYS"
+    lines = [header, "=" * len(header), ""]
+
+    for day, tasks in plan:
+        lines.append(day.strftime("%a %Y-%m-%d"))
+        for task in tasks:
+            lines.append(f"    - {task['name']} ({task.get('tag', 'other')}, due {task['due_date']})")
+        if not tasks:
+            lines.append("    (nothing pending)")
+        lines.append("")
+
+    return "\n".join(lines)
+
 # Example usage
 if __name__ == "__main__":
     # Create example tasks
@@ -1,24 +1,17 @@
 import os
 import subprocess
-import mss
-from PIL import Image
 import base64
 from io import BytesIO
 from datetime import datetime
-import requests
 from dotenv import load_dotenv
-from pynput import keyboard
-import sounddevice as sd
-# Lazy import: TTS pipeline only loaded when needed
-# from mlx_audio.tts.models.kokoro import KokoroPipeline
-# from mlx_audio.tts.utils import load_model
-import threading
-import queue
+# Lazy imports: PIL, httpx and the TTS pipeline are loaded by the tools that
+# use them, so importing this module (manager_agent does) stays cheap
 import warnings
 import logging
-import numpy as np
 import json
 import time
+from context_providers import context_provider
+from tool_registry import EXCLUSIVE, tool, call_tool, schemas
 
 # Suppress phonemizer and other TTS warnings
 warnings.filterwarnings('ignore', category=UserWarning, module='phonemizer')
@@ -31,219 +24,12 @@ INSTRUCTION_FILE = "/Users/xiaofanlu/Documents/github_repos/hackathon-umass/memo
 MEMORY_DIR = "/Users/xiaofanlu/Documents/github_repos/hackathon-umass/memory"
 SCREENSHOT_DIR = "/Users/xiaofanlu/Documents/github_repos/hackathon-umass/screenshots"
 CONVERSATION_HISTORY_FILE = "/Users/xiaofanlu/Documents/github_repos/hackathon-umass/memory/conversation_history.json"
+PAPER_TEMPLATE_FILE = "/Users/xiaofanlu/Documents/road/FLOW/areas/papers/paper-templates/paper_markdown_template.md"
 
 # Ensure directories exist
 os.makedirs(MEMORY_DIR, exist_ok=True)
 os.makedirs(SCREENSHOT_DIR, exist_ok=True)
 
-# Tool definitions
-tools = [
-    {
-        "type": "function",
-        "function": {
-            "name": "bash_command",
-            "description": "Execute bash commands to modify files, create new files, or perform system operations",
-            "parameters": {
-                "type": "object",
-                "properties": {"command": {"type": "string"}},
-                "required": ["command"]
-            }
-        }
-    },
-    {
-        "type": "function",
-        "function": {
-            "name": "update_instructions",
-            "description": "Update or append to the user instruction file",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "content": {"type": "string", "description": "Content to append to instructions"}
-                },
-                "required": ["content"]
-            }
-        }
-    },
-    # {
-    #     "type": "function",
-    #     "function": {
-    #         "name": "ask_user_question",
-    #         "description": "Ask the user a question when instructions are unclear",
-    #         "parameters": {
-    #             "type": "object",
-    #             "properties": {
-    #                 "question": {"type": "string", "description": "Question to ask the user"}
-    #             },
-    #             "required": ["question"]
-    #         }
-    #     }
-    # },
-    # # only grok fast use ask question tool other llm just don't use this tool, but grok fast vision is trash
-    # {
-    #     "type": "function",
-    #     "function": {
-    #         "name": "create_memory_file",
-    #         "description": "Create a new file in memory folder to track specific information",
-    #         "parameters": {
-    #             "type": "object",
-    #             "properties": {
-    #                 "filename": {"type": "string", "description": "Name of the file to create"},
-    #                 "content": {"type": "string", "description": "Content to write to the file"}
-    #             },
-    #             "required": ["filename", "content"]
-    #         }
-    #     }
-    # },
-    {
-        "type": "function",
-        "function": {
-            "name": "brave_search",
-            "description": "Search the web using Brave Search API. Returns web search results with titles, descriptions, and URLs.",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "query": {
-                        "type": "string",
-                        "description": "The search query string"
-                    },
-                    "count": {
-                        "type": "integer",
-                        "description": "Number of results to return (default: 10, max: 20)",
-                        "default": 10
-                    }
-                },
-                "required": ["query"]
-            }
-        }
-    },
-    {
-        "type": "function",
-        "function": {
-            "name": "create_task",
-            "description": "Create a time-dependent task. Tags: hw (homework, removed if overdue), paper_review (auto-extends 2 days), meeting/office_hour (recurrent weekly until deadline), research (standard task)",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "name": {
-                        "type": "string",
-                        "description": "Task name/description"
-                    },
-                    "tag": {
-                        "type": "string",
-                        "description": "Task type: hw, paper_review, meeting, office_hour, research",
-                        "enum": ["hw", "paper_review", "meeting", "office_hour", "research"]
-                    },
-                    "due_date": {
-                        "type": "string",
-                        "description": "Due date in YYYY-MM-DD format"
-                    },
-                    "done": {
-                        "type": "boolean",
-                        "description": "Completion status (default False)",
-                        "default": False
-                    },
-                    "note_directory": {
-                        "type": "string",
-                        "description": "Path to related notes file or directory"
-                    },
-                    "comments": {
-                        "type": "string",
-                        "description": "Explanation of task importance, context, or additional details"
-                    },
-                    "deadline": {
-                        "type": "string",
-                        "description": "For recurring tasks (meeting/office_hour), final deadline in YYYY-MM-DD format"
-                    }
-                },
-                "required": ["name", "tag", "due_date"]
-            }
-        }
-    },
-    {
-        "type": "function",
-        "function": {
-            "name": "delegate_to_agent",
-            "description": "Delegate a specialized task to a worker agent. Pack ALL needed context into task_description (dates, names, details from conversation).",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "agent_name": {
-                        "type": "string",
-                        "description": "Name of worker agent to delegate to",
-                        "enum": ["paper_agent", "pitch_coach"]
-                    },
-                    "task_description": {
-                        "type": "string",
-                        "description": "Complete task with ALL context worker needs: what to do, relevant details from conversation, dates, names, paths, etc. Be specific and detailed."
-                    }
-                },
-                "required": ["agent_name", "task_description"]
-            }
-        }
-    },
-    {
-        "type": "function",
-        "function": {
-            "name": "ask_user_question",
-            "description": "Ask the user a clarifying question when instructions are unclear or need confirmation",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "question": {
-                        "type": "string",
-                        "description": "Clear question to ask the user"
-                    }
-                },
-                "required": ["question"]
-            }
-        }
-    },
-    {
-        "type": "function",
-        "function": {
-            "name": "log_activity",
-            "description": "Log completed work or agent activity to track what has been done",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "summary": {
-                        "type": "string",
-                        "description": "One-line description of what was done"
-                    },
-                    "files_changed": {
-                        "type": "array",
-                        "items": {"type": "string"},
-                        "description": "Optional list of file paths that were modified"
-                    }
-                },
-                "required": ["summary"]
-            }
-        }
-    },
-    {
-        "type": "function",
-        "function": {
-            "name": "start_session_timer",
-            "description": "Start a work session with countdown timer and motivational notifications. Sends reminder 2 minutes before time is up.",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "duration_minutes": {
-                        "type": "integer",
-                        "description": "Session duration in minutes (e.g., 25 for Pomodoro, 45 for deep work)"
-                    },
-                    "session_name": {
-                        "type": "string",
-                        "description": "Name of the work session (e.g., 'Writing', 'Coding', 'Research')"
-                    }
-                },
-                "required": ["duration_minutes", "session_name"]
-            }
-        }
-    }
-
-]
-
 
 def macos_region_screenshot():
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -253,6 +39,7 @@ def macos_region_screenshot():
     subprocess.run(["screencapture", "-i", filepath])
     
     # Load it as a PIL image
+    from PIL import Image
     img = Image.open(filepath)
     return img
 
@@ -283,15 +70,10 @@ def describe_image_with_vision(image_base64, model_name="google/gemini-2.0-flash
     Returns:
         Text description from the model
     """
-    from openai import OpenAI
-
-    client = OpenAI(
-        base_url="https://openrouter.ai/api/v1",
-        api_key=os.getenv("OPENROUTER_API_KEY"),
-    )
+    from http_client import get_llm_client
 
     try:
-        response = client.chat.completions.create(
+        response = get_llm_client().chat.completions.create(
             model=model_name,
             messages=[{
                 "role": "user",
@@ -334,6 +116,7 @@ def transcribe_audio(audio_path, model_name="openai/whisper-large-v3"):
     except Exception as e:
         return f"Transcription error: {str(e)}"
 
+@context_provider(files=lambda: [INSTRUCTION_FILE])
 def read_instructions():
     try:
         with open(INSTRUCTION_FILE, 'r') as f:
@@ -419,6 +202,7 @@ def format_conversation_context(conversations):
 
     return "\n".join(context_parts)
 
+@context_provider()  # no dependencies, cached by cache_seconds
 def get_datetime_context():
     """Return current date/time context as formatted string"""
     now = datetime.now()
@@ -428,6 +212,7 @@ def get_datetime_context():
 
     return f"Current Date: {current_date} ({current_weekday})\nCurrent Time: {current_time}"
 
+@context_provider(files=lambda: [CONVERSATION_HISTORY_FILE])
 def get_conversation_summary(count=5):
     """Get concise summary of last N conversations"""
     conversations = load_recent_conversations(count)
@@ -453,207 +238,350 @@ def get_conversation_summary(count=5):
 
     return "\n".join(summary_parts)
 
+@context_provider(files=lambda: [PAPER_TEMPLATE_FILE])
 def get_paper_template():
     """Load paper markdown template from file"""
-    template_path = "/Users/xiaofanlu/Documents/road/FLOW/areas/papers/paper-templates/paper_markdown_template.md"
     try:
-        with open(template_path, 'r') as f:
+        with open(PAPER_TEMPLATE_FILE, 'r') as f:
             return f.read()
     except FileNotFoundError:
-        return "[Template not found at: /Users/xiaofanlu/Documents/road/FLOW/areas/papers/paper-templates/paper_markdown_template.md]"
+        return f"[Template not found at: {PAPER_TEMPLATE_FILE}]"
     except Exception as e:
         return f"[Error loading template: {e}]"
 
-def execute_tool(name, args):
-    """Execute tool calls"""
-    if name == "bash_command":
-        result = subprocess.run(args["command"], shell=True, capture_output=True, text=True)
-        return result.stdout if result.returncode == 0 else f"Error: {result.stderr}"
-
-    elif name == "create_task":
-        from time_depends_tasks import create_task
-        from agent_log import log_activity
-
-        result = create_task(
-            name=args["name"],
-            tag=args["tag"],
-            due_date=args["due_date"],
-            done=args.get("done", False),
-            note_directory=args.get("note_directory", ""),
-            comments=args.get("comments", ""),
-            deadline=args.get("deadline")
-        )
+# ============================================================================
+# Tools (schemas are generated by tool_registry from the signatures below)
+# ============================================================================
 
-        # Auto-log task creation
-        log_activity(f"Created task: {args['name']} (due {args['due_date']}) notes: {args.get('note_directory', '')}")
+TASK_TAGS = ["hw", "paper_review", "meeting", "office_hour", "research"]
 
-        return str(result)
 
-    elif name == "get_tasks_summary":
-        from time_depends_tasks import get_tasks_summary
-        return get_tasks_summary()
+# Can touch anything, so it never overlaps other tool calls
+@tool("Execute bash commands to modify files, create new files, or perform system operations",
+      concurrency=EXCLUSIVE)
+def bash_command(command: str):
+    result = subprocess.run(command, shell=True, capture_output=True, text=True)
+    return result.stdout if result.returncode == 0 else f"Error: {result.stderr}"
 
-    elif name == "update_task":
-        from time_depends_tasks import update_task
-        # Remove 'name' from args to get only the updates
-        task_name = args.pop("name")
-        result = update_task(task_name, **args)
-        return str(result)
 
-    elif name == "log_activity":
-        from agent_log import log_activity
-        result = log_activity(
-            summary=args["summary"],
-            files_changed=args.get("files_changed")
-        )
-        return result
+@tool("Update or append to the user instruction file",
+      params={"content": "Content to append to instructions"}, concurrency="instructions")
+def update_instructions(content: str):
+    try:
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        with open(INSTRUCTION_FILE, 'a') as f:
+            f.write(f"\n\n## [{timestamp}]\n{content}\n")
+        return "Instructions updated successfully"
+    except Exception as e:
+        return f"Error updating instructions: {e}"
 
-    elif name == "update_instructions":
-        try:
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            with open(INSTRUCTION_FILE, 'a') as f:
-                f.write(f"\n\n## [{timestamp}]\n{args['content']}\n")
-            return "Instructions updated successfully"
-        except Exception as e:
-            return f"Error updating instructions: {e}"
 
+# Not listed for any agent: only grok fast used it, other models ignore it
+@tool("Create a new file in memory folder to track specific information",
+      params={"filename": "Name of the file to create", "content": "Content to write to the file"},
+      concurrency="memory_files")
+def create_memory_file(filename: str, content: str):
+    try:
+        filepath = os.path.join(MEMORY_DIR, filename)
+        with open(filepath, 'w') as f:
+            f.write(content)
+        return f"Memory file created at {filepath}"
+    except Exception as e:
+        return f"Error creating memory file: {e}"
 
-    elif name == "create_memory_file":
-        try:
-            filepath = os.path.join(MEMORY_DIR, args['filename'])
-            with open(filepath, 'w') as f:
-                f.write(args['content'])
-            return f"Memory file created at {filepath}"
-        except Exception as e:
-            return f"Error creating memory file: {e}"
-
-    elif name == "brave_search":
-        try:
-            api_key = os.getenv("BRAVE_API_KEY")
-            if not api_key:
-                return "Error: BRAVE_API_KEY not found in environment variables"
-
-            query = args["query"]
-            count = args.get("count", 10)
-            time.sleep(1)
-            # Brave Search API endpoint
-            url = "https://api.search.brave.com/res/v1/web/search"
-            headers = {
-                "Accept": "application/json",
-                "X-Subscription-Token": api_key
-            }
-            params = {
-                "q": query,
-                "count": min(count, 20)  # Max 20 results
-            }
-
-            response = requests.get(url, headers=headers, params=params, timeout=10)
-
-            if response.status_code == 200:
-                data = response.json()
-                results = []
-
-                # Extract web results
-                if "web" in data and "results" in data["web"]:
-                    for idx, result in enumerate(data["web"]["results"][:count], 1):
-                        results.append({
-                            "position": idx,
-                            "title": result.get("title", ""),
-                            "url": result.get("url", ""),
-                            "description": result.get("description", "")
-                        })
-
-                if results:
-                    formatted_results = "\n\n".join([
-                        f"{r['position']}. {r['title']}\n   URL: {r['url']}\n   {r['description']}"
-                        for r in results
-                    ])
-                    return f"Search Results for '{query}':\n\n{formatted_results}"
-                else:
-                    return f"No results found for query: {query}"
-            else:
-                return f"Error: Brave API returned status code {response.status_code}\n{response.text}"
-
-        except requests.exceptions.Timeout:
-            return "Error: Search request timeout"
-        except Exception as e:
-            return f"Error during search: {str(e)}"
-
-    elif name == "delegate_to_agent":
-        # This will be called by manager_agent.py
-        # Return a marker that the manager will handle
-        return {
-            "delegation": True,
-            "agent_name": args["agent_name"],
-            "task_description": args["task_description"],
-            "extra_context": args.get("extra_context", "")
+
+@tool("Search the web using Brave Search API. Returns web search results with titles, descriptions, and URLs.",
+      params={
+          "query": "The search query string",
+          "count": {"description": "Number of results to return (default: 10, max: 20)", "default": 10},
+      })
+def brave_search(query: str, count: int = 10):
+    import httpx
+    from http_client import get_http_client
+
+    try:
+        api_key = os.getenv("BRAVE_API_KEY")
+        if not api_key:
+            return "Error: BRAVE_API_KEY not found in environment variables"
+
+        time.sleep(1)
+        # Brave Search API endpoint
+        url = "https://api.search.brave.com/res/v1/web/search"
+        headers = {
+            "Accept": "application/json",
+            "X-Subscription-Token": api_key
+        }
+        params = {
+            "q": query,
+            "count": min(count, 20)  # Max 20 results
         }
 
-    elif name == "ask_user_question":
-        # Interactive question - manager will handle this
-        print(f"\n❓ Agent question: {args['question']}")
-        user_response = input("Your answer: ")
-        return f"User answered: {user_response}"
+        response = get_http_client().get(url, headers=headers, params=params, timeout=10)
+
+        if response.status_code == 200:
+            data = response.json()
+            results = []
+
+            # Extract web results
+            if "web" in data and "results" in data["web"]:
+                for idx, result in enumerate(data["web"]["results"][:count], 1):
+                    results.append({
+                        "position": idx,
+                        "title": result.get("title", ""),
+                        "url": result.get("url", ""),
+                        "description": result.get("description", "")
+                    })
+
+            if results:
+                formatted_results = "\n\n".join([
+                    f"{r['position']}. {r['title']}\n   URL: {r['url']}\n   {r['description']}"
+                    for r in results
+                ])
+                return f"Search Results for '{query}':\n\n{formatted_results}"
+            else:
+                return f"No results found for query: {query}"
+        else:
+            return f"Error: Brave API returned status code {response.status_code}\n{response.text}"
+
+    except httpx.TimeoutException:
+        return "Error: Search request timeout"
+    except Exception as e:
+        return f"Error during search: {str(e)}"
+
+
+@tool("Create a time-dependent task. Tags: hw (homework, removed if overdue), paper_review (auto-extends 2 days), meeting/office_hour (recurrent weekly until deadline, or per recurrence rule), research (standard task)",
+      params={
+          "name": "Task name/description",
+          "tag": {"description": "Task type: hw, paper_review, meeting, office_hour, research", "enum": TASK_TAGS},
+          "due_date": "Due date in YYYY-MM-DD format",
+          "done": {"description": "Completion status (default False)", "default": False},
+          "note_directory": "Path to related notes file or directory",
+          "comments": "Explanation of task importance, context, or additional details",
+          "deadline": "For recurring tasks (meeting/office_hour), final deadline in YYYY-MM-DD format",
+          "recurrence": "For meeting/office_hour, RRULE-style schedule, e.g. 'FREQ=WEEKLY;INTERVAL=2;BYDAY=TU,TH' (biweekly Tue/Thu). Default: weekly on the due_date's weekday",
+      }, concurrency="tasks")
+def create_task(name: str, tag: str, due_date: str, done: bool = False, note_directory: str = "",
+                comments: str = "", deadline: str = None, recurrence: str = None):
+    import time_depends_tasks
+    import agent_log
+
+    result = time_depends_tasks.create_task(
+        name=name,
+        tag=tag,
+        due_date=due_date,
+        done=done,
+        note_directory=note_directory,
+        comments=comments,
+        deadline=deadline,
+        recurrence=recurrence
+    )
+
+    # Auto-log task creation
+    agent_log.log_activity(f"Created task: {name} (due {due_date}) notes: {note_directory}")
+
+    return str(result)
+
+
+@tool("Create several tasks in one call (e.g. a syllabus or course schedule, or several papers to review). Same fields and tags as create_task; returns one result per item.",
+      params={"tasks": {"items": {
+          "type": "object",
+          "properties": {
+              "name": {"type": "string"},
+              "tag": {"type": "string", "enum": TASK_TAGS},
+              "due_date": {"type": "string", "description": "YYYY-MM-DD"},
+              "note_directory": {"type": "string"},
+              "comments": {"type": "string"},
+              "deadline": {"type": "string", "description": "For meeting/office_hour, final date YYYY-MM-DD"},
+              "recurrence": {"type": "string", "description": "For meeting/office_hour, e.g. 'FREQ=WEEKLY;BYDAY=MO'"}
+          },
+          "required": ["name", "tag", "due_date"]
+      }}}, concurrency="tasks")
+def create_tasks(tasks: list):
+    import time_depends_tasks
+    import agent_log
+
+    result = time_depends_tasks.create_tasks(tasks)
+
+    # One log entry for the whole batch
+    created = [r["task"] for r in result.get("results", []) if r["success"]]
+    if created:
+        listed = ", ".join(f"{t['name']} (due {t['due_date']})" for t in created[:10])
+        more = f" +{len(created) - 10} more" if len(created) > 10 else ""
+        agent_log.log_activity(f"Created {len(created)} tasks: {listed}{more}")
+
+    return str(result)
+
+
+# Fields an LLM may change on an existing task
+TASK_UPDATE_FIELDS = {
+    "done": {"type": "boolean"},
+    "due_date": {"type": "string", "description": "YYYY-MM-DD"},
+    "comments": {"type": "string"},
+    "note_directory": {"type": "string"},
+    "deadline": {"type": "string"}
+}
+
+
+@tool("Update an existing task by name (mark done, move the due date, edit comments)",
+      params={"name": "Exact task name", **TASK_UPDATE_FIELDS}, concurrency="tasks")
+def update_task(name: str, **updates):
+    import time_depends_tasks
+    return str(time_depends_tasks.update_task(name, **updates))
+
+
+@tool("Update several existing tasks by name in one call (mark done, move due dates, edit comments). Returns one result per item.",
+      params={"updates": {"items": {
+          "type": "object",
+          "properties": {"name": {"type": "string", "description": "Exact task name"}, **TASK_UPDATE_FIELDS},
+          "required": ["name"]
+      }}}, concurrency="tasks")
+def update_tasks(updates: list):
+    import time_depends_tasks
+    return str(time_depends_tasks.update_tasks(updates))
+
+
+@tool("Look up tasks by tag, due date range, status and text. Use this instead of reading tasks.json with bash_command (e.g. 'what research is due this week').",
+      params={
+          "tag": {"items": {"type": "string", "enum": TASK_TAGS + ["other"]}, "description": "Only these tags"},
+          "due_from": "YYYY-MM-DD, inclusive",
+          "due_to": "YYYY-MM-DD, inclusive",
+          "status": {"enum": ["pending", "done", "all"], "description": "Default: pending"},
+          "text": "Case-insensitive substring of name or comments",
+          "regex": "Case-insensitive regex on name or comments",
+          "sort": {"enum": ["due_date", "urgency", "name"], "description": "Default: due_date"},
+          "limit": "Max tasks returned (default 20)",
+      }, concurrency="tasks")  # runs the rollover pass (a write) first
+def query_tasks(tag: list[str] = None, due_from: str = None, due_to: str = None, status: str = "pending",
+                text: str = None, regex: str = None, sort: str = "due_date", limit: int = 20):
+    import time_depends_tasks
+    return str(time_depends_tasks.query_tasks(
+        tag=tag, due_from=due_from, due_to=due_to, status=status,
+        text=text, regex=regex, sort=sort, limit=limit
+    ))
+
+
+@tool("Summary of pending tasks, most urgent first", concurrency="tasks")  # rollover pass first
+def get_tasks_summary():
+    import time_depends_tasks
+    return time_depends_tasks.get_tasks_summary()
+
+
+@tool("Plan for the coming days: the most urgent pending tasks on each day (overdue ones included until done)",
+      params={
+          "days": "Number of days to plan, starting today (default 7)",
+          "per_day": "Max tasks listed per day (default 3)",
+      })
+def get_weekly_plan(days: int = 7, per_day: int = 3):
+    import time_depends_tasks
+    return time_depends_tasks.get_weekly_plan(days=days, per_day=per_day)
+
+
+@tool("Delegate a specialized task to a worker agent. Pack ALL needed context into task_description (dates, names, details from conversation).",
+      params={
+          "agent_name": {"description": "Name of worker agent to delegate to", "enum": ["paper_agent", "pitch_coach"]},
+          "task_description": "Complete task with ALL context worker needs: what to do, relevant details from conversation, dates, names, paths, etc. Be specific and detailed.",
+          "extra_context": None,
+      })
+def delegate_to_agent(agent_name: str, task_description: str, extra_context: str = ""):
+    # This will be called by manager_agent.py
+    # Return a marker that the manager will handle
+    return {
+        "delegation": True,
+        "agent_name": agent_name,
+        "task_description": task_description,
+        "extra_context": extra_context
+    }
 
-    elif name == "start_session_timer":
-        import random
 
-        duration = args["duration_minutes"]
-        session_name = args["session_name"]
+@tool("Ask the user a clarifying question when instructions are unclear or need confirmation",
+      params={"question": "Clear question to ask the user"}, concurrency=EXCLUSIVE)
+def ask_user_question(question: str):
+    # Interactive question - manager will handle this
+    print(f"\n❓ Agent question: {question}")
+    user_response = input("Your answer: ")
+    return f"User answered: {user_response}"
+
+
+@tool("Log completed work or agent activity to track what has been done",
+      params={
+          "summary": "One-line description of what was done",
+          "files_changed": "Optional list of file paths that were modified",
+      })
+def log_activity(summary: str, files_changed: list[str] = None):
+    import agent_log
+    return agent_log.log_activity(summary=summary, files_changed=files_changed)
+
+
+@tool("Start a work session with countdown timer and motivational notifications. Sends reminder 2 minutes before time is up.",
+      params={
+          "duration_minutes": "Session duration in minutes (e.g., 25 for Pomodoro, 45 for deep work)",
+          "session_name": "Name of the work session (e.g., 'Writing', 'Coding', 'Research')",
+      })
+def start_session_timer(duration_minutes: int, session_name: str):
+    import random
+
+    duration = duration_minutes
+
+    # Motivational messages inspired by productivity principles
+    motivational_messages = [
+        "Remember to take a break. Sustained focus requires regular rest.",
+        "Balance is key. Even a short pause can refresh your mind.",
+        "Your wellbeing matters. Regular breaks improve long-term productivity.",
+        "Sharpen the saw. Taking time to recharge makes you more effective.",
+        "Quality over quantity. Rest is part of the creative process.",
+        "Protect your energy. Short breaks prevent burnout.",
+        "Self-care isn't selfish. It's essential for sustained excellence.",
+        "Listen to your body. Breaks are investments, not interruptions."
+    ]
+
+    motivation = random.choice(motivational_messages)
+
+    # Launch standalone menu bar timer as separate process
+    timer_script = os.path.join(os.path.dirname(__file__), "menubar_timer.py")
 
-        # Motivational messages inspired by productivity principles
-        motivational_messages = [
-            "Remember to take a break. Sustained focus requires regular rest.",
-            "Balance is key. Even a short pause can refresh your mind.",
-            "Your wellbeing matters. Regular breaks improve long-term productivity.",
-            "Sharpen the saw. Taking time to recharge makes you more effective.",
-            "Quality over quantity. Rest is part of the creative process.",
-            "Protect your energy. Short breaks prevent burnout.",
-            "Self-care isn't selfish. It's essential for sustained excellence.",
-            "Listen to your body. Breaks are investments, not interruptions."
-        ]
+    try:
+        # Run timer in background process (detached)
+        subprocess.Popen([
+            "python3",
+            timer_script,
+            str(duration),
+            session_name,
+            motivation
+        ], start_new_session=True)
 
-        motivation = random.choice(motivational_messages)
+        print(f"✅ Menu bar timer started: {duration} minutes")
 
-        # Launch standalone menu bar timer as separate process
-        timer_script = os.path.join(os.path.dirname(__file__), "menubar_timer.py")
+    except Exception as e:
+        print(f"Could not start menu bar timer: {e}")
 
-        try:
-            # Run timer in background process (detached)
-            subprocess.Popen([
-                "python3",
-                timer_script,
-                str(duration),
-                session_name,
-                motivation
-            ], start_new_session=True)
+    # TTS announcement at start
+    try:
+        from tts_pipeline import queue_tts
+        queue_tts(f"Starting your {duration} minute {session_name} session. I'll remind you when you have 2 minutes left.")
+    except:
+        pass
 
-            print(f"✅ Menu bar timer started: {duration} minutes")
+    # Send immediate notification
+    try:
+        from pync import Notifier
+        Notifier.notify(
+            f"{duration} minutes - Check your menu bar!",
+            title=f"⏱️ {session_name} Session Started",
+            sound="Glass"
+        )
+    except:
+        pass
 
-        except Exception as e:
-            print(f"Could not start menu bar timer: {e}")
+    return f"✅ Started {duration}-minute session: {session_name}. Check your menu bar for the countdown!"
 
-        # TTS announcement at start
-        try:
-            from tts_pipeline import queue_tts
-            queue_tts(f"Starting your {duration} minute {session_name} session. I'll remind you when you have 2 minutes left.")
-        except:
-            pass
 
-        # Send immediate notification
-        try:
-            from pync import Notifier
-            Notifier.notify(
-                f"{duration} minutes - Check your menu bar!",
-                title=f"⏱️ {session_name} Session Started",
-                sound="Glass"
-            )
-        except:
-            pass
+# Every registered tool schema (agents get their own subset from AgentConfig)
+tools = schemas()
 
-        return f"✅ Started {duration}-minute session: {session_name}. Check your menu bar for the countdown!"
 
-    return "Unknown tool"
+def execute_tool(name, args):
+    """Execute a tool call by name (dict lookup in the tool registry)"""
+    return call_tool(name, args)
 
 
 # ============================================================================
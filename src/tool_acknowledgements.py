@@ -0,0 +1,129 @@
+"""
+Spoken acknowledgements for tool calls ("speculative TTS")
+
+The manager's spoken reply only starts after its tools (and delegated worker
+agents) finish, which can take many seconds. When a stream starts emitting a
+tool call and the model hasn't said anything itself, a short fixed phrase is
+played right away ("Tracking that paper now."). The phrases are rendered once
+when the agent worker warms up, so playing one skips TTS generation.
+
+    acknowledger = ToolAcknowledger()          # one per agent run
+    acc = StreamAccumulator(...)
+    acknowledger.watch(acc)                    # per stream
+
+At most one acknowledgement per run. Nothing is said if the stream already
+had text (the model is speaking for itself, and its sentences would
+otherwise play after the clip).
+
+A delegated worker that ran for more than ANNOUNCE_WORKER_SECONDS is also
+announced when it finishes ("Paper agent is done."), since the manager's
+answer still needs another model call after that.
+"""
+
+import re
+
+# tool -> phrase, or {"arg": argument, "phrases": {value: phrase}, "default": phrase}
+# to pick the phrase from an argument as soon as it has streamed in
+ACKNOWLEDGEMENTS = {
+    "delegate_to_agent": {
+        "arg": "agent_name",
+        "phrases": {
+            "paper_agent": "Tracking that paper now.",
+            "pitch_coach": "Let me bring in your pitch coach.",
+        },
+        "default": "On it.",
+    },
+    "brave_search": "Let me look that up.",
+    "create_task": "Adding that to your tasks.",
+    "create_tasks": "Adding those to your tasks.",
+    "update_task": "Updating your tasks.",
+    "update_tasks": "Updating your tasks.",
+    "start_session_timer": "Starting your session.",
+}
+
+# Give up waiting for the argument after this much of the arguments JSON
+MAX_ARGUMENT_CHARS = 300
+
+WORKER_DONE = {
+    "paper_agent": "Paper agent is done.",
+    "pitch_coach": "Pitch coach is done.",
+}
+WORKER_DONE_DEFAULT = "Worker is done."
+ANNOUNCE_WORKER_SECONDS = 5.0
+
+
+def all_phrases():
+    """Every phrase that can be spoken (to pre-render)"""
+    phrases = []
+    for entry in ACKNOWLEDGEMENTS.values():
+        if isinstance(entry, str):
+            phrases.append(entry)
+        else:
+            phrases.extend(entry["phrases"].values())
+            phrases.append(entry["default"])
+    phrases.extend(WORKER_DONE.values())
+    phrases.append(WORKER_DONE_DEFAULT)
+    return list(dict.fromkeys(phrases))
+
+
+def render_acknowledgements():
+    """Pre-render all phrases in the TTS clip cache (call on warmup; loads the TTS model)"""
+    from tts_pipeline import render_tts_clips
+    render_tts_clips(all_phrases())
+
+
+def _speak(phrase, owner=None):
+    from tts_pipeline import queue_tts_clip
+    queue_tts_clip(phrase, owner=owner)
+
+
+class ToolAcknowledger:
+    """Speaks one acknowledgement per agent run, triggered by streaming tool calls"""
+
+    def __init__(self, speak=None, owner=None):
+        """
+        Args:
+            speak: speak(phrase) (default: the TTS clip cache)
+            owner: CancelToken of the run, so cancelling it drops the phrase
+        """
+        self.speak = speak or (lambda phrase: _speak(phrase, owner=owner))
+        self.spoken = None  # phrase said in this run
+        self._stream = None
+        self._arguments = {}  # tool call index -> arguments so far (only while waiting on an argument)
+
+    def watch(self, acc):
+        """Listen to the tool calls of a StreamAccumulator"""
+        self._stream = acc
+        self._arguments = {}
+        acc.on_tool_call = self.on_tool_call
+
+    def on_tool_call(self, index, name, arguments):
+        if self.spoken or not name or (self._stream is not None and self._stream.has_text):
+            return
+        entry = ACKNOWLEDGEMENTS.get(name)
+        if entry is None:
+            return
+        if isinstance(entry, str):
+            self._say(entry)
+            return
+
+        so_far = self._arguments.get(index, "") + arguments
+        self._arguments[index] = so_far
+        match = re.search(r'"%s"\s*:\s*"([^"]*)"' % re.escape(entry["arg"]), so_far)
+        if match:
+            self._say(entry["phrases"].get(match.group(1), entry["default"]))
+        elif len(so_far) > MAX_ARGUMENT_CHARS:
+            self._say(entry["default"])
+
+    def worker_done(self, agent_name, seconds):
+        """A delegated worker finished; announce it if it took a while"""
+        if seconds >= ANNOUNCE_WORKER_SECONDS:
+            phrase = WORKER_DONE.get(agent_name, WORKER_DONE_DEFAULT)
+            print(f"\n💬 {phrase}")
+            self.speak(phrase)
+
+    def _say(self, phrase):
+        self.spoken = phrase
+        self._arguments = {}
+        print(f"\n💬 {phrase}")
+        self.speak(phrase)
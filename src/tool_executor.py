@@ -0,0 +1,138 @@
+"""
+Concurrent execution of the tool calls in one assistant message
+
+When the model asks for several tools in one turn (four brave_search calls,
+a search plus a delegation, ...) they run on a small thread pool instead of
+one after another. Results come back in the original order, so the tool
+messages appended to the conversation are the same as with a sequential loop.
+
+Concurrency classes come from the tool registry (@tool(concurrency=...)):
+- PARALLEL: read-only tools, no locking
+- a class name, e.g. "tasks": one call of that class at a time, across all
+  agent runs in the process (task tools that write, including the reads
+  that run the rollover pass first, share one SQLite or JSON task store)
+- EXCLUSIVE: waits for the other calls of the message to finish and runs
+  alone (bash_command, interactive questions)
+
+    calls = [(name, args), ...]
+    for (name, args), (result, ms) in zip(calls, run_tool_calls(calls, execute_tool)):
+        ...
+
+iter_tool_calls() runs the same way but yields each result as soon as its
+call finishes (e.g. to report progress while slower calls still run).
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+
+from tool_registry import EXCLUSIVE, PARALLEL, concurrency
+
+MAX_WORKERS = 4
+
+_class_locks = {}  # concurrency class -> Lock
+_class_locks_guard = threading.Lock()
+
+
+def _class_lock(name):
+    with _class_locks_guard:
+        lock = _class_locks.get(name)
+        if lock is None:
+            lock = _class_locks[name] = threading.Lock()
+    return lock
+
+
+class _Gate:
+    """Shared/exclusive lock for the calls of one message (readers-writer)"""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._active = 0
+        self._exclusive = False
+
+    @contextmanager
+    def shared(self):
+        with self._cond:
+            self._cond.wait_for(lambda: not self._exclusive)
+            self._active += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._active -= 1
+                self._cond.notify_all()
+
+    @contextmanager
+    def exclusive(self):
+        with self._cond:
+            self._cond.wait_for(lambda: not self._exclusive and self._active == 0)
+            self._exclusive = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._exclusive = False
+                self._cond.notify_all()
+
+
+def _timed(run, name, args, gate):
+    kind = concurrency(name)
+    started = time.perf_counter()
+    if kind == EXCLUSIVE:
+        with gate.exclusive():
+            result = run(name, args)
+    elif kind == PARALLEL:
+        with gate.shared():
+            result = run(name, args)
+    else:
+        with gate.shared(), _class_lock(kind):
+            result = run(name, args)
+    return result, (time.perf_counter() - started) * 1000
+
+
+def iter_tool_calls(calls, run, max_workers=MAX_WORKERS):
+    """
+    Run tool calls concurrently, yielding each result as its call finishes
+
+    Args:
+        calls: [(tool name, args dict)] in the order the model sent them
+        run: run(name, args) -> result (e.g. execute_tool, or a wrapper that
+             handles delegation)
+        max_workers: pool size for this message
+
+    Yields:
+        (index in calls, (result, elapsed ms)) in completion order. If any
+        call raised, the first exception (in call order) is re-raised once
+        all calls have finished and the others were yielded.
+    """
+    gate = _Gate()
+    if len(calls) <= 1 or max_workers <= 1:
+        for index, (name, args) in enumerate(calls):
+            yield index, _timed(run, name, args, gate)
+        return
+
+    # A pool per message: a delegated worker agent runs its own tool calls
+    # from inside one of these threads, so a shared pool could deadlock
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(calls)), thread_name_prefix="tool") as pool:
+        futures = [pool.submit(_timed, run, name, args, gate) for name, args in calls]
+        indices = {future: index for index, future in enumerate(futures)}
+        for future in as_completed(futures):
+            if future.exception() is None:
+                yield indices[future], future.result()
+    for future in futures:
+        future.result()
+
+
+def run_tool_calls(calls, run, max_workers=MAX_WORKERS):
+    """
+    Run tool calls concurrently, respecting their concurrency classes
+
+    Returns:
+        [(result, elapsed ms)] in the order of `calls` (see iter_tool_calls
+        for the arguments and errors)
+    """
+    outcomes = [None] * len(calls)
+    for index, outcome in iter_tool_calls(calls, run, max_workers):
+        outcomes[index] = outcome
+    return outcomes
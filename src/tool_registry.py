@@ -0,0 +1,129 @@
+"""
+Registry of LLM tools
+
+Tools are plain Python functions registered with @tool; the OpenAI function
+schema is generated once from the signature (types from annotations, required
+= parameters without a default) plus per-parameter descriptions. Dispatch is a
+dict lookup.
+
+    @tool("Search the web", params={"query": "The search query string"})
+    def brave_search(query: str, count: int = 10):
+        ...
+
+    call_tool("brave_search", {"query": "kokoro tts"})
+    schemas(["brave_search", "bash_command"])   # list for the chat API
+
+Each tool also has a concurrency class, used by tool_executor when one
+assistant message has several tool calls: PARALLEL tools run side by side,
+tools sharing any other class name (e.g. "tasks") run one at a time, and
+EXCLUSIVE tools run alone.
+"""
+
+import inspect
+import typing
+
+TOOLS = {}  # name -> {"func", "schema", "accepts", "concurrency"}
+
+PARALLEL = "parallel"
+EXCLUSIVE = "exclusive"
+
+_JSON_TYPES = {str: "string", int: "integer", float: "number", bool: "boolean", list: "array", dict: "object"}
+
+
+def _json_type(annotation):
+    """JSON schema for a parameter annotation (unannotated = string)"""
+    origin = typing.get_origin(annotation)
+    if origin is typing.Union:
+        # Optional[X] -> X
+        args = [a for a in typing.get_args(annotation) if a is not type(None)]
+        return _json_type(args[0]) if len(args) == 1 else {"type": "string"}
+    if origin is list:
+        args = typing.get_args(annotation)
+        return {"type": "array", "items": _json_type(args[0]) if args else {"type": "string"}}
+    return {"type": _JSON_TYPES.get(origin or annotation, "string")}
+
+
+def tool(description, params=None, name=None, concurrency=PARALLEL):
+    """
+    Register a function as an LLM tool
+
+    Args:
+        description: tool description shown to the model
+        params: per-parameter extras - a string is the description, a dict is
+                merged into the generated schema (enum, items, default, ...),
+                None hides a parameter from the model. Entries for names that
+                are not in the signature (e.g. collected by **kwargs) must be
+                complete schemas.
+        name: tool name (default: function name)
+        concurrency: PARALLEL (read-only, safe side by side), EXCLUSIVE
+                     (runs with no other tool call of the same message), or
+                     a class name whose tools are serialized (e.g. "tasks")
+    """
+    params = params or {}
+
+    def decorator(func):
+        hints = typing.get_type_hints(func)
+        properties, required = {}, []
+        accepts = set()
+        var_keyword = False
+
+        for pname, param in inspect.signature(func).parameters.items():
+            if param.kind == param.VAR_KEYWORD:
+                var_keyword = True
+                continue
+            accepts.add(pname)
+            extra = params.get(pname, "")
+            if extra is None:
+                continue
+            schema = _json_type(hints.get(pname, str))
+            schema.update({"description": extra} if isinstance(extra, str) and extra else extra or {})
+            properties[pname] = schema
+            if param.default is param.empty:
+                required.append(pname)
+
+        for pname, extra in params.items():
+            if pname not in properties and isinstance(extra, dict):
+                properties[pname] = extra
+
+        parameters = {"type": "object", "properties": properties}
+        if required:
+            parameters["required"] = required
+
+        tool_name = name or func.__name__
+        TOOLS[tool_name] = {
+            "func": func,
+            "schema": {
+                "type": "function",
+                "function": {"name": tool_name, "description": description, "parameters": parameters},
+            },
+            # None = takes any keyword (**kwargs)
+            "accepts": None if var_keyword else accepts,
+            "concurrency": concurrency,
+        }
+        return func
+
+    return decorator
+
+
+def call_tool(name, args):
+    """Run a registered tool; arguments the tool doesn't take are dropped"""
+    entry = TOOLS.get(name)
+    if entry is None:
+        return "Unknown tool"
+    accepts = entry["accepts"]
+    if accepts is not None and not accepts.issuperset(args):
+        args = {k: v for k, v in args.items() if k in accepts}
+    return entry["func"](**args)
+
+
+def concurrency(name):
+    """Concurrency class of a tool (unknown tools are PARALLEL: they only return an error)"""
+    entry = TOOLS.get(name)
+    return entry["concurrency"] if entry else PARALLEL
+
+
+def schemas(names=None):
+    """Schemas for `names` in that order (all tools if None); unknown names are skipped"""
+    if names is None:
+        return [entry["schema"] for entry in TOOLS.values()]
+    return [TOOLS[n]["schema"] for n in names if n in TOOLS]
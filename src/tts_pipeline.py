@@ -9,33 +9,65 @@ This prevents race conditions and memory issues from multi-threading.
 
 Architecture:
     text_queue → [TTS Worker Thread: Generate → Play → Cleanup] → Speaker
+
+Short fixed phrases (acknowledgements) can be rendered ahead of time with
+render_clip(); queue_clip() then puts the cached audio straight on the
+playback queue, skipping generation.
+
+Speech can be queued with an owner, the CancelToken of the request it
+belongs to. Once that token is cancelled, the owner's queued speech is
+skipped and flush(owner) stops it if it is playing; speech of other requests
+(and of timers/reminders, which have no owner) keeps playing.
 """
 
 import queue
 import threading
-import numpy as np
-import sounddevice as sd
 import warnings
 import logging
 import re
 import sys
 import time
-try:
-    import mlx.core as mx
-except ImportError:
-    mx = None
-from mlx_audio.tts.models.kokoro import KokoroPipeline
-from mlx_audio.tts.utils import load_model
 
 # Suppress phonemizer and TTS warnings
 warnings.filterwarnings('ignore', category=UserWarning, module='phonemizer')
 warnings.filterwarnings('ignore', module='mlx_audio')
 logging.getLogger('phonemizer').setLevel(logging.ERROR)
 
-# Configure sounddevice for low latency
-sd.default.latency = 'low'
-sd.default.blocksize = 2048
-sd.default.prime_output_buffers_using_stream_callback = True
+# Audio stack (numpy, sounddevice, mlx, mlx_audio), imported by
+# load_audio_modules() on first use: importing this module for queue_tts
+# must not cost seconds at startup
+np = None
+sd = None
+mx = None
+KokoroPipeline = None
+load_model = None
+_audio_modules_lock = threading.Lock()
+
+
+def load_audio_modules():
+    """Import the audio stack once (thread-safe; the background handler warms it up on idle)"""
+    global np, sd, mx, KokoroPipeline, load_model
+
+    with _audio_modules_lock:
+        if sd is not None:
+            return
+
+        import numpy
+        import sounddevice
+        try:
+            import mlx.core as mlx_core
+        except ImportError:
+            mlx_core = None
+        from mlx_audio.tts.models.kokoro import KokoroPipeline as pipeline_class
+        from mlx_audio.tts.utils import load_model as model_loader
+
+        # Configure sounddevice for low latency
+        sounddevice.default.latency = 'low'
+        sounddevice.default.blocksize = 2048
+        sounddevice.default.prime_output_buffers_using_stream_callback = True
+
+        np, mx, KokoroPipeline, load_model = numpy, mlx_core, pipeline_class, model_loader
+        sd = sounddevice  # set last: marks the stack as loaded
 
 
 class TTSPipeline:
@@ -49,6 +81,7 @@ class TTSPipeline:
         Initialize the TTS pipeline
         """
         print("🎤 Loading TTS model (Singleton)...")
+        load_audio_modules()
         self.model_id = model_id
         self.model = load_model(model_id)
         self.pipeline = KokoroPipeline(lang_code='a', model=self.model, repo_id=model_id)
@@ -64,6 +97,17 @@ class TTSPipeline:
         # Stop event
         self.stop_event = threading.Event()
 
+        # Bumped by flush(): queued text/audio from an older epoch is dropped
+        self.epoch = 0
+        # Owner of the chunk being played (see flush(owner))
+        self._playing_owner = None
+
+        # Pre-rendered phrases: text -> [audio chunks]. The Kokoro pipeline is
+        # not shared between threads, so rendering and the generation worker
+        # take turns
+        self.clips = {}
+        self._generate_lock = threading.Lock()
+
         # Threads
         self.gen_thread = None
         self.play_thread = None
@@ -88,6 +132,10 @@ class TTSPipeline:
 
         return text.strip()
 
+    def _dropped(self, epoch, owner):
+        """Queued speech is stale: flushed as a whole, or its request was cancelled"""
+        return epoch != self.epoch or (owner is not None and owner.is_set())
+
     def _generation_worker(self):
         """Worker 1: Consumes text, generates audio, puts into audio_queue"""
         print("🎤 TTS Generation worker started")
@@ -101,25 +149,26 @@ class TTSPipeline:
                     self.audio_queue.put(None) # Propagate poison pill
                     break
                     
-                text, voice, speed = item
+                epoch, owner, text, voice, speed = item
                 
-                if not text:
+                if not text or self._dropped(epoch, owner):
                     self.text_queue.task_done()
                     continue
 
                 # Generate audio (streaming chunks)
-                for _, _, audio in self.pipeline(text, voice=voice, speed=speed):
-                    if self.stop_event.is_set():
-                        break
-                    
-                    # audio is [wav], get the array
-                    if len(audio) > 0:
-                        # CRITICAL: Convert to numpy immediately to detach from MLX graph
-                        # and ensure it's a standard float32 array
-                        audio_np = np.array(audio[0], dtype=np.float32)
-                        
-                        # Put in queue (blocking if full, providing backpressure)
-                        self.audio_queue.put(audio_np)
+                with self._generate_lock:
+                    for _, _, audio in self.pipeline(text, voice=voice, speed=speed):
+                        if self.stop_event.is_set() or self._dropped(epoch, owner):
+                            break
+
+                        # audio is [wav], get the array
+                        if len(audio) > 0:
+                            # CRITICAL: Convert to numpy immediately to detach from MLX graph
+                            # and ensure it's a standard float32 array
+                            audio_np = np.array(audio[0], dtype=np.float32)
+
+                            # Put in queue (blocking if full, providing backpressure)
+                            self.audio_queue.put((epoch, owner, audio_np))
                 
                 # Clear MLX cache after each sentence to free GPU memory
                 if mx:
@@ -142,13 +191,18 @@ class TTSPipeline:
         
         while not self.stop_event.is_set():
             try:
-                audio_chunk = self.audio_queue.get(timeout=0.1)
+                item = self.audio_queue.get(timeout=0.1)
                 
-                if audio_chunk is None: # Poison pill
+                if item is None: # Poison pill
                     break
+
+                epoch, owner, audio_chunk = item
                 
-                # Play audio (blocking for this chunk)
-                sd.play(audio_chunk, samplerate=24000, blocking=True)
+                # Play audio (blocking for this chunk), unless flushed meanwhile
+                self._playing_owner = owner
+                if not self._dropped(epoch, owner):
+                    sd.play(audio_chunk, samplerate=24000, blocking=True)
+                self._playing_owner = None
                 
                 # Explicit cleanup
                 del audio_chunk
@@ -182,17 +236,75 @@ class TTSPipeline:
             
         print("✓ TTS pipeline started (Dual-thread mode)")
 
-    def queue_text(self, text, voice=None, speed=1.1):
-        """Add text to queue"""
+    def queue_text(self, text, voice=None, speed=1.1, owner=None):
+        """Add text to queue (owner: CancelToken of the request it belongs to)"""
         cleaned_text = self.sanitize_text(text)
         if cleaned_text and len(cleaned_text) >= 2: 
             v = voice if voice else self.default_voice
             # Put in queue (non-blocking, might raise Full if overloaded)
             try:
-                self.text_queue.put((cleaned_text, v, speed), block=False)
+                self.text_queue.put((self.epoch, owner, cleaned_text, v, speed), block=False)
             except queue.Full:
                 print("⚠️ TTS Text Queue Full - dropping text")
 
+    def render_clip(self, text, voice=None, speed=1.1):
+        """Generate `text` now and keep the audio for queue_clip() (runs on the caller's thread)"""
+        cleaned_text = self.sanitize_text(text)
+        with self._generate_lock:
+            chunks = [
+                np.array(audio[0], dtype=np.float32)
+                for _, _, audio in self.pipeline(cleaned_text, voice=voice or self.default_voice, speed=speed)
+                if len(audio) > 0
+            ]
+            if mx:
+                mx.clear_cache()
+        self.clips[text] = chunks
+        return chunks
+
+    def queue_clip(self, text, owner=None):
+        """
+        Play a pre-rendered phrase next, without waiting for generation
+
+        Returns:
+            True if it was cached; otherwise it is queued as normal text
+        """
+        chunks = self.clips.get(text)
+        if not chunks:
+            self.queue_text(text, owner=owner)
+            return False
+        epoch = self.epoch
+        for chunk in chunks:
+            try:
+                self.audio_queue.put((epoch, owner, chunk), block=False)
+            except queue.Full:
+                print("⚠️ TTS Audio Queue Full - dropping clip")
+                break
+        return True
+
+    def flush(self, owner=None):
+        """
+        Drop queued speech and stop what is playing
+
+        Args:
+            owner: only the speech of this (cancelled) CancelToken; its queued
+                   items are skipped by the workers. None drops everything.
+        """
+        if owner is not None:
+            if self._playing_owner is owner:
+                sd.stop()
+            return
+
+        self.epoch += 1
+        for q in (self.text_queue, self.audio_queue):
+            while True:
+                try:
+                    q.get_nowait()
+                except queue.Empty:
+                    break
+                q.task_done()
+        # Interrupts a blocking sd.play() in the playback worker
+        sd.stop()
+
     def stop(self):
         """Stop pipeline"""
         print("🛑 Stopping TTS pipeline...")
@@ -231,15 +343,37 @@ def get_tts_pipeline():
     return _tts_pipeline
 
 
-def queue_tts(text, voice=None, speed=1.1):
+def queue_tts(text, voice=None, speed=1.1, owner=None):
     """Convenience function to queue text for TTS"""
     try:
         pipeline = get_tts_pipeline()
-        pipeline.queue_text(text, voice, speed)
+        pipeline.queue_text(text, voice, speed, owner=owner)
+    except Exception as e:
+        print(f"TTS Queue Error: {e}")
+
+
+def queue_tts_clip(text, owner=None):
+    """Play a phrase from the clip cache (falls back to normal TTS if it isn't rendered)"""
+    try:
+        get_tts_pipeline().queue_clip(text, owner=owner)
     except Exception as e:
         print(f"TTS Queue Error: {e}")
 
 
+def render_tts_clips(texts):
+    """Pre-render phrases for queue_tts_clip (skips ones already cached)"""
+    pipeline = get_tts_pipeline()
+    for text in texts:
+        if text not in pipeline.clips:
+            pipeline.render_clip(text)
+
+
+def flush_tts(owner=None):
+    """Drop pending TTS of one request's CancelToken, or all of it (no-op if the pipeline was never started)"""
+    if _tts_pipeline:
+        _tts_pipeline.flush(owner)
+
+
 def stop_tts():
     """Stop the TTS pipeline"""
     global _tts_pipeline
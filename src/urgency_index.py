@@ -0,0 +1,145 @@
+"""
+In-memory urgency index for load_top_tasks
+
+Urgency is monotonic in due date for a fixed tag weight (overdue tasks always
+outrank upcoming ones, and within each group earlier due = more urgent), so we
+keep one min-heap of due dates per tag weight. Top-N walks the heaps best-first
+and only evaluates the time-decay part of the score for the candidates it
+actually visits: O(k log N) instead of scoring and sorting every task.
+
+Updates are incremental: a changed task gets a fresh heap entry and the old one
+is invalidated lazily (skipped when visited, dropped on the next compaction).
+"""
+
+import heapq
+from datetime import datetime
+
+# Naive epoch: differences match naive datetime subtraction (no DST shifts)
+_EPOCH = datetime(1970, 1, 1)
+
+
+def epoch(dt):
+    """Seconds since 1970-01-01 for a naive local datetime"""
+    return (dt - _EPOCH).total_seconds()
+
+
+def due_epoch(task):
+    """Parse a task's due date once, returns None if it is missing/invalid"""
+    try:
+        return epoch(datetime.fromisoformat(task["due_date"]))
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+class UrgencyIndex:
+    """Per-tag-weight heaps keyed on (due_epoch, task_id, seq)"""
+
+    def __init__(self, tag_weights):
+        self.tag_weights = tag_weights
+        self.tasks = {}       # task_id -> task dict
+        self._heaps = {}      # weight -> heap of (due_epoch, task_id, seq)
+        self._live = {}       # task_id -> seq of its valid heap entry
+        self._trailing = {}   # task_id -> task, done or undated (urgency -1000)
+        self._seq = 0
+        self._stale = 0
+        self.stamp = None     # store stamp this index was built against
+
+    def __len__(self):
+        return len(self.tasks)
+
+    def build(self, items, stamp=None):
+        """Rebuild from (task_id, task) pairs in one heapify per weight"""
+        self.tasks.clear()
+        self._heaps.clear()
+        self._live.clear()
+        self._trailing.clear()
+        self._stale = 0
+
+        for task_id, task in items:
+            self._place(task_id, task)
+        for heap in self._heaps.values():
+            heapq.heapify(heap)
+
+        self.stamp = stamp
+
+    def _place(self, task_id, task, push=False):
+        """Record a task; with push=False the caller heapifies afterwards"""
+        self.tasks[task_id] = task
+        due = None if task.get("done") else due_epoch(task)
+        if due is None:
+            self._trailing[task_id] = task
+            return
+
+        weight = self.tag_weights.get(task.get("tag", "other"), 1.0)
+        self._seq += 1
+        self._live[task_id] = self._seq
+        entry = (due, task_id, self._seq)
+        heap = self._heaps.setdefault(weight, [])
+        if push:
+            heapq.heappush(heap, entry)
+        else:
+            heap.append(entry)
+
+    def upsert(self, task_id, task):
+        """Add or replace a task - O(log N)"""
+        self.remove(task_id)
+        self._place(task_id, task, push=True)
+
+    def remove(self, task_id):
+        """Drop a task; its heap entry is invalidated lazily"""
+        self.tasks.pop(task_id, None)
+        self._trailing.pop(task_id, None)
+        if self._live.pop(task_id, None) is not None:
+            self._stale += 1
+            if self._stale > len(self._live) + 64:
+                self._compact()
+
+    def _compact(self):
+        """Rebuild the heaps without invalidated entries"""
+        for weight, heap in self._heaps.items():
+            heap[:] = [e for e in heap if self._live.get(e[1]) == e[2]]
+            heapq.heapify(heap)
+        self._stale = 0
+
+    def top(self, count=10, now=None):
+        """
+        Return the `count` most urgent tasks, same order as a full sort by urgency
+
+        The heaps are walked best-first through a small frontier heap, so only
+        O(count) entries (plus any stale ones on the way) are scored.
+        """
+        now_epoch = epoch(now or datetime.now())
+        frontier = []
+
+        def push(weight, heap, i):
+            due, task_id, _ = heap[i]
+            days_until = (due - now_epoch) / 86400
+            if days_until < 0:
+                score = (1000 + abs(days_until)) * weight
+            else:
+                score = 100 / (days_until + 1) * weight
+            heapq.heappush(frontier, (-score, task_id, i, weight))
+
+        for weight, heap in self._heaps.items():
+            if heap:
+                push(weight, heap, 0)
+
+        result = []
+        while frontier and len(result) < count:
+            _, task_id, i, weight = heapq.heappop(frontier)
+            heap = self._heaps[weight]
+            _, _, seq = heap[i]
+            if self._live.get(task_id) == seq:
+                result.append(self.tasks[task_id])
+
+            # Children are never more urgent than their parent
+            for child in (2 * i + 1, 2 * i + 2):
+                if child < len(heap):
+                    push(weight, heap, child)
+
+        # Done/undated tasks all score -1000, so they follow in store order
+        if len(result) < count and self._trailing:
+            for task_id in heapq.nsmallest(count - len(result), self._trailing):
+                result.append(self._trailing[task_id])
+
+        return result
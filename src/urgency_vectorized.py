@@ -0,0 +1,116 @@
+"""
+Vectorized urgency scoring over a columnar task snapshot
+
+TaskColumns holds NumPy arrays (due epoch, tag id, done flag, created_at)
+so urgency for every task is one array expression, top-N is an
+argpartition, and "what-if" scoring at several reference times (e.g. each
+day of the coming week) is a single broadcast.
+
+Scores match task_store.urgency(); done or undated tasks score -1000.
+In plan(), tasks drop out when the rollover engine would remove them:
+recurring occurrences (meeting/office_hour) once their day is over, hw once
+its due date has started, instead of being listed as overdue.
+"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from recurrence import RECURRING_TAGS
+from urgency_index import due_epoch, epoch
+
+
+def _created_epoch(task):
+    try:
+        return epoch(datetime.fromisoformat(task["created_at"]))
+    except (KeyError, TypeError, ValueError):
+        return np.nan
+
+
+class TaskColumns:
+    """Columnar snapshot of a task list"""
+
+    def __init__(self, tasks, tag_weights):
+        self.tasks = list(tasks)
+        self.tag_names = list(tag_weights) + ["other"]
+        tag_ids = {tag: i for i, tag in enumerate(self.tag_names)}
+        # Unknown tags share the "other" slot, weight 1.0 like tag_weights.get(..., 1.0)
+        self.weights = np.array([tag_weights.get(t, 1.0) for t in self.tag_names])
+
+        due = [due_epoch(t) for t in self.tasks]
+        self.due = np.array([np.nan if d is None else d for d in due], dtype=np.float64)
+        self.tag_id = np.array(
+            [tag_ids.get(t.get("tag", "other"), tag_ids["other"]) for t in self.tasks], dtype=np.int16
+        )
+        self.done = np.array([bool(t.get("done")) for t in self.tasks], dtype=bool)
+        self.created_at = np.array([_created_epoch(t) for t in self.tasks], dtype=np.float64)
+        tags = [t.get("tag", "other") for t in self.tasks]
+        recurring = np.array([tag in RECURRING_TAGS for tag in tags], dtype=bool)
+        # rollover.roll_task deletes hw as soon as its due date (midnight) passes
+        removed = np.array([tag == "hw" for tag in tags], dtype=bool)
+        self.expires = np.where(recurring, self.due + 86400, np.where(removed, self.due, np.inf))
+
+    def __len__(self):
+        return len(self.tasks)
+
+    def scores_at(self, times):
+        """
+        Urgency of every task at each reference time
+
+        Args:
+            times: list of datetimes
+
+        Returns:
+            array of shape (len(times), len(tasks))
+        """
+        now = np.array([epoch(t) for t in times], dtype=np.float64)[:, None]
+        days_until = (self.due[None, :] - now) / 86400
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            score = np.where(days_until < 0, 1000 + np.abs(days_until), 100 / (days_until + 1))
+        score *= self.weights[self.tag_id][None, :]
+
+        inactive = self.done | np.isnan(self.due)
+        score[:, inactive] = -1000
+        return score
+
+    def scores(self, now=None):
+        """Urgency of every task at `now`"""
+        return self.scores_at([now or datetime.now()])[0]
+
+    def _top_indices(self, score, count):
+        """Indices of the `count` best scores, ties broken by position like a stable sort"""
+        if count <= 0 or len(score) == 0:
+            return np.array([], dtype=np.int64)
+        if count < len(score):
+            kth = np.partition(score, len(score) - count)[len(score) - count]
+            candidates = np.flatnonzero(score >= kth)
+        else:
+            candidates = np.arange(len(score))
+        order = np.lexsort((candidates, -score[candidates]))
+        return candidates[order][:count]
+
+    def top(self, count=10, now=None):
+        """Top `count` tasks at `now`, same order as sorting by urgency"""
+        return [self.tasks[i] for i in self._top_indices(self.scores(now), count)]
+
+    def plan(self, start=None, days=7, per_day=5):
+        """
+        What-if plan: most urgent pending tasks at 9:00 on each of the next `days` days
+
+        Returns:
+            list of (date, [tasks]) - tasks already due before that day are
+            still listed (as overdue) until done, except the ones rollover
+            removes by then (hw, past recurring occurrences)
+        """
+        start = (start or datetime.now()).replace(hour=9, minute=0, second=0, microsecond=0)
+        times = [start + timedelta(days=i) for i in range(days)]
+        scores = self.scores_at(times)
+        at = np.array([epoch(t) for t in times], dtype=np.float64)[:, None]
+        scores[at >= self.expires[None, :]] = -1000
+
+        plan = []
+        for when, score in zip(times, scores):
+            picked = [i for i in self._top_indices(score, per_day) if score[i] > -1000]
+            plan.append((when.date(), [self.tasks[i] for i in picked]))
+        return plan